@@ -0,0 +1,208 @@
+'''
+Extract an adversarial corpus of log files: plots that crashed or are still
+running, lines of digits and quotes that make backtracking regexes take
+quadratic time, binary garbage without line endings, a plot that never
+ends, and a damaged compressed file. Each case is extracted at two sizes;
+the time must grow linearly with the size and stay above a minimum
+throughput, and the incomplete plots and errors must be reported.
+
+	$ python -m benchmarks.adversarial [--mb 4] [--min-mb-s 1]
+'''
+
+# system packages
+from datetime import datetime
+from pathlib  import Path
+from typing   import Callable, Dict, List, Tuple
+import argparse
+import gzip
+import random
+import sys
+import tempfile
+import time
+
+# local packages
+from benchmarks.synthetic import log_file, plot_log
+from src.config           import Config
+from src.plots            import Plots
+
+START = datetime(2021, 4, 25, 16, 59, 9)
+
+# one complete plot, the incomplete plots and errors are checked against it
+PLOT = log_file(1)
+
+
+def truncated (size:int) -> bytes:
+	'''Plots that stop part way, each followed by the next plot, and a last plot that is still running.'''
+
+	rng = random.Random(1)
+	out:List[str] = []
+	length:int = 0
+	seq:int = 0
+	while length < size:
+		for truncate in (True, False):
+			text, _ = plot_log(rng, START, seq, truncate=truncate)
+			out.append(text)
+			length += len(text)
+			seq += 1
+	out.append(plot_log(rng, START, seq, truncate=True)[0])
+	return ''.join(out).encode()
+
+
+def digits (size:int) -> bytes:
+	'''A plot with a phase time of only digits, "\\d+.\\d+ seconds" backtracks on each split of them.'''
+
+	return PLOT.replace('Time for phase 1 = ', 'Time for phase 1 = ' + '1' * size, 1).encode()
+
+
+def quotes (size:int) -> bytes:
+	'''A copy line of only quotes, "(.*)" to "(.*)" backtracks on each pair of them.'''
+
+	return PLOT.replace('Copied final file from "', 'Copied final file from "' + '"' * size, 1).encode()
+
+
+def garbage (size:int) -> bytes:
+	'''Random bytes without line endings around a plot.'''
+
+	rng = random.Random(1)
+	noise = bytes(rng.randrange(256) for _ in range(256)).replace(b'\n', b' ') * (size // 512)
+	return noise + b'\n' + PLOT.encode() + noise
+
+
+def restarts (size:int) -> bytes:
+	'''Plots that start again and again without finishing.'''
+
+	line = b'Starting plotting progress into temporary dirs: /media/temp001 and /media/temp002\n'
+	return line * (size // len(line))
+
+
+def endless (size:int) -> bytes:
+	'''
+	A plot that never ends, three times the size so the larger file is longer
+	than PlotSplitter.MAX_PLOT_BYTES (with the default size).
+	'''
+
+	line = b'\tBucket 0 uniform sort. Ram: 3.250GiB, u_sort min: 0.563GiB, qs min: 0.281GiB.\n'
+	return PLOT[:PLOT.index('Renamed final file')].encode() + line * (size * 3 // len(line))
+
+
+def damaged (size:int) -> bytes:
+	'''A gzip file cut off part way.'''
+
+	data = gzip.compress(log_file(max(1, size // 6000)).encode())
+	return data[:len(data) * 2 // 3]
+
+
+# key is the case name, value is the function that returns about size bytes of the case, see check()
+CASES:Dict[str, Callable[[int], bytes]] = {
+	'truncated': truncated,
+	'digits':    digits,
+	'quotes':    quotes,
+	'garbage':   garbage,
+	'restarts':  restarts,
+	'endless':   endless,
+	'damaged':   damaged,
+}
+
+
+def extract (config:Config, path:Path) -> Tuple[float, Plots]:
+	'''Extract one file, return the seconds and the Plots().'''
+
+	plots = Plots(config)
+	begin = time.perf_counter()
+	plots.extract(path)
+	return time.perf_counter() - begin, plots
+
+
+def check (name:str, plots:Plots) -> List[str]:
+	'''Return what is wrong with the plots extracted from a case.'''
+
+	problems:List[str] = []
+	reasons = {plot.reason for plot in plots.incomplete}
+
+	if name == 'truncated':
+		# every other plot is truncated, the last one is still running
+		if len(plots.incomplete) != len(plots.plots) + 1 or not reasons <= {'restarted', 'unfinished'} or plots.incomplete[-1].reason != 'unfinished':
+			problems.append(f'{len(plots.plots)} plots, incomplete {sorted(reasons)}')
+
+	elif name in ('digits', 'quotes'):
+		if plots.plots or [plot.reason for plot in plots.incomplete] != ['invalid']:
+			problems.append(f'{len(plots.plots)} plots, incomplete {sorted(reasons)}')
+
+	elif name == 'garbage':
+		if len(plots.plots) != 1 or plots.incomplete:
+			problems.append(f'{len(plots.plots)} plots, {len(plots.incomplete)} incomplete')
+
+	elif name == 'restarts':
+		if plots.plots or reasons != {'restarted', 'unfinished'}:
+			problems.append(f'{len(plots.plots)} plots, incomplete {sorted(reasons)}')
+
+	elif name == 'endless':
+		if plots.plots or len(plots.incomplete) != 1 or plots.incomplete[0].phase != 4 or not plots.incomplete[0].last_time:
+			problems.append(f'{len(plots.plots)} plots, incomplete {[tuple(plot) for plot in plots.incomplete]}')
+
+	elif name == 'damaged':
+		if not plots.errors:
+			problems.append('no error')
+
+	return problems
+
+
+def main () -> None:
+	parser = argparse.ArgumentParser(description='Extract an adversarial corpus and check the time is linear.')
+	parser.add_argument('--mb', type=float, default=4, help='size of the smaller file of each case in MB')
+	parser.add_argument('--min-mb-s', type=float, default=1, help='minimum throughput in MB/s')
+	args = parser.parse_args()
+
+	size = int(args.mb * 1e6)
+	errors:int = 0
+
+	with tempfile.TemporaryDirectory(prefix='chia-log-') as temp_dir:
+		directory = Path(temp_dir)
+
+		(directory / 'chia-log.yaml').write_text(f'directories:\n  logs:\n    - {directory}\nfiles:\n  patterns:\n    - "*.log"\nlogging:\n  level: error\n')
+		(directory / 'budget.yaml').write_text(f'directories:\n  logs:\n    - {directory}\nfiles:\n  patterns:\n    - "*.log"\n  time-budget: 0.001\nlogging:\n  level: error\n')
+
+		config = Config()
+		config.cli_options(str(directory / 'chia-log.yaml'), False, '', 'text', 0)
+		if not config.valid:
+			sys.exit(1)
+
+		print(f'{"case":10} {"MB":>6} {"secs":>7} {"MB/s":>7} {"2x MB":>6} {"secs":>7} {"ratio":>6}  plots incomplete')
+		for name, make in CASES.items():
+			results = []
+			for scale in (1, 2):
+				path = directory / f'{name}-{scale}.log'
+				path.write_bytes(make(size * scale))
+				secs, plots = extract(config, path)
+				results.append((path.stat().st_size, secs, plots))
+
+			(size_1, secs_1, plots_1), (size_2, secs_2, plots_2) = results
+			ratio = secs_2 / max(secs_1, 1e-3)
+
+			problems = check(name, plots_1) + check(name, plots_2)
+			if size_2 / 1e6 / secs_2 < args.min_mb_s:
+				problems.append(f'slower than {args.min_mb_s} MB/s')
+			if secs_2 > 0.05 and ratio > 3:
+				problems.append(f'twice the size took {ratio:.1f}x the time')
+
+			print(f'{name:10} {size_1 / 1e6:6.1f} {secs_1:7.3f} {size_1 / 1e6 / max(secs_1, 1e-6):7.1f} {size_2 / 1e6:6.1f} {secs_2:7.3f} {ratio:6.2f}  {len(plots_2.plots):5} {len(plots_2.incomplete):10}')
+			for problem in problems:
+				print(f'  error: {problem}')
+			errors += len(problems)
+
+		# a file that runs out of its time budget is stopped, the next file is still extracted
+		budget = Config()
+		budget.cli_options(str(directory / 'budget.yaml'), False, '', 'text', 0)
+		plots = Plots(budget)
+		plots.extract_files([directory / 'truncated-2.log', directory / 'garbage-1.log'], 1)
+		timed_out = [path.name for path, error in plots.errors.items() if 'time budget' in error]
+		print(f'time budget   {", ".join(timed_out) or "none"} stopped, {len(plots.plots)} plots')
+		errors += timed_out != ['truncated-2.log'] or not plots.plots
+
+	print(f'errors        {errors}')
+	if errors:
+		sys.exit(1)
+
+
+if __name__ == '__main__':
+	main()
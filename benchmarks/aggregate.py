@@ -0,0 +1,82 @@
+'''
+Time the plot table group-by (the PhaseStats of each phase, by plot
+configuration name and threads) with numpy and in pure Python, and check
+both against adding each value to a PhaseStats, the way the statistics were
+kept before the table. The counts, minimums, maximums, and sketches must be
+the same, and the means and standard deviations the same up to rounding.
+
+	$ python -m benchmarks.aggregate [rows]
+'''
+
+# system packages
+from math   import isclose
+from typing import Dict, Tuple
+import random
+import sys
+import time
+
+# local packages
+from src           import plottable
+from src.plotstats import PhaseStats
+from src.plottable import PlotTable
+
+KEYS    = ('name', 'threads')
+COLUMNS = ('phase_1', 'phase_2', 'phase_3', 'phase_4', 'total_time')
+
+
+def same (a:PhaseStats, b:PhaseStats) -> bool:
+	'''Return True if two statistics of the same values agree.'''
+
+	return (a.count == b.count and a.min == b.min and a.max == b.max and a.to_record()[1] == b.to_record()[1]
+		and isclose(a.mean, b.mean, rel_tol=1e-9) and isclose(a.stdev, b.stdev, rel_tol=1e-9))
+
+
+def main (rows:int) -> None:
+	rng = random.Random(1)
+	names = [f'config {index}' for index in range(12)]
+	table = PlotTable()
+
+	# the statistics added one value at a time
+	expected:Dict[Tuple[str, int], Dict[str, PhaseStats]] = {}
+
+	begin = time.perf_counter()
+	for _ in range(rows):
+		name, threads = rng.choice(names), rng.choice([2, 4, 6, 8])
+		values = {
+			'phase_1': rng.uniform(3000, 9000), 'phase_2': rng.uniform(500, 2000), 'phase_3': rng.uniform(2000, 5000),
+			'phase_4': rng.uniform(200, 400), 'total_time': rng.uniform(7000, 16000), 'copy_secs': rng.uniform(300, 900),
+		}
+		table.append_row(name, dict(values, threads=threads, buffer_size=4096, buckets=128, plot_size=32))
+
+		group = expected.setdefault((name, threads), {column: PhaseStats() for column in COLUMNS})
+		for column in COLUMNS:
+			group[column].add(values[column])
+	print(f'rows         {rows:,} (filled in {time.perf_counter() - begin:.1f} s)')
+
+	errors:int = 0
+	installed = plottable.numpy
+	for label, numpy in (('numpy', plottable.numpy), ('pure Python', None)):
+		if label == 'numpy' and numpy is None:
+			print('numpy        not installed')
+			continue
+
+		plottable.numpy = numpy
+		begin = time.perf_counter()
+		groups = table.group_by(KEYS, COLUMNS)
+		secs = time.perf_counter() - begin
+
+		# the rows of the second half, as --follow aggregates the rows added since the last update
+		half = table.group_by(KEYS, COLUMNS, rows // 2)
+		result = groups.keys() == expected.keys() and all(same(groups[key][column], expected[key][column]) for key in expected for column in COLUMNS)
+		result = result and sum(group['total_time'].count for group in half.values()) == rows - rows // 2
+		errors += not result
+		print(f'{label:12} {secs:.3f} s, {len(groups)} groups, {"same" if result else "DIFFERENT"}')
+	plottable.numpy = installed
+
+	print(f'errors       {errors}')
+	if errors:
+		sys.exit(1)
+
+
+if __name__ == '__main__':
+	main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
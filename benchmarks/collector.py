@@ -0,0 +1,163 @@
+'''
+Collect the logs of many hosts while the plotters write them, and compare
+against copying every log again each time (what console/scp-logs.sh did
+for new logs). Half of the hosts are read with the local transport and half
+with the ssh transport, through a stand-in for ssh that runs the commands
+on this machine, so no network is needed.
+
+After each round the copies must be the same as the logs on the hosts,
+only the appended bytes (and a rewritten log) may be copied, and the plots
+parsed from the copied bytes as they arrive (Follow.collect()) must be the
+plots and the report of a run over the logs of every host.
+
+	$ python -m benchmarks.collector [--hosts 20] [--rounds 3] [generator options]
+'''
+
+# system packages
+from contextlib import redirect_stdout
+from pathlib    import Path
+from typing     import Dict, List
+import argparse
+import io
+import sys
+import tempfile
+import time
+
+# local packages
+from benchmarks         import synthetic
+from benchmarks.summary import extract, load_config
+from src.analyze        import Analyze
+from src.collector      import Collector, HostConfig
+from src.follow         import Follow
+from src.plots          import Plots
+
+# runs the command of "ssh [options] destination command" on this machine
+FAKE_SSH = '''#!/bin/sh
+while [ $# -gt 0 ]; do
+	case "$1" in
+		-o|-i|-p) shift 2 ;;
+		-O) exit 0 ;;
+		*) break ;;
+	esac
+done
+shift
+exec sh -c "$*"
+'''
+
+
+def report (analyze:Analyze, plots:Plots) -> List[str]:
+	'''Return the lines of the report, sorted (the order of the overlaps follows the order the plots are found).'''
+
+	analyze.finish(plots)
+	out = io.StringIO()
+	with redirect_stdout(out):
+		analyze.print(plots)
+	return sorted(out.getvalue().splitlines())
+
+
+def same_files (source:Path, copy:Path) -> bool:
+	'''Return True if every log in a host directory has a copy with the same bytes.'''
+
+	return all((copy / path.name).exists() and (copy / path.name).read_bytes() == path.read_bytes() for path in source.iterdir())
+
+
+def main () -> None:
+	parser = argparse.ArgumentParser(description='Collect growing logs from many hosts, only the appended bytes.')
+	parser.add_argument('--hosts', type=int, default=20, help='plotting machines, the log files are shared among them')
+	parser.add_argument('--rounds', type=int, default=3, help='times the plotters write more of their logs')
+	parser.add_argument('--jobs', type=int, default=8, help='hosts collected at the same time')
+	synthetic.add_arguments(parser)
+	parser.set_defaults(plots=4000)
+	args = parser.parse_args()
+
+	options = synthetic.options(args)
+	errors:int = 0
+
+	with tempfile.TemporaryDirectory(prefix='chia-log-') as temp_dir:
+		directory = Path(temp_dir)
+		corpus = synthetic.write_logs(directory / 'all', options)
+
+		ssh = directory / 'ssh'
+		ssh.write_text(FAKE_SSH)
+		ssh.chmod(0o755)
+
+		hosts:List[HostConfig] = []
+		for host in range(args.hosts):
+			(directory / 'hosts' / f'host-{host:02}').mkdir(parents=True)
+			if host % 2:
+				hosts.append(HostConfig(f'host-{host:02}', 'ssh', str(directory / 'hosts' / f'host-{host:02}'), 'localhost', ssh=str(ssh)))
+			else:
+				hosts.append(HostConfig(f'host-{host:02}', 'local', str(directory / 'hosts' / f'host-{host:02}')))
+
+		destination = directory / 'copies'
+		destination.mkdir()
+		synthetic.write_config(directory / 'collected.yaml', destination, options)
+		synthetic.write_config(directory / 'hosts.yaml', directory / 'hosts', options)
+
+		config = load_config(directory / 'collected.yaml')
+		plots = Plots(config)
+		analyze = Analyze(config)
+		follow = Follow(config, plots, analyze)
+		collector = Collector(destination, hosts, ['chia*.log'], config.logger, directory / 'checkpoints', args.jobs)
+
+		# the plotters write their logs a part at a time
+		logs = {path: path.read_bytes() for path in corpus.files}
+		written:Dict[Path, int] = {path: 0 for path in corpus.files}
+		full_copy:int = 0
+
+		for rounds in range(1, args.rounds + 1):
+			appended:int = 0
+			for index, (path, data) in enumerate(logs.items()):
+				host_path = directory / 'hosts' / hosts[index % args.hosts].name / path.name
+				end = len(data) * rounds // args.rounds
+				with open(host_path, 'ab') as f:
+					f.write(data[written[path]:end])
+				appended += end - written[path]
+				written[path] = end
+				full_copy += end
+
+			# a log that is rewritten (a line is added at the start) is copied again
+			rewritten:int = 0
+			if rounds == args.rounds:
+				host_path = directory / 'hosts' / hosts[0].name / corpus.files[0].name
+				host_path.write_bytes(b'rewritten\n' + logs[corpus.files[0]])
+				rewritten = host_path.stat().st_size
+				appended -= len(logs[corpus.files[0]]) - len(logs[corpus.files[0]]) * (rounds - 1) // args.rounds
+
+			begin = time.perf_counter()
+			follow.collect(collector)
+			collector.save()
+			secs = time.perf_counter() - begin
+
+			copied = sum(collector.copied.values())
+			if collector.errors or copied != appended + rewritten:
+				print(f'error: round {rounds}, copied {copied} bytes, appended {appended} + rewritten {rewritten}, errors {collector.errors}')
+				errors += 1
+			for host in hosts:
+				if not same_files(Path(host.directory), destination / host.name):
+					print(f'error: round {rounds}, the copies of {host.name} are different')
+					errors += 1
+
+			print(f'round {rounds}  {secs:7.3f} s  copied {copied / 2 ** 20:8.2f} MiB ({copied / 2 ** 20 / secs:6.1f} MiB/s)  {len(plots.plots):,} plots')
+
+		collector.close()
+
+		# the plots parsed as they were copied, against a run over the logs of the hosts
+		hosts_plots, hosts_analyze = extract(load_config(directory / 'hosts.yaml'))
+		if sorted(plot.parameters.plot_id for plot in plots.plots) != sorted(plot.parameters.plot_id for plot in hosts_plots.plots):
+			print(f'error: collected {len(plots.plots)} plots, the hosts have {len(hosts_plots.plots)}')
+			errors += 1
+		if report(analyze, plots) != report(hosts_analyze, hosts_plots):
+			print(f'error: the report of the collected plots is different')
+			errors += 1
+
+	total = sum(len(data) for data in logs.values())
+	print(f'logs     {total / 2 ** 20:,.1f} MiB on {args.hosts} hosts, {corpus.plots:,} plots')
+	print(f'copying every log each round would copy {full_copy / 2 ** 20:,.1f} MiB')
+	print(f'errors   {errors}')
+	if errors:
+		sys.exit(1)
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,107 @@
+'''
+Throughput of compressed log files (.gz, .xz, .bz2) on a synthetic corpus.
+Each codec reports the compressed size, the time to only decompress the
+files, and the time to extract the plots, which decompresses in a
+background thread (see src/logreader.py). With a spare CPU the extract
+time is close to the larger of decompressing and parsing, not their sum.
+Every codec must extract the same plots as the uncompressed logs.
+
+	$ python -m benchmarks.compressed [--dir directory] [generator options]
+'''
+
+# system packages
+from pathlib import Path
+from typing  import Dict, List
+import argparse
+import bz2
+import gzip
+import lzma
+import sys
+import tempfile
+import time
+
+# local packages
+from benchmarks    import synthetic
+from src.config    import Config
+from src.logreader import OPENERS
+from src.plots     import Plots
+
+# key is the codec, value is the function that compresses bytes
+COMPRESSORS = {
+	'gz':  gzip.compress,
+	'xz':  lzma.compress,
+	'bz2': bz2.compress,
+}
+
+
+def extract (config:Config, files:List[Path]) -> Dict[str, int]:
+	'''Extract the plots of the files, return the plot IDs and their index.'''
+
+	plots = Plots(config)
+	plots.extract_files(files, 1)
+	return {plot.parameters.plot_id: plot.index for plot in plots.plots}
+
+
+def main () -> None:
+	parser = argparse.ArgumentParser(description='Time extracting compressed logs on a synthetic corpus.')
+	parser.add_argument('--dir', type=str, default='', help='directory for the corpus (default is a temporary directory)')
+	synthetic.add_arguments(parser)
+	parser.set_defaults(plots=5000)
+	args = parser.parse_args()
+
+	options = synthetic.options(args)
+	errors:int = 0
+
+	with tempfile.TemporaryDirectory(prefix='chia-log-') as temp_dir:
+		directory = Path(args.dir).resolve() if args.dir else Path(temp_dir)
+
+		corpus = synthetic.write_logs(directory, options)
+		synthetic.write_config(directory / 'chia-log.yaml', directory, options)
+
+		config = Config()
+		config.cli_options(str(directory / 'chia-log.yaml'), False, '', 'text', 0)
+		if not config.valid:
+			sys.exit(1)
+
+		files = sorted(directory.glob('*.log'))
+		size = sum(file.stat().st_size for file in files)
+
+		begin = time.perf_counter()
+		expected = extract(config, files)
+		secs = time.perf_counter() - begin
+		print(f'plots         {len(expected):,}, {size / 1e6:,.1f} MB uncompressed')
+		print(f'{"none":5} {size / 1e6:8.1f} MB {"":28} extract {secs:6.2f} s {size / 1e6 / secs:7.1f} MB/s')
+
+		for codec, compress in COMPRESSORS.items():
+			codec_dir = directory / codec
+			codec_dir.mkdir(exist_ok=True)
+
+			codec_files:List[Path] = []
+			for file in files:
+				codec_file = codec_dir / f'{file.name}.{codec}'
+				codec_file.write_bytes(compress(file.read_bytes()))
+				codec_files.append(codec_file)
+			codec_size = sum(file.stat().st_size for file in codec_files)
+
+			# decompress only, in this thread
+			begin = time.perf_counter()
+			for codec_file in codec_files:
+				with OPENERS[codec](codec_file) as f:
+					while f.read(1024 * 1024):
+						pass
+			decompress_secs = time.perf_counter() - begin
+
+			begin = time.perf_counter()
+			plots = extract(config, codec_files)
+			secs = time.perf_counter() - begin
+
+			errors += plots != expected
+			print(f'{codec:5} {codec_size / 1e6:8.1f} MB ({size / codec_size:4.1f}x) decompress {decompress_secs:6.2f} s  extract {secs:6.2f} s {size / 1e6 / secs:7.1f} MB/s')
+
+	print(f'errors        {errors}')
+	if errors:
+		sys.exit(1)
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,76 @@
+'''
+Compare log file discovery with one os.scandir() walk (src/discovery.py)
+against a recursive glob for each pattern, on a generated directory tree
+of empty files. Both must find the same files, once each; the tree also
+has a symlink loop and a hard link, which the walk must not follow or
+return twice.
+
+	$ python -m benchmarks.discovery [files] [patterns]
+'''
+
+# system packages
+from pathlib import Path
+from typing  import List
+import os
+import sys
+import tempfile
+import time
+
+# local packages
+from src.discovery import FileDiscovery
+
+NAMES = ('chia-{}.log', 'plotter-{}.log', 'madmax-{}.txt', 'debug-{}.log', 'other-{}.dat', 'notes-{}.md')
+
+
+def make_tree (root:Path, count:int) -> None:
+	'''Write count empty files, 100 to a directory, two levels deep.'''
+
+	for index in range(count):
+		directory = root / f'host{index // 10000:02}' / f'run{index // 100 % 100:02}'
+		if index % 100 == 0:
+			directory.mkdir(parents=True, exist_ok=True)
+		(directory / NAMES[index % len(NAMES)].format(index)).touch()
+
+	os.symlink(root, root / 'host00' / 'loop')
+	os.link(root / 'host00' / 'run00' / 'chia-0.log', root / 'host00' / 'run00' / 'chia-0-link.log')
+
+
+def main (count:int, pattern_count:int) -> None:
+	patterns = [name.format('*') for name in NAMES[:pattern_count]]
+	errors:int = 0
+
+	with tempfile.TemporaryDirectory(prefix='chia-log-') as temp_dir:
+		root = Path(temp_dir)
+		make_tree(root, count)
+
+		# a recursive glob for each pattern, the way discovery used to work
+		begin = time.perf_counter()
+		globbed:List[Path] = []
+		for pattern in patterns:
+			globbed.extend(sorted(path for path in root.glob(f'**/{pattern}') if 'loop' not in path.parts))
+		glob_secs = time.perf_counter() - begin
+
+		begin = time.perf_counter()
+		walked = list(FileDiscovery(patterns).files([root]))
+		walk_secs = time.perf_counter() - begin
+
+		# the hard link is the same file as chia-0.log, and sorts first
+		expected = set(globbed) - {root / 'host00' / 'run00' / 'chia-0.log'}
+		errors += set(walked) != expected or len(walked) != len(set(walked))
+		errors += walked != sorted(walked, key=str)
+
+		excluded = list(FileDiscovery(patterns, excludes=['host01', 'debug-*']).files([root]))
+		errors += any('host01' in path.parts or path.name.startswith('debug-') for path in excluded)
+		errors += bool(list(FileDiscovery(patterns, max_depth=1).files([root])))
+
+	print(f'files         {count:,}, {len(patterns)} patterns, {len(walked):,} found')
+	print(f'glob          {glob_secs:8.3f} s')
+	print(f'scandir walk  {walk_secs:8.3f} s, {glob_secs / walk_secs:.1f}x')
+	print(f'errors        {errors}')
+
+	if errors:
+		sys.exit(1)
+
+
+if __name__ == '__main__':
+	main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000, int(sys.argv[2]) if len(sys.argv) > 2 else 4)
@@ -0,0 +1,64 @@
+'''
+Compare the single-pass line parser (Plot.extract) to the regex extractors
+(Plot.extract_regex). Both must produce identical plots.
+
+	$ python -m benchmarks.extract [plots]
+'''
+
+# system packages
+from pathlib import Path
+from typing  import Any, List, Tuple
+import io
+import sys
+import time
+
+# local packages
+from benchmarks.synthetic import log_file
+from src.config           import Config
+from src.plot             import Plot
+from src.plotsplitter     import PlotSplitter, flatten
+
+
+def values (plot:Plot) -> Tuple[Any, ...]:
+	'''Return every extracted value of a plot, for comparing two plots.'''
+
+	return tuple(plot.to_record())
+
+
+def main (count:int) -> None:
+	config = Config()
+	data = log_file(count).encode()
+	plots = list(PlotSplitter().split(io.BytesIO(data)))
+	path = Path('synthetic.log')
+
+	# regex extractors over the flattened plot
+	begin = time.perf_counter()
+	regex_plots:List[Plot] = []
+	for index, lines in enumerate(plots, 1):
+		plot = Plot(config, path, index)
+		plot.extract_regex(flatten(lines))
+		regex_plots.append(plot)
+	regex_secs = time.perf_counter() - begin
+
+	# single-pass line parser
+	begin = time.perf_counter()
+	line_plots:List[Plot] = []
+	for index, lines in enumerate(plots, 1):
+		plot = Plot(config, path, index)
+		plot.extract(lines)
+		line_plots.append(plot)
+	line_secs = time.perf_counter() - begin
+
+	mismatch = sum(1 for a, b in zip(regex_plots, line_plots) if values(a) != values(b))
+
+	print(f'plots       {len(plots):,}')
+	print(f'regex       {len(plots) / regex_secs:10,.0f} plots/s')
+	print(f'single-pass {len(plots) / line_secs:10,.0f} plots/s ({regex_secs / line_secs:.1f}x)')
+	print(f'mismatches  {mismatch}')
+
+	if mismatch:
+		sys.exit(1)
+
+
+if __name__ == '__main__':
+	main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,65 @@
+'''
+Measure the time the extractors spend on debug messages that are not
+printed. The lazy Logger only formats a message when its level is enabled;
+EagerLogger formats every message first, the same work as the f-strings
+the extractors used before.
+
+	$ python -m benchmarks.logger [plots]
+'''
+
+# system packages
+from pathlib import Path
+from typing  import Any, List
+import io
+import sys
+import time
+
+# local packages
+from benchmarks.synthetic import log_file
+from src.config           import Config
+from src.logger           import Logger
+from src.plot             import Plot
+from src.plotsplitter     import PlotSplitter, flatten
+
+
+class EagerLogger (Logger):
+	'''Format every message, whether it is printed or not.'''
+
+	def is_enabled (self, level:int) -> bool:
+		return True
+
+	def debug (self, msg:str, *args:Any) -> None:
+		super().debug(msg % args)
+
+
+def extract (config:Config, plots:List[List[str]], regex:bool) -> float:
+	'''Extract the plots and return the seconds it took.'''
+
+	path = Path('synthetic.log')
+
+	begin = time.perf_counter()
+	for index, lines in enumerate(plots, 1):
+		plot = Plot(config, path, index)
+		if regex:
+			plot.extract_regex(flatten(lines))
+		else:
+			plot.extract(lines)
+	return time.perf_counter() - begin
+
+
+def main (count:int) -> None:
+	plots = list(PlotSplitter().split(io.BytesIO(log_file(count).encode())))
+
+	lazy = Config()
+	eager = Config()
+	eager._logger = EagerLogger()
+
+	print(f'plots        {len(plots):,}')
+	for label, regex in (('single-pass', False), ('regex', True)):
+		eager_secs = extract(eager, plots, regex)
+		lazy_secs = extract(lazy, plots, regex)
+		print(f'{label:12} eager {eager_secs:6.2f} s, lazy {lazy_secs:6.2f} s, saved {(eager_secs - lazy_secs) / eager_secs:.0%}')
+
+
+if __name__ == '__main__':
+	main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,130 @@
+'''
+Compare extracting a large local log file line by line (extract_stream())
+against scanning the memory-mapped bytes (extract_mmap()), which decodes
+only the captured values. Both must extract the same plots and incomplete
+plots, on the synthetic log and on the adversarial cases (see
+benchmarks/adversarial.py). The throughput and the peak resident memory of
+each path are measured in a process of its own.
+
+	$ python -m benchmarks.mapped [--plots 20000]
+'''
+
+# system packages
+from pathlib import Path
+from typing  import Dict, List, Tuple
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+
+# local packages
+from benchmarks             import adversarial
+from benchmarks.split       import long_lines
+from benchmarks.suite       import peak_rss
+from benchmarks.synthetic   import log_file
+from src.config             import Config
+from src.logreader          import map_log, open_log
+from src.plots              import ExtractResult, ExtractTask, extract_mmap, extract_stream
+from src.plotsplitter       import MAX_LINE_BYTES, PlotSplitter
+
+# key is the path, value is the function that extracts a file with it
+PATHS = {
+	'lines': lambda config, path, task: extract_stream(config, open_log(path), task),
+	'mmap':  lambda config, path, task: extract_mmap(config, map_log(path), task),
+}
+
+
+def extract (path:Path, name:str) -> ExtractResult:
+	'''Extract a whole file with one of the PATHS.'''
+
+	return PATHS[name](Config(), path, ExtractTask(str(path), 0, None, 1))
+
+
+def results (result:ExtractResult) -> Tuple[list, list, int, int, str]:
+	'''Return what must be the same for both paths.'''
+
+	return [plot.to_record() for plot in result.plots], result.incomplete, result.offset, result.index, result.error
+
+
+def peak_resident () -> int:
+	'''
+	Return the peak resident set size of this process in bytes. On Linux
+	ru_maxrss (see peak_rss()) keeps the peak of the parent process across
+	exec, so VmHWM is used when it is there.
+	'''
+
+	try:
+		with open('/proc/self/status') as f:
+			for line in f:
+				if line.startswith('VmHWM:'):
+					return int(line.split()[1]) * 1024
+	except OSError:
+		pass
+	return peak_rss()
+
+
+def measure (path:Path, name:str) -> None:
+	'''Extract a file with one path and print the seconds, plots, and resident memory as JSON, run in a process of its own.'''
+
+	before = peak_resident()
+	begin = time.perf_counter()
+	result = extract(path, name)
+	secs = time.perf_counter() - begin
+	print(json.dumps({'secs': secs, 'plots': len(result.plots), 'rss': peak_resident(), 'growth': peak_resident() - before}))
+
+
+def main () -> None:
+	parser = argparse.ArgumentParser(description='Compare line by line and memory-mapped extraction of a large log file.')
+	parser.add_argument('--plots', type=int, default=20000, help='plots in the log file')
+	parser.add_argument('--measure', type=str, default='', help=argparse.SUPPRESS)
+	parser.add_argument('--file', type=str, default='', help=argparse.SUPPRESS)
+	args = parser.parse_args()
+
+	if args.measure:
+		measure(Path(args.file), args.measure)
+		return
+
+	errors:int = 0
+
+	with tempfile.TemporaryDirectory(prefix='chia-log-') as temp_dir:
+		directory = Path(temp_dir)
+
+		# the same plots and incomplete plots on hostile input
+		cases:Dict[str, bytes] = {name: make(200000) for name, make in adversarial.CASES.items() if name != 'damaged'}
+		cases['long lines'] = long_lines()
+		cases['too long'] = adversarial.endless(PlotSplitter.MAX_PLOT_BYTES // 3 + 1) + log_file(2).encode()
+		cases['windows'] = log_file(20).replace('\n', '\r\n').encode()
+		cases['pieces'] = log_file(2).replace('\nID: ', '\n' + 'x' * MAX_LINE_BYTES + 'ID: 1234\nID: ', 1).encode()
+		for name, data in cases.items():
+			path = directory / f'{name}.log'
+			path.write_bytes(data)
+			lines, mapped = (results(extract(path, path_name)) for path_name in PATHS)
+			if lines != mapped:
+				print(f'error: {name}, lines found {len(lines[0])} plots {len(lines[1])} incomplete, mmap {len(mapped[0])} plots {len(mapped[1])} incomplete')
+				errors += 1
+
+		path = directory / 'chia-large.log'
+		path.write_bytes(log_file(args.plots).encode())
+		size = path.stat().st_size
+		errors += results(extract(path, 'lines')) != results(extract(path, 'mmap'))
+
+		measured:Dict[str, Dict[str, float]] = {}
+		for name in PATHS:
+			out = subprocess.run([sys.executable, '-m', 'benchmarks.mapped', '--measure', name, '--file', str(path)], check=True, capture_output=True, text=True).stdout
+			measured[name] = json.loads(out)
+			errors += measured[name]['plots'] != args.plots
+
+	print(f'file     {size / 1e6:,.1f} MB, {args.plots:,} plots, {len(cases)} hostile cases')
+	for name, m in measured.items():
+		speedup = measured['lines']['secs'] / m['secs']
+		print(f'{name:8} {m["secs"]:8.3f} s {size / 1e6 / m["secs"]:8.1f} MB/s ({speedup:.1f}x)  peak RSS {m["rss"] / 2 ** 20:7.1f} MiB (+{m["growth"] / 2 ** 20:.1f} MiB)')
+	print(f'errors   {errors}')
+
+	if errors:
+		sys.exit(1)
+
+
+if __name__ == '__main__':
+	main()
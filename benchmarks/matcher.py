@@ -0,0 +1,83 @@
+'''
+Compare the compiled plot configuration matcher (src/plotmatcher.py) with
+the loop over every configuration that Plot.set_plot_configuration() used to
+run. Both must pick the same configuration for directories listed in the
+config, and directories nested under a listed mount point must match that
+mount point.
+
+	$ python -m benchmarks.matcher [plots] [configurations]
+'''
+
+# system packages
+from pathlib import Path
+from typing  import Any, Dict, List, Optional, Tuple
+import random
+import sys
+import time
+
+# local packages
+from src.plotmatcher import PlotMatcher
+
+
+def configurations (count:int) -> List[Dict[str, Any]]:
+	'''Return plot configurations with some shared (overlapping) mount points.'''
+
+	return [{
+		'name': f'config {index}',
+		'dest': [f'/media/dest{index:03}', f'/media/dest{index + 1:03}'],
+		'temp': [f'/media/temp{index:03}', f'/media/temp{index // 2:03}'],
+	} for index in range(count)]
+
+
+def linear (plot_configs:List[Dict[str, Any]], dest_path:str, temp_dir_1:str, temp_dir_2:str) -> Optional[str]:
+	'''The original matching, one configuration at a time.'''
+
+	dest_dir = str(Path(dest_path).parent)
+	for plot_config in plot_configs:
+		if dest_dir in plot_config['dest']:
+			if temp_dir_1 in plot_config['temp'] and temp_dir_2 in plot_config['temp']:
+				return plot_config['name']
+	return None
+
+
+def main (count:int, config_count:int) -> None:
+	rng = random.Random(1)
+	plot_configs = configurations(config_count)
+
+	# (dest path, dest dir as stored by PlotTotals, temp 1, temp 2) for each plot
+	plots:List[Tuple[str, str, str, str]] = []
+	for _ in range(count):
+		plot_config = rng.choice(plot_configs)
+		dest = rng.choice(plot_config['dest'])
+		plots.append((f'{dest}/plot.plot', f'{dest}/', rng.choice(plot_config['temp']), rng.choice(plot_config['temp'])))
+
+	begin = time.perf_counter()
+	expected = [linear(plot_configs, dest_path, temp_1, temp_2) for dest_path, _, temp_1, temp_2 in plots]
+	linear_secs = time.perf_counter() - begin
+
+	begin = time.perf_counter()
+	matcher = PlotMatcher(plot_configs)
+	compile_secs = time.perf_counter() - begin
+
+	begin = time.perf_counter()
+	matched = [matcher.match(dest_dir, temp_1, temp_2) for _, dest_dir, temp_1, temp_2 in plots]
+	matcher_secs = time.perf_counter() - begin
+
+	errors = sum(a != b for a, b in zip(expected, matched))
+
+	# nested directories match their mount point, similar names do not
+	nested = PlotMatcher(plot_configs)
+	errors += nested.match('/media/dest000/sub/', '/media/temp000/a/b', '/media/temp000') != 'config 0'
+	errors += nested.match('/media/dest0000/', '/media/temp000', '/media/temp000') is not None
+
+	print(f'plots         {count:,}, {config_count} configurations, {len(matcher.overlaps())} overlapping pairs')
+	print(f'linear        {linear_secs:8.3f} s')
+	print(f'matcher       {matcher_secs:8.3f} s (compiled in {compile_secs * 1000:.1f} ms), {linear_secs / matcher_secs:,.1f}x')
+	print(f'errors        {errors}')
+
+	if errors:
+		sys.exit(1)
+
+
+if __name__ == '__main__':
+	main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000, int(sys.argv[2]) if len(sys.argv) > 2 else 50)
@@ -0,0 +1,130 @@
+'''
+Measure the memory used by extracted plots, in bytes per plot. The plots
+are post-processed (times and dates) and kept in a list, the same as a run
+that keeps the full history in memory.
+
+The baseline is the same plots in the layout Plot had before __slots__: each
+plot and part an object with a __dict__, the plot ID a hex string, the temp
+and dest paths separate strings, and the table times a list of NamedTuples.
+It is rebuilt from each extracted plot (see dict_plot()), so both hold the
+same values.
+
+	$ python -m benchmarks.memory [plots]
+'''
+
+# system packages
+from pathlib import Path
+from typing  import Any, List, Tuple
+import io
+import sys
+import time
+import tracemalloc
+
+# local packages
+from benchmarks.synthetic import log_file
+from src.config           import Config
+from src.plot             import Plot
+from src.plotsplitter     import PlotSplitter
+
+# number of distinct plot logs, the plots cycle through them
+DISTINCT = 1000
+
+
+class DictPart:
+	'''A plot, or a part of a plot, with its values in a __dict__.'''
+
+
+def fresh (text:str) -> str:
+	'''Return a string that is not shared with other plots (not interned).'''
+
+	return ''.join((text[:1], text[1:])) if len(text) > 1 else text
+
+
+def dict_part (part:Any, skip:Tuple[str, ...] = ()) -> DictPart:
+	'''Return the values of a slotted part in a DictPart(), except the slots in skip.'''
+
+	copy = DictPart()
+	for name in type(part).__slots__:
+		if name not in skip:
+			setattr(copy, name, getattr(part, name))
+	return copy
+
+
+def dict_plot (plot:Plot) -> DictPart:
+	'''Return a plot in the layout before __slots__ (the baseline).'''
+
+	copy = dict_part(plot, ('parameters', 'phase_1', 'phase_2', 'phase_3', 'phase_4', 'totals'))
+
+	copy.parameters = dict_part(plot.parameters, ('_temp_dir_1', '_temp_dir_2', '_plot_id'))		# type: ignore
+	copy.parameters.temp_dir_1 = fresh(plot.parameters.temp_dir_1)		# type: ignore
+	copy.parameters.temp_dir_2 = fresh(plot.parameters.temp_dir_2)		# type: ignore
+	copy.parameters.plot_id = plot.parameters.plot_id					# type: ignore
+
+	for name in ('phase_1', 'phase_2', 'phase_3'):
+		phase = getattr(plot, name)
+		setattr(copy, name, dict_part(phase, ('_table_time',)))
+		getattr(copy, name).table_time = list(phase.table_time)
+	copy.phase_4 = dict_part(plot.phase_4)		# type: ignore
+
+	copy.totals = dict_part(plot.totals, ('_temp_dir', '_temp_name', '_dest_dir', '_dest_name'))		# type: ignore
+	copy.totals.temp_path = fresh(plot.totals.temp_path)		# type: ignore
+	copy.totals.dest_path = fresh(plot.totals.dest_path)		# type: ignore
+
+	return copy
+
+
+def measure (config:Config, path:Path, logs:List[List[str]], count:int, baseline:bool) -> Tuple[List[Any], int, float]:
+	'''Extract count plots and return them, the bytes they use, and the seconds.'''
+
+	tracemalloc.start()
+	before, _ = tracemalloc.get_traced_memory()
+
+	begin = time.perf_counter()
+	plots:List[Any] = []
+	for index in range(count):
+		plot = Plot(config, path, index + 1)
+		plot.extract(logs[index % len(logs)])
+		plot.set_plot_time()
+		plot.set_plot_date()
+		plots.append(dict_plot(plot) if baseline else plot)
+	secs = time.perf_counter() - begin
+
+	after, _ = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+
+	return plots, after - before, secs
+
+
+def main (count:int) -> None:
+	config = Config()
+	path = Path('synthetic.log')
+	logs = list(PlotSplitter().split(io.BytesIO(log_file(min(count, DISTINCT)).encode())))
+
+	baseline, baseline_bytes, _ = measure(config, path, logs, count, True)
+	baseline_ids = [plot.parameters.plot_id for plot in baseline]
+	del baseline
+
+	plots, used, secs = measure(config, path, logs, count, False)
+
+	# every plot must have the values of its log
+	bad = 0
+	for index, plot in enumerate(plots):
+		lines = logs[index % len(logs)]
+		if plot.parameters.plot_id != lines[1][4:] or plot.totals.end_time is None:
+			bad += 1
+		elif plot.parameters.plot_id != baseline_ids[index]:
+			bad += 1
+		elif len(plot.phase_1.table_time) != 7 or len(plot.phase_2.table_time) != 6 or len(plot.phase_3.table_time) != 6:
+			bad += 1
+
+	print(f'plots          {count:,} (extracted in {secs:.1f} s)')
+	print(f'baseline       {baseline_bytes / 2 ** 20:8,.1f} MiB {baseline_bytes / count:8,.0f} bytes per plot (__dict__ layout)')
+	print(f'slotted        {used / 2 ** 20:8,.1f} MiB {used / count:8,.0f} bytes per plot ({baseline_bytes / used:.1f}x less)')
+	print(f'bad plots      {bad}')
+
+	if bad:
+		sys.exit(1)
+
+
+if __name__ == '__main__':
+	main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
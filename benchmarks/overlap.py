@@ -0,0 +1,71 @@
+'''
+Time the sweep-line overlap engine on synthetic plots. At 1,000 plots the
+result is checked against the O(n^2) comparison of every pair of plots.
+
+	$ python -m benchmarks.overlap [plots ...]
+'''
+
+# system packages
+from datetime import datetime, timedelta
+from typing   import Dict, List
+import random
+import sys
+import time
+
+# local packages
+from src.overlap import Interval, Overlaps
+
+
+def intervals (count:int, plotters:int = 8, seed:int = 1) -> List[Interval]:
+	'''Return plots from several plotters, each plotter running plots back to back.'''
+
+	rng = random.Random(seed)
+	out:List[Interval] = []
+
+	for plotter in range(plotters):
+		start = datetime(2021, 4, 25) + timedelta(minutes=rng.uniform(0, 240))
+		for seq in range(plotter, count, plotters):
+			end = start + timedelta(seconds=rng.uniform(6, 12) * 3600)
+			out.append(Interval(f'{seq:064x}', start, end))
+			start = end + timedelta(seconds=rng.uniform(0, 600))
+
+	return out
+
+
+def naive (plots:List[Interval]) -> Dict[str, Dict[str, timedelta]]:
+	'''Compare every plot to every other plot.'''
+
+	out:Dict[str, Dict[str, timedelta]] = {}
+	for source in plots:
+		out[source.key] = {}
+		for dest in plots:
+			if source.key == dest.key or source.end < dest.start or dest.end < source.start:
+				continue
+			out[source.key][dest.key] = min(source.end, dest.end) - max(source.start, dest.start)
+	return out
+
+
+def main (counts:List[int]) -> None:
+	for count in counts:
+		plots = intervals(count)
+
+		begin = time.perf_counter()
+		overlaps = Overlaps()
+		overlaps.process(plots)
+		secs = time.perf_counter() - begin
+
+		pairs = sum(len(other) for other in overlaps.overlaps.values()) // 2
+		print(f'plots {count:8,}  pairs {pairs:9,}  max concurrency {overlaps.max_concurrency:3}  sweep {secs:8.3f} s')
+
+		if count <= 1000:
+			begin = time.perf_counter()
+			expected = naive(plots)
+			secs = time.perf_counter() - begin
+			status = 'same' if expected == overlaps.overlaps else 'DIFFERENT'
+			print(f'{"":15}naive {secs:8.3f} s, result {status}')
+			if status != 'same':
+				sys.exit(1)
+
+
+if __name__ == '__main__':
+	main([int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000])
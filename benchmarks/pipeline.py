@@ -0,0 +1,101 @@
+'''
+Compare a staged run, where every log file is extracted before the plots
+are post-processed and analyzed, against the pipelined run of chia-log.py:
+file discovery and reading in background threads, and each plot analyzed
+as soon as it is extracted (see Plots.stream_to()). Both must extract the
+same plots in the same order and print the same report.
+
+	$ python -m benchmarks.pipeline [--dir directory] [--readers 4] [generator options]
+'''
+
+# system packages
+from contextlib import redirect_stdout
+from pathlib    import Path
+from typing     import List, Tuple
+import argparse
+import io
+import sys
+import tempfile
+import time
+
+# local packages
+from benchmarks       import synthetic
+from benchmarks.suite import log_files
+from src.analyze      import Analyze
+from src.config       import Config
+from src.plots        import Plots
+
+
+def staged (config:Config) -> Tuple[List[str], str]:
+	'''Discover, extract, post-process, and analyze one stage after another, return the plot IDs and report.'''
+
+	plots = Plots(config)
+	plots.extract_files(log_files(config)(), 1)
+	plots.post_process()
+
+	analyze = Analyze(config)
+	analyze.process(plots)
+	return [plot.parameters.plot_id for plot in plots.plots], report(analyze, plots)
+
+
+def pipelined (config:Config) -> Tuple[List[str], str]:
+	'''Run the stages as a pipeline, the way chia-log.py does, return the plot IDs and report.'''
+
+	plots = Plots(config)
+	analyze = Analyze(config)
+	plots.stream_to(analyze.add_plot)
+
+	plots.extract_files(iter(log_files(config)()), 1)
+	analyze.finish(plots)
+	return [plot.parameters.plot_id for plot in plots.plots], report(analyze, plots)
+
+
+def report (analyze:Analyze, plots:Plots) -> str:
+	out = io.StringIO()
+	with redirect_stdout(out):
+		analyze.print(plots)
+	return out.getvalue()
+
+
+def main () -> None:
+	parser = argparse.ArgumentParser(description='Time a staged and a pipelined run on a synthetic corpus.')
+	parser.add_argument('--dir', type=str, default='', help='directory for the corpus (default is a temporary directory)')
+	parser.add_argument('--readers', type=int, default=4, help='number of log files read ahead in the pipelined run')
+	synthetic.add_arguments(parser)
+	parser.set_defaults(plots=5000)
+	args = parser.parse_args()
+
+	options = synthetic.options(args)
+	errors:int = 0
+
+	with tempfile.TemporaryDirectory(prefix='chia-log-') as temp_dir:
+		directory = Path(args.dir).resolve() if args.dir else Path(temp_dir)
+
+		synthetic.write_logs(directory, options)
+		synthetic.write_config(directory / 'chia-log.yaml', directory, options)
+
+		results = []
+		for name, run, readers in (('staged', staged, 0), ('pipelined', pipelined, args.readers)):
+			config = Config()
+			config.cli_options(str(directory / 'chia-log.yaml'), False, '', 'text', 0, option_readers=readers)
+			if not config.valid:
+				sys.exit(1)
+
+			begin = time.perf_counter()
+			plot_ids, text = run(config)
+			secs = time.perf_counter() - begin
+
+			results.append((plot_ids, text))
+			print(f'{name:10} {secs:8.2f} s {len(plot_ids) / secs:10,.0f} plots/s')
+
+		errors += results[0][0] != results[1][0]
+		errors += results[0][1] != results[1][1]
+
+	print(f'plots      {len(results[0][0]):,}')
+	print(f'errors     {errors}')
+	if errors:
+		sys.exit(1)
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,103 @@
+'''
+Time the report writers (--output csv, json, markdown with --details) on a
+synthetic corpus, and compare each with writing the same number of bytes
+in one call, which is about as fast as the disk goes. Each report is read
+back to check it has a row for every plot.
+
+	$ python -m benchmarks.report [--dir directory] [generator options]
+'''
+
+# system packages
+from pathlib import Path
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+import time
+
+# local packages
+from benchmarks  import synthetic
+from src.analyze import Analyze
+from src.config  import Config
+from src.plots   import Plots
+
+
+def plot_rows (path:Path, output:str) -> int:
+	'''Return the number of "plot" rows in a report.'''
+
+	with open(path, newline='') as f:
+		if output == 'csv':
+			return sum(row[:1] == ['plot'] for row in csv.reader(f))
+		if output == 'json':
+			return sum(json.loads(line)['table'] == 'plot' for line in f)
+
+		# markdown, the rows between "## plot" and the next heading
+		count, in_plot = 0, False
+		for line in f:
+			if line.startswith('## '):
+				in_plot = line == '## plot\n'
+			elif in_plot and line.startswith('| ') and not line.startswith('| log_file'):
+				count += 1
+		return count
+
+
+def main () -> None:
+	parser = argparse.ArgumentParser(description='Time the report writers on a synthetic corpus.')
+	parser.add_argument('--dir', type=str, default='', help='directory for the corpus and reports (default is a temporary directory)')
+	synthetic.add_arguments(parser)
+	parser.set_defaults(plots=20000)
+	args = parser.parse_args()
+
+	options = synthetic.options(args)
+	errors:int = 0
+
+	with tempfile.TemporaryDirectory(prefix='chia-log-') as temp_dir:
+		directory = Path(args.dir).resolve() if args.dir else Path(temp_dir)
+
+		corpus = synthetic.write_logs(directory, options)
+		synthetic.write_config(directory / 'chia-log.yaml', directory, options)
+
+		config = Config()
+		config.cli_options(str(directory / 'chia-log.yaml'), True, '', 'text', 0)
+		if not config.valid:
+			sys.exit(1)
+
+		plots = Plots(config)
+		plots.extract_files(sorted(directory.glob('*.log')), 1)
+		plots.post_process()
+
+		analyze = Analyze(config)
+		analyze.process(plots)
+		print(f'plots         {len(plots.plots):,}')
+
+		for output in ('csv', 'json', 'markdown'):
+			path = directory / f'report.{output}'
+			config.cli_options(str(directory / 'chia-log.yaml'), True, '', output, 0, option_output_file=str(path))
+
+			begin = time.perf_counter()
+			analyze.print(plots)
+			secs = time.perf_counter() - begin
+			size = path.stat().st_size
+
+			# the same number of bytes in one write
+			raw = directory / 'raw.bin'
+			data = os.urandom(size)
+			begin = time.perf_counter()
+			with open(raw, 'wb') as f:
+				f.write(data)
+			raw_secs = time.perf_counter() - begin
+			raw.unlink()
+
+			rows = plot_rows(path, output)
+			errors += rows != len(plots.plots)
+			print(f'{output:12} {secs:7.3f} s {size / 1e6:8.1f} MB {size / 1e6 / secs:8.1f} MB/s {rows / secs:10,.0f} plots/s  (one write {size / 1e6 / raw_secs:8.1f} MB/s)')
+
+	print(f'errors        {errors}')
+	if errors:
+		sys.exit(1)
+
+
+if __name__ == '__main__':
+	main()
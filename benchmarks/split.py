@@ -0,0 +1,123 @@
+'''
+Split one large log file at plot boundaries and extract the pieces in
+parallel. The boundary scan of a memory-mapped file
+(PlotSplitter.scan_mmap) must find the same offsets as the line scan
+(PlotSplitter.scan), on the synthetic log and on the adversarial cases
+(see benchmarks/adversarial.py), and extracting with more jobs must give
+the same plots with the same indexes.
+
+	$ python -m benchmarks.split [--plots 10000] [--jobs N]
+'''
+
+# system packages
+from pathlib import Path
+from typing  import Dict, List, Tuple
+import argparse
+import io
+import mmap
+import os
+import sys
+import tempfile
+import time
+
+# local packages
+from benchmarks             import adversarial
+from benchmarks.synthetic   import log_file
+from src.config             import Config
+from src.plots              import Plots
+from src.plotsplitter       import MAX_LINE_BYTES, PlotSplitter
+
+
+def long_lines () -> bytes:
+	'''Plots with markers in lines longer than MAX_LINE_BYTES, some across the pieces read_lines() returns.'''
+
+	plot = log_file(1).encode()
+	pad = b'x' * (MAX_LINE_BYTES - 10)
+	return b''.join((
+		plot,
+		pad + b'Starting plotting progress ' + plot,		# the marker is split between two pieces
+		pad * 3 + plot,
+		b'Renamed final file ' + pad + b'Starting plotting progress ' + pad + b'Renamed final file\n',
+		plot.replace(b'\n', b' '),							# a plot on one line
+		plot,
+	))
+
+
+def scan_both (data:bytes, start:int = 0) -> Tuple[List[int], List[int]]:
+	'''Return the offsets found by scan() and scan_mmap() from a byte offset.'''
+
+	f = io.BytesIO(data)
+	f.seek(start)
+	lines = list(PlotSplitter(start).scan(f))
+
+	with tempfile.TemporaryFile() as temp:
+		temp.write(data)
+		temp.flush()
+		with mmap.mmap(temp.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+			mapped_offsets = list(PlotSplitter(start).scan_mmap(mapped))
+
+	return lines, mapped_offsets
+
+
+def extract (config:Config, path:Path, jobs:int) -> Tuple[float, List[Tuple[str, int]]]:
+	'''Extract a file, return the seconds and the plot IDs with their index.'''
+
+	plots = Plots(config)
+	begin = time.perf_counter()
+	plots.extract_files([path], jobs)
+	return time.perf_counter() - begin, [(plot.parameters.plot_id, plot.index) for plot in plots.plots]
+
+
+def main () -> None:
+	parser = argparse.ArgumentParser(description='Split a large log file at plot boundaries and extract it in parallel.')
+	parser.add_argument('--plots', type=int, default=10000, help='plots in the log file')
+	parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help='processes for the parallel extract')
+	args = parser.parse_args()
+
+	errors:int = 0
+
+	# the same boundaries on hostile input, from the start and part way
+	cases:Dict[str, bytes] = {name: make(200000) for name, make in adversarial.CASES.items() if name != 'damaged'}
+	cases['long lines'] = long_lines()
+	cases['too long'] = adversarial.endless(PlotSplitter.MAX_PLOT_BYTES // 3 + 1) + log_file(2).encode()
+	for name, data in cases.items():
+		for start in (0, len(data) // 3):
+			lines, mapped = scan_both(data, start)
+			if lines != mapped:
+				print(f'error: {name} from {start}, scan found {len(lines)} plots, scan_mmap {len(mapped)}')
+				errors += 1
+
+	with tempfile.TemporaryDirectory(prefix='chia-log-') as temp_dir:
+		path = Path(temp_dir) / 'chia-large.log'
+		path.write_bytes(log_file(args.plots).encode())
+		size = path.stat().st_size
+
+		begin = time.perf_counter()
+		with open(path, 'rb') as f:
+			lines = list(PlotSplitter().scan(f))
+		scan_secs = time.perf_counter() - begin
+
+		begin = time.perf_counter()
+		with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+			mapped = list(PlotSplitter().scan_mmap(data))
+		mmap_secs = time.perf_counter() - begin
+		errors += lines != mapped
+
+		config = Config()
+		serial_secs, serial = extract(config, path, 1)
+		parallel_secs, parallel = extract(config, path, args.jobs)
+		errors += serial != parallel
+
+	print(f'file          {size / 1e6:,.1f} MB, {len(lines):,} plots, {len(cases)} hostile cases')
+	print(f'scan          {scan_secs:8.3f} s {size / 1e6 / scan_secs:8.1f} MB/s')
+	print(f'scan_mmap     {mmap_secs:8.3f} s {size / 1e6 / mmap_secs:8.1f} MB/s ({scan_secs / mmap_secs:.1f}x)')
+	print(f'extract -j 1  {serial_secs:8.3f} s')
+	print(f'extract -j {args.jobs:<2} {parallel_secs:8.3f} s ({serial_secs / parallel_secs:.1f}x on {os.cpu_count()} CPUs)')
+	print(f'errors        {errors}')
+
+	if errors:
+		sys.exit(1)
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,69 @@
+'''
+Check and time the streaming statistics used by the plot configuration
+summaries (src/plotstats.py). Quantiles must be within the sketch's relative
+error of the exact quantiles, a sketch merged from parts must equal the
+sketch of the whole stream, and memory must not grow with the number of
+values.
+
+	$ python -m benchmarks.stats [values]
+'''
+
+# system packages
+from math     import isclose
+from typing   import List
+import random
+import statistics
+import sys
+import time
+
+# local packages
+from src.plotstats import PhaseStats, QuantileSketch
+
+QUANTILES = (0.01, 0.1, 0.5, 0.9, 0.99, 0.999)
+
+
+def main (count:int) -> None:
+	rng = random.Random(1)
+	values:List[float] = [rng.lognormvariate(9.0, 0.3) for _ in range(count)]
+
+	begin = time.perf_counter()
+	whole = PhaseStats(values)
+	secs = time.perf_counter() - begin
+
+	errors:int = 0
+
+	# quantiles are within the relative error of a value at that rank
+	ordered = sorted(values)
+	print(f'values       {count:,} ({count / secs:,.0f} per second)')
+	for q in QUANTILES:
+		exact = ordered[int(q * (count - 1) + 0.5)]
+		estimate = whole.quantile(q)
+		error = abs(estimate - exact) / exact
+		errors += error > QuantileSketch.RELATIVE_ERROR
+		print(f'p{q * 100:<6g}     exact {exact:10,.1f} sketch {estimate:10,.1f} error {error:.3%}')
+
+	# mean and standard deviation match the exact values
+	mean, stdev = statistics.fmean(values), statistics.stdev(values)
+	errors += not isclose(whole.mean, mean, rel_tol=1e-9) or not isclose(whole.stdev, stdev, rel_tol=1e-9)
+	errors += whole.min != ordered[0] or whole.max != ordered[-1]
+	print(f'mean         exact {mean:10,.1f} stream {whole.mean:10,.1f}')
+	print(f'stdev        exact {stdev:10,.1f} stream {whole.stdev:10,.1f}')
+
+	# merging parts (separate runs or processes) gives the same result
+	parts = [PhaseStats(values[start:start + count // 7 + 1]) for start in range(0, count, count // 7 + 1)]
+	merged = PhaseStats()
+	for part in parts:
+		merged.merge(part)
+	errors += any(merged.quantile(q) != whole.quantile(q) for q in QUANTILES)
+	errors += not isclose(merged.mean, mean, rel_tol=1e-9) or not isclose(merged.stdev, stdev, rel_tol=1e-9)
+	print(f'merged       {len(parts)} parts, quantiles {"equal" if all(merged.quantile(q) == whole.quantile(q) for q in QUANTILES) else "differ"}')
+
+	print(f'buckets      {len(whole._sketch._buckets):,}')
+	print(f'errors       {errors}')
+
+	if errors:
+		sys.exit(1)
+
+
+if __name__ == '__main__':
+	main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,159 @@
+'''
+Time each stage of a chia-log run on a synthetic corpus (see
+benchmarks/synthetic.py): file discovery, Plots.extract, Plots.post_process,
+Analyze.process, and the report. Each stage reports MB/s, plots/s, and the
+peak RSS so far. Save the results as JSON to compare runs over time.
+
+	$ python -m benchmarks.suite [--dir directory] [--jobs 1] [--json results.json] [generator options]
+
+Without --dir the corpus is written to a temporary directory.
+'''
+
+# system packages
+from contextlib import redirect_stdout
+from datetime   import datetime
+from pathlib    import Path
+from typing     import Any, Callable, Dict, List
+import argparse
+import importlib.util
+import io
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+	import resource
+except ImportError:			# not available on Windows, peak RSS is not reported
+	resource = None			# type: ignore
+
+# local packages
+from benchmarks  import synthetic
+from src.analyze import Analyze
+from src.config  import Config
+from src.plots   import Plots
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def peak_rss () -> int:
+	'''Return the peak resident set size of this process in bytes, or 0 if it is not known.'''
+
+	if resource is None:
+		return 0
+
+	rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def git_commit () -> str:
+	try:
+		return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+	except (OSError, subprocess.CalledProcessError):
+		return ''
+
+
+def log_files (config:Config) -> Callable[[], List[Path]]:
+	'''Return a function that discovers the log files the way chia-log.py does.'''
+
+	spec = importlib.util.spec_from_file_location('chia_log', ROOT / 'chia-log.py')
+	assert spec and spec.loader
+	chia_log = importlib.util.module_from_spec(spec)
+	spec.loader.exec_module(chia_log)
+
+	main = chia_log.Main(config)
+	return lambda: list(main._log_files())
+
+
+def run (directory:Path, jobs:int, corpus:synthetic.Corpus) -> Dict[str, Dict[str, Any]]:
+	'''Run each stage and return the results, key is the stage name.'''
+
+	config = Config()
+	config.cli_options(str(directory / 'chia-log.yaml'), False, '', 'text', 0, jobs)
+	if not config.valid:
+		sys.exit(1)
+
+	stages:Dict[str, Dict[str, Any]] = {}
+
+	def stage (name:str, work:Callable[[], Any], size:int = 0) -> Any:
+		begin = time.perf_counter()
+		result = work()
+		secs = time.perf_counter() - begin
+
+		stages[name] = {
+			'seconds':  secs,
+			'mb_per_s': size / 1e6 / secs if size and secs else None,
+			'plots_per_s': corpus.plots / secs if secs else None,
+			'peak_rss': peak_rss(),
+		}
+		return result
+
+	files = stage('discovery', log_files(config))
+
+	plots = Plots(config)
+	stage('extract', lambda: plots.extract_files(files, config.jobs), corpus.size)
+	stage('post_process', plots.post_process)
+
+	analyze = Analyze(config)
+	stage('analyze', lambda: analyze.process(plots))
+
+	report = io.StringIO()
+	with redirect_stdout(report):
+		stage('report', lambda: analyze.print(plots))
+
+	stages['extract']['plots'] = len(plots.plots)
+	stages['report']['bytes'] = len(report.getvalue())
+
+	return stages
+
+
+def main () -> None:
+	parser = argparse.ArgumentParser(description='Time each stage of chia-log on a synthetic corpus.')
+	parser.add_argument('--dir', type=str, default='', help='directory for the corpus (default is a temporary directory)')
+	parser.add_argument('-j', '--jobs', type=int, default=1, help='number of processes to extract plots (0 is one per CPU)')
+	parser.add_argument('--json', type=str, default='', help='save the results to a JSON file')
+	synthetic.add_arguments(parser)
+	args = parser.parse_args()
+
+	options = synthetic.options(args)
+
+	with tempfile.TemporaryDirectory(prefix='chia-log-') as temp_dir:
+		directory = Path(args.dir).resolve() if args.dir else Path(temp_dir)
+
+		begin = time.perf_counter()
+		corpus = synthetic.write_logs(directory, options)
+		synthetic.write_config(directory / 'chia-log.yaml', directory, options)
+		print(f'corpus        {len(corpus.files):,} files, {corpus.plots:,} plots, {corpus.size / 1e6:,.1f} MB (written in {time.perf_counter() - begin:.1f} s)')
+
+		stages = run(directory, args.jobs, corpus)
+
+	for name, values in stages.items():
+		mb_per_s = f'{values["mb_per_s"]:9,.1f} MB/s' if values['mb_per_s'] else ' ' * 14
+		print(f'{name:13} {values["seconds"]:8.3f} s {mb_per_s} {values["plots_per_s"]:12,.0f} plots/s  peak RSS {values["peak_rss"] / 2 ** 20:,.0f} MiB')
+
+	results = {
+		'date':     datetime.now().isoformat(timespec='seconds'),
+		'commit':   git_commit(),
+		'python':   platform.python_version(),
+		'platform': platform.platform(),
+		'jobs':     args.jobs,
+		'options':  options._asdict(),
+		'corpus':   {'files': len(corpus.files), 'plots': corpus.plots, 'bytes': corpus.size},
+		'stages':   stages,
+	}
+
+	if args.json:
+		with open(args.json, 'w') as f:
+			json.dump(results, f, indent=2)
+		print(f'results saved to {args.json}')
+
+	# every complete plot must be extracted
+	if stages['extract']['plots'] != corpus.plots:
+		print(f'error: extracted {stages["extract"]["plots"]:,} plots, expected {corpus.plots:,}')
+		sys.exit(1)
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,135 @@
+'''
+Compare a central run over the logs of every host against summarizing the
+logs on each host (Analyze.summarize()) and merging the summaries
+(Analyze.merge()). Each host has a copy of one log of another host, so the
+same plots are in more than one summary, and the first summary is merged
+twice, so none of its plots, complete or not, may be counted again. The
+logs have truncated and in-progress plots. The merged report must have the
+same plots and the same lines as the central report (the order of the plot
+configurations and overlaps follows the order the plots are found). The
+times do not include the report, which is the same work for both.
+
+	$ python -m benchmarks.summary [--hosts 20] [generator options]
+'''
+
+# system packages
+from contextlib import redirect_stdout
+from pathlib    import Path
+from typing     import List, Tuple
+import argparse
+import io
+import shutil
+import sys
+import tempfile
+import time
+
+# local packages
+from benchmarks       import synthetic
+from benchmarks.suite import log_files
+from src.analyze      import Analyze
+from src.config       import Config
+from src.plots        import Plots
+from src.summary      import Summary
+
+
+def load_config (path:Path) -> Config:
+	config = Config()
+	config.cli_options(str(path), False, '', 'text', 0)
+	if not config.valid:
+		sys.exit(1)
+	return config
+
+
+def extract (config:Config) -> Tuple[Plots, Analyze]:
+	'''Extract and analyze the log files of a config file, the way chia-log.py does.'''
+
+	plots = Plots(config)
+	analyze = Analyze(config)
+	plots.stream_to(analyze.add_plot)
+	plots.extract_files(iter(log_files(config)()), 1)
+	return plots, analyze
+
+
+def report (analyze:Analyze, plots:Plots) -> List[str]:
+	'''Return the lines of the report, sorted.'''
+
+	analyze.finish(plots)
+	out = io.StringIO()
+	with redirect_stdout(out):
+		analyze.print(plots)
+	return sorted(out.getvalue().splitlines())
+
+
+def main () -> None:
+	parser = argparse.ArgumentParser(description='Time a central run against summarizing each host and merging the summaries.')
+	parser.add_argument('--hosts', type=int, default=20, help='plotting machines, the log files are shared among them')
+	synthetic.add_arguments(parser)
+	parser.set_defaults(plots=10000, temp=['/media/temp001,/media/temp002', '/media/temp003,/media/temp003'], truncated=0.02, in_progress=True)
+	args = parser.parse_args()
+
+	options = synthetic.options(args)
+	errors:int = 0
+
+	with tempfile.TemporaryDirectory(prefix='chia-log-') as temp_dir:
+		directory = Path(temp_dir)
+		corpus = synthetic.write_logs(directory / 'all', options)
+
+		# the log files of each host, with a copy of a log of the next host
+		hosts = [directory / 'hosts' / f'host-{host:02}' for host in range(args.hosts)]
+		for host in hosts:
+			host.mkdir(parents=True)
+		for index, path in enumerate(corpus.files):
+			shutil.copy(path, hosts[index % args.hosts] / path.name)
+			if index < args.hosts:
+				shutil.copy(path, hosts[index - 1] / f'chia-copy-{path.name}')
+		synthetic.write_config(directory / 'central.yaml', directory / 'hosts', options)
+
+		begin = time.perf_counter()
+		plots, analyze = extract(load_config(directory / 'central.yaml'))
+		central_secs = time.perf_counter() - begin
+		central_plots = sorted(plot.parameters.plot_id for plot in plots.plots)
+		central_incomplete = list(plots.incomplete)
+		central = report(analyze, plots)
+
+		for records in (False, True):
+			summary_files:List[Path] = []
+			summarize_secs:float = 0.0
+			for host in hosts:
+				synthetic.write_config(host / 'chia-log.yaml', host, options)
+				begin = time.perf_counter()
+				plots, analyze = extract(load_config(host / 'chia-log.yaml'))
+				summary_files.append(directory / f'{host.name}.json.gz')
+				analyze.summarize(plots, host.name, records).save(summary_files[-1])
+				summarize_secs += time.perf_counter() - begin
+
+			begin = time.perf_counter()
+			config = load_config(directory / 'central.yaml')
+			plots = Plots(config)
+			analyze = Analyze(config)
+			for summary_file in summary_files + summary_files[:1]:
+				summary = Summary.load(summary_file)
+				analyze.merge(summary, plots.add_summary(summary))
+			merge_secs = time.perf_counter() - begin
+			merged = report(analyze, plots)
+
+			if sorted(plot.parameters.plot_id for plot in plots.plots) != central_plots:
+				print(f'error: records {records}, merged {len(plots.plots)} plots, central {len(central_plots)}')
+				errors += 1
+			if len(plots.incomplete) != len(central_incomplete):
+				print(f'error: records {records}, merged {len(plots.incomplete)} incomplete plots, central {len(central_incomplete)}')
+				errors += 1
+			if merged != central:
+				print(f'error: records {records}, {len(set(merged) ^ set(central))} report lines are different')
+				errors += 1
+
+			size = sum(path.stat().st_size for path in summary_files)
+			print(f'records {str(records):5}  summarize {summarize_secs:7.2f} s on {args.hosts} hosts  merge {merge_secs:7.3f} s ({central_secs / merge_secs:5.1f}x)  summaries {size / 2 ** 10:8,.1f} KiB')
+
+	print(f'central         {central_secs:7.2f} s  {corpus.size / 2 ** 20:,.1f} MiB of logs, {len(central_plots):,} plots, {len(central_incomplete):,} incomplete')
+	print(f'errors          {errors}')
+	if errors:
+		sys.exit(1)
+
+
+if __name__ == '__main__':
+	main()
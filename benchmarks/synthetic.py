@@ -0,0 +1,255 @@
+'''
+Write deterministic chiapos logs, in the format "chia plots create" writes,
+for benchmarks. Each log file is one plotter creating plots one after
+another; the plotters start "stagger" seconds apart, so their plots overlap.
+
+	$ python -m benchmarks.synthetic directory [--plots 1000] [--per-file 10] ...
+
+The directory gets the log files and a chia-log.yaml that reads them.
+'''
+
+# system packages
+from datetime import datetime, timedelta
+from pathlib  import Path
+from typing   import Any, Dict, List, NamedTuple, Optional, Tuple
+import argparse
+import hashlib
+import random
+
+# third party packages
+import yaml
+
+DAYS   = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+
+def time_stamp (t:datetime) -> str:
+	'''Return a chiapos time stamp, such as "Sat May  1 03:10:43 2021".'''
+
+	return f'{DAYS[t.weekday()]} {MONTHS[t.month - 1]} {t.day:2} {t.hour:02}:{t.minute:02}:{t.second:02} {t.year}'
+
+
+class Options (NamedTuple):
+	'''The corpus written by write_logs().'''
+
+	plots:int = 1000						# number of plots, including truncated and in-progress plots
+	per_file:int = 10						# plots per log file (one plotter)
+	k_sizes:Tuple[int, ...] = (32,)			# plot sizes, chosen at random
+	threads:Tuple[int, ...] = (2, 4, 6, 8)	# thread counts, chosen at random
+	temp_dirs:Tuple[Tuple[str, str], ...] = (('/media/temp001', '/media/temp002'),)
+	dest_dirs:Tuple[str, ...] = ('/media/dest001',)
+	stagger:float = 3600.0					# seconds between the start of each plotter
+	truncated:float = 0.0					# fraction of plots that stop part way and are started again
+	in_progress:bool = False				# the last plot of each file is still running
+	seed:int = 1
+
+
+class Corpus (NamedTuple):
+	'''The log files written by write_logs().'''
+
+	files:List[Path]
+	plots:int								# number of complete plots
+	size:int								# bytes in all files
+
+
+def plot_log (rng:random.Random, start:datetime, seq:int, temp_1:str = '/media/temp001', temp_2:str = '/media/temp002', dest:str = '/media/dest001', threads:int = 4, k:int = 32, truncate:bool = False) -> Tuple[str, datetime]:
+	'''
+	Return the log of one plot, as written by "chia plots create", and the
+	time the plot finished. The plot ID is derived from "seq" so the output is
+	deterministic for a given random number generator. A truncated plot stops
+	part way, the way a plot that crashed or is still running does.
+	'''
+
+	plot_id = hashlib.sha256(str(seq).encode()).hexdigest()
+	name = f'plot-k{k}-{start:%Y-%m-%d-%H-%M}-{plot_id}.plot'
+	scale = 2.0 ** (k - 32)			# times and sizes double with each k
+	t = start
+	out:List[str] = []
+
+	out.append(f'Starting plotting progress into temporary dirs: {temp_1} and {temp_2}')
+	out.append(f'ID: {plot_id}')
+	out.append(f'Plot size is: {k}')
+	out.append('Buffer size is: 4096MiB')
+	out.append('Using 128 buckets')
+	out.append(f'Using {threads} threads of stripe size 65536')
+	out.append('')
+
+	# phase 1
+	out.append(f'Starting phase 1/4: Forward Propagation into tmp files... {time_stamp(t)}')
+	phase_1 = 0.0
+	for table in range(1, 8):
+		out.append(f'Computing table {table}')
+		seconds = rng.uniform(100, 1200) * scale
+		phase_1 += seconds
+		t += timedelta(seconds=seconds)
+		if table == 1:
+			out.append(f'F1 complete, time: {seconds:.3f} seconds. CPU (97.800%) {time_stamp(t)}')
+		else:
+			out.append('\tBucket 0 uniform sort. Ram: 3.920GiB, u_sort min: 0.563GiB, qs min: 0.281GiB.')
+			out.append('\tTotal matches: 4294792146')
+			out.append(f'Forward propagation table time: {seconds:.3f} seconds. CPU (150.120%) {time_stamp(t)}')
+	out.append(f'Time for phase 1 = {phase_1:.3f} seconds. CPU (160.000%) {time_stamp(t)}')
+	out.append('')
+
+	# phase 2
+	out.append(f'Starting phase 2/4: Backpropagation into tmp files... {time_stamp(t)}')
+	phase_2 = 0.0
+	for table in range(7, 1, -1):
+		out.append(f'Backpropagating on table {table}')
+		out.append(f'scanned table {table}')
+		seconds = rng.uniform(30, 200) * scale
+		phase_2 += seconds
+		t += timedelta(seconds=seconds)
+		out.append(f'scanned time =  {seconds:.3f} seconds. CPU (20.000%) {time_stamp(t)}')
+		out.append(f'sorting time =  0.000 seconds. CPU (0.000%) {time_stamp(t)}')
+	out.append('table 1 new size: 3425000000')
+	out.append(f'Time for phase 2 = {phase_2:.3f} seconds. CPU (80.000%) {time_stamp(t)}')
+	out.append('Wrote 0 tables')
+	out.append('')
+
+	# phase 3
+	out.append(f'Starting phase 3/4: Compression from tmp files into "{dest}/{name}.2.tmp" ... {time_stamp(t)}')
+	phase_3 = 0.0
+	for table in range(1, 7):
+		out.append(f'Compressing tables {table} and {table + 1}')
+		first = rng.uniform(50, 300) * scale
+		second = rng.uniform(50, 300) * scale
+		seconds = first + second + 1
+		phase_3 += seconds
+		t += timedelta(seconds=seconds)
+		out.append(f'First computation pass time: {first:.3f} seconds. CPU (90.000%) {time_stamp(t)}')
+		out.append(f'Second computation pass time: {second:.3f} seconds. CPU (90.000%) {time_stamp(t)}')
+		out.append('\tWrote 1234 entries')
+		out.append(f'Total compress table time: {seconds:.3f} seconds. CPU (90.000%) {time_stamp(t)}')
+	out.append(f'Time for phase 3 = {phase_3:.3f} seconds. CPU (90.000%) {time_stamp(t)}')
+
+	# phase 4
+	out.append(f'Starting phase 4/4: Write Checkpoint tables into "{dest}/{name}.2.tmp" ... {time_stamp(t)}')
+	phase_4 = rng.uniform(200, 400) * scale
+	t += timedelta(seconds=phase_4)
+	out.append('\tStarting to write C1 and C3 tables')
+	out.append(f'Time for phase 4 = {phase_4:.3f} seconds. CPU (90.000%) {time_stamp(t)}')
+
+	# totals
+	total = phase_1 + phase_2 + phase_3 + phase_4
+	copy = rng.uniform(300, 500) * scale
+	out.append(f'Approximate working space used (without final file): {269.308 * scale:.3f} GiB')
+	out.append(f'Final File size: {101.336 * scale:.3f} GiB')
+	out.append(f'Total time = {total:.3f} seconds. CPU (133.870%) {time_stamp(t)}')
+	out.append(f'Copied final file from "{temp_2}/{name}.2.tmp" to "{dest}/{name}.2.tmp"')
+	t += timedelta(seconds=copy)
+	out.append(f'Copy time = {copy:.3f} seconds. CPU (21.260%) {time_stamp(t)}')
+	out.append(f'Removed temp2 file "{temp_2}/{name}.2.tmp"? 1')
+	out.append(f'Renamed final file from "{dest}/{name}.2.tmp" to "{dest}/{name}"')
+
+	if truncate:
+		out = out[:rng.randrange(1, len(out) - 1)]
+
+	return '\n'.join(out) + '\n', t
+
+
+def log_file (plots:int, seed:int = 1, first_seq:int = 0) -> str:
+	'''Return a log file containing a number of plots created one after another.'''
+
+	rng = random.Random(seed)
+	t = datetime(2021, 4, 25, 16, 59, 9)
+	out:List[str] = []
+
+	for seq in range(first_seq, first_seq + plots):
+		text, t = plot_log(rng, t, seq, threads=rng.choice([2, 4, 6, 8]))
+		out.append(text)
+
+	return ''.join(out)
+
+
+def write_logs (directory:Path, options:Options) -> Corpus:
+	'''Write the log files of a corpus to a directory.'''
+
+	directory.mkdir(parents=True, exist_ok=True)
+
+	files:List[Path] = []
+	complete:int = 0
+	size:int = 0
+
+	plotters = (options.plots + options.per_file - 1) // options.per_file
+	for plotter in range(plotters):
+		rng = random.Random(options.seed * 1000003 + plotter)
+		t = datetime(2021, 4, 25, 16, 59, 9) + timedelta(seconds=plotter * options.stagger)
+		temp_1, temp_2 = options.temp_dirs[plotter % len(options.temp_dirs)]
+		dest = options.dest_dirs[plotter % len(options.dest_dirs)]
+
+		first = plotter * options.per_file
+		last = min(first + options.per_file, options.plots)
+		out:List[str] = []
+		for seq in range(first, last):
+			truncate = rng.random() < options.truncated or (options.in_progress and seq == last - 1)
+			text, t = plot_log(rng, t, seq, temp_1, temp_2, dest, rng.choice(options.threads), rng.choice(options.k_sizes), truncate)
+			out.append(text)
+			complete += 0 if truncate else 1
+
+		path = directory / f'chia-plotter-{plotter:04}.log'
+		data = ''.join(out).encode()
+		path.write_bytes(data)
+		files.append(path)
+		size += len(data)
+
+	return Corpus(files, complete, size)
+
+
+def write_config (path:Path, log_directory:Path, options:Options) -> None:
+	'''Write a chia-log configuration file with a plot configuration for each pair of temp directories.'''
+
+	plot_configs:List[Dict[str, Any]] = []
+	for index, temp_dirs in enumerate(options.temp_dirs, 1):
+		plot_configs.append({'name': f'synthetic {index}', 'sort-order': index, 'dest': list(options.dest_dirs), 'temp': list(temp_dirs)})
+
+	cfg = {
+		'directories': {'logs': [str(log_directory)]},
+		'files': {'patterns': ['chia*.log']},
+		'logging': {'level': 'error'},
+		'plotConfigurations': plot_configs,
+	}
+
+	with open(path, 'w') as f:
+		yaml.safe_dump(cfg, f, sort_keys=False)
+
+
+def add_arguments (parser:argparse.ArgumentParser) -> None:
+	'''Add the Options() arguments to a parser, see options().'''
+
+	default = Options()
+	parser.add_argument('--plots', type=int, default=default.plots, help='number of plots')
+	parser.add_argument('--per-file', type=int, default=default.per_file, help='plots per log file')
+	parser.add_argument('--k', type=int, nargs='+', default=list(default.k_sizes), help='plot sizes')
+	parser.add_argument('--threads', type=int, nargs='+', default=list(default.threads), help='thread counts')
+	parser.add_argument('--temp', type=str, nargs='+', default=[f'{a},{b}' for a, b in default.temp_dirs], help='pairs of temp directories, "temp1,temp2"')
+	parser.add_argument('--dest', type=str, nargs='+', default=list(default.dest_dirs), help='dest directories')
+	parser.add_argument('--stagger', type=float, default=default.stagger, help='seconds between the start of each plotter')
+	parser.add_argument('--truncated', type=float, default=default.truncated, help='fraction of plots that stop part way')
+	parser.add_argument('--in-progress', action='store_true', default=default.in_progress, help='the last plot of each file is still running')
+	parser.add_argument('--seed', type=int, default=default.seed, help='random number seed')
+
+
+def options (args:argparse.Namespace) -> Options:
+	'''Return the Options() from parsed arguments, see add_arguments().'''
+
+	temp_dirs:List[Tuple[str, str]] = []
+	for pair in args.temp:
+		temp_1, _, temp_2 = pair.partition(',')
+		temp_dirs.append((temp_1, temp_2 or temp_1))
+
+	return Options(args.plots, args.per_file, tuple(args.k), tuple(args.threads), tuple(temp_dirs), tuple(args.dest),
+		args.stagger, args.truncated, args.in_progress, args.seed)
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description='Write synthetic chiapos log files.')
+	parser.add_argument('directory', type=str, help='directory for the log files and chia-log.yaml')
+	add_arguments(parser)
+	args = parser.parse_args()
+
+	directory = Path(args.directory).resolve()
+	corpus = write_logs(directory, options(args))
+	write_config(directory / 'chia-log.yaml', directory, options(args))
+
+	print(f'{len(corpus.files):,} files, {corpus.plots:,} complete plots, {corpus.size / 2 ** 20:,.1f} MiB in {directory}')
@@ -0,0 +1,94 @@
+'''
+Compare the time stamp parser (plotutility.time_stamp) to the regex and
+strptime() parser it replaced. Both must return the same times, for days
+written with one or two spaces, at the end of a line and inside a plot.
+
+	$ python -m benchmarks.timestamp [time stamps]
+'''
+
+# system packages
+from datetime import datetime, timedelta
+from typing   import List, Optional
+import random
+import re
+import sys
+import time
+
+# local packages
+from benchmarks.synthetic import time_stamp as format_time_stamp
+from src.plotutility      import EPOCH_ORDINAL, time_stamp, time_stamp_seconds
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def strptime_time_stamp (data:str) -> Optional[datetime]:
+	'''The time stamp parser before plotutility.time_stamp().'''
+
+	expression = r'... (\w{3}) (\w{3})(\s{1,2})(\d+) (\d+):(\d+):(\d+) (\d+)'
+
+	res = re.search(expression, data[:250])
+	if not res:
+		return None
+
+	date_string:str = f'{res.group(8)}-{res.group(2)}-{res.group(4)} {res.group(5)}:{res.group(6)}:{res.group(7)}'
+	return datetime.strptime(date_string, '%Y-%b-%d %H:%M:%S')
+
+
+def lines (count:int) -> List[str]:
+	'''
+	Return lines with time stamps, the way the plot parser passes them. Each
+	time stamp is used twice, like consecutive phases, and some days are
+	written with one space instead of two.
+	'''
+
+	rng = random.Random(1)
+	t = datetime(2020, 12, 25, 16, 59, 9)
+	out:List[str] = []
+
+	while len(out) < count:
+		t += timedelta(seconds=rng.uniform(0, 40000))
+		stamp = format_time_stamp(t)
+		if rng.random() < 0.1:
+			stamp = stamp.replace('  ', ' ')
+		out.append(f'time: {rng.uniform(100, 1200):.3f} seconds. CPU (97.800%) {stamp}')
+		out.append(f'Forward Propagation into tmp files... {stamp}')
+
+	return out[:count]
+
+
+def main (count:int) -> None:
+	data = lines(count)
+
+	# a few lines that are not a single line ending with a time stamp
+	data.append(' '.join(data[:4]))
+	data.append('Sat May 1 03:10:43 2021 at the start')
+	data.append('no time stamp here')
+
+	begin = time.perf_counter()
+	expected = [strptime_time_stamp(line) for line in data]
+	old_secs = time.perf_counter() - begin
+
+	begin = time.perf_counter()
+	actual = [time_stamp(line) for line in data]
+	new_secs = time.perf_counter() - begin
+
+	mismatch = sum(1 for a, b in zip(expected, actual) if a != b)
+
+	# epoch seconds must match the datetime
+	for line, dt in zip(data, expected):
+		seconds = time_stamp_seconds(line)
+		if (dt is None) != (seconds is None) or (dt and seconds != (dt - EPOCH) // timedelta(seconds=1)):
+			mismatch += 1
+	assert EPOCH_ORDINAL == EPOCH.toordinal()
+
+	print(f'time stamps  {len(data):,}')
+	print(f'strptime     {len(data) / old_secs:12,.0f} per second')
+	print(f'time_stamp   {len(data) / new_secs:12,.0f} per second ({old_secs / new_secs:.1f}x)')
+	print(f'mismatches   {mismatch}')
+
+	if mismatch:
+		sys.exit(1)
+
+
+if __name__ == '__main__':
+	main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -0,0 +1,97 @@
+'''
+Time the plot warehouse (src/plotwarehouse.py) on a synthetic corpus:
+inserting every plot, inserting them again (all skipped), and the query
+summaries, compared with extracting and analyzing the log files. The
+warehouse summaries must match the plot configuration statistics of
+Analyze.
+
+	$ python -m benchmarks.warehouse [--dir directory] [generator options]
+'''
+
+# system packages
+from math    import isclose
+from pathlib import Path
+import argparse
+import sys
+import tempfile
+import time
+
+# local packages
+from benchmarks        import synthetic
+from src.analyze       import Analyze
+from src.config        import Config
+from src.plots         import Plots
+from src.plotwarehouse import PlotWarehouse, QueryFilter
+
+
+def main () -> None:
+	parser = argparse.ArgumentParser(description='Time the plot warehouse on a synthetic corpus.')
+	parser.add_argument('--dir', type=str, default='', help='directory for the corpus and database (default is a temporary directory)')
+	synthetic.add_arguments(parser)
+	parser.set_defaults(plots=20000)
+	args = parser.parse_args()
+
+	options = synthetic.options(args)
+	errors:int = 0
+
+	with tempfile.TemporaryDirectory(prefix='chia-log-') as temp_dir:
+		directory = Path(args.dir).resolve() if args.dir else Path(temp_dir)
+
+		synthetic.write_logs(directory, options)
+		synthetic.write_config(directory / 'chia-log.yaml', directory, options)
+
+		config = Config()
+		config.cli_options(str(directory / 'chia-log.yaml'), False, '', 'text', 0)
+		if not config.valid:
+			sys.exit(1)
+
+		begin = time.perf_counter()
+		plots = Plots(config)
+		plots.extract_files(sorted(directory.glob('*.log')), 1)
+		plots.post_process()
+		analyze = Analyze(config)
+		analyze.process(plots)
+		parse_secs = time.perf_counter() - begin
+
+		database = directory / 'chia-log.db'
+		database.unlink(missing_ok=True)
+
+		with PlotWarehouse(database, config.logger) as warehouse:
+			begin = time.perf_counter()
+			inserted = warehouse.save(plots.store)
+			insert_secs = time.perf_counter() - begin
+
+			begin = time.perf_counter()
+			again = warehouse.save(plots.store)
+			again_secs = time.perf_counter() - begin
+
+			begin = time.perf_counter()
+			rows = list(warehouse.summary(QueryFilter()))
+			query_secs = time.perf_counter() - begin
+
+			begin = time.perf_counter()
+			filtered = list(warehouse.summary(QueryFilter(threads=options.threads[0], since='2021-04-26', until='2021-05-01')))
+			filtered_secs = time.perf_counter() - begin
+
+		errors += inserted != len(plots.plots) or again != 0
+
+		# the warehouse summaries match the plot configurations of Analyze
+		configs = {plot_config.name: plot_config for plot_config in analyze._plot_configs.plot_configs}
+		for name, threads, count, phase, mean, stdev, *_ in rows:
+			stats = configs[name].stats(threads, 5 if phase == 'total' else int(phase[-1]))
+			errors += count != stats.count or not isclose(mean, stats.mean, rel_tol=1e-9)
+
+		print(f'plots         {len(plots.plots):,}, database {database.stat().st_size / 1e6:,.1f} MB')
+		print(f'extract       {parse_secs:8.3f} s (extract, post-process and analyze the logs)')
+		print(f'insert        {insert_secs:8.3f} s {inserted / insert_secs:10,.0f} plots/s')
+		print(f'insert again  {again_secs:8.3f} s (every plot skipped)')
+		print(f'query         {query_secs:8.3f} s, {len(rows)} rows')
+		print(f'query filter  {filtered_secs:8.3f} s, {len(filtered)} rows')
+
+	print(f'errors        {errors}')
+	if errors:
+		sys.exit(1)
+
+
+if __name__ == '__main__':
+	main()
@@ -2,14 +2,25 @@
 
 # system packages
 from pathlib import Path
+from typing  import Iterator, List, Optional, Tuple
 import argparse
+import socket
+import sys
 
 # third party packages
 
 # local packages
-from src.analyze import Analyze
-from src.config  import Config
-from src.plots   import Plots
+from src.analyze       import Analyze
+from src.collector     import Collector
+from src.config        import Config
+from src.discovery     import FileDiscovery
+from src.follow        import Follow
+from src.logreader     import SUFFIXES
+from src.plotcache     import PlotCache
+from src.plots         import Plots
+from src.plotwarehouse import PlotWarehouse, QueryFilter
+from src.report        import open_report
+from src.summary       import Summary
 
 
 class Main:
@@ -19,6 +30,7 @@ class Main:
 
 	def __init__ (self, config:Config):
 		self._config = config
+		self._cache:Optional[PlotCache] = None
 
 	def run (self) -> None:
 		'''
@@ -27,47 +39,280 @@ class Main:
 		creates 8 plots and re-directs the output to one log file.
 		'''
 
+		profiler = self._config.profiler
+		profiler.start()
+
+		plots, analyze = self._plots()
+
+		# follow "chia plots create" piped to stdin
+		if self._config.file == '-' and self._config.follow:
+			Follow(self._config, plots, analyze).run_stream(sys.stdin.buffer)
+			return
+
+		self._extract(plots)
+		self._report(plots, analyze)
+
+		# follow the log files and update the analysis as each plot finishes
+		if self._config.follow:
+			Follow(self._config, plots, analyze).run(self._log_files)
+
+	def collect (self) -> None:
+		'''
+		Copy the logs of the hosts in the collector section of the config file
+		(the "collect" command) and analyze the plots in the bytes appended
+		since the last copy as they are copied. The copies are in a log
+		directory, so the copies from earlier runs are processed first (from
+		the plot cache). With --follow the hosts are copied again every few
+		seconds.
+		'''
+
+		if not self._config.collector_destination:
+			print(f'Error: no collector section in the config file')
+			return
+
+		profiler = self._config.profiler
+		profiler.start()
+
+		plots, analyze = self._plots()
+		self._extract(plots)
+
+		collector = Collector(self._config.collector_destination, self._config.collector_hosts, self._config.patterns, self._config.logger,
+			self._config.collector_checkpoint_file, self._config.collector_jobs, self._config.collector_verify)
+		collector.load()
+
+		follow = Follow(self._config, plots, analyze)
+		with profiler.stage('collect'):
+			follow.collect(collector)
+		collector.save()
+
+		hosts = len(self._config.collector_hosts)
+		copied = sum(collector.copied.values())
+		if self._config.is_text:
+			print(f'Collected {copied} bytes from {hosts - len(collector.errors)} of {hosts} hosts, {len(plots.plots)} plots')
+		else:
+			self._config.logger.info('Collected %s bytes from %s of %s hosts, %s plots', copied, hosts - len(collector.errors), hosts, len(plots.plots))
+
+		self._report(plots, analyze)
+
+		if self._config.follow:
+			follow.run_collector(collector)
+		else:
+			collector.close()
+
+	def summarize (self, summary_file:str, host:str, records:bool) -> None:
+		'''
+		Process the log files like run() and write a summary of the analysis
+		(the "summarize" command), to be merged with the summaries of other
+		hosts without copying their log files (see merge()).
+		'''
+
+		profiler = self._config.profiler
+		profiler.start()
+
+		plots, analyze = self._plots()
+		self._extract(plots)
+
+		with profiler.stage('summarize'):
+			summary = analyze.summarize(plots, host, records)
+			summary.save(Path(summary_file))
+
+		if self._config.is_text:
+			print(f'Summarized {len(summary.plots)} plots from {host} to {summary_file}')
+		else:
+			self._config.logger.info('Summarized %s plots from %s to %s', len(summary.plots), host, summary_file)
+
+		profiler.stop()
+		profiler.print(self._config.console)
+
+	def merge (self, summary_files:List[str]) -> None:
+		'''
+		Combine the summaries of several hosts (the "merge" command) into the
+		report run() prints, without reading any log files. A plot in more
+		than one summary is only counted once.
+		'''
+
+		profiler = self._config.profiler
+		profiler.start()
+
 		plots = Plots(self._config)
+		analyze = Analyze(self._config)
 
-		if self._config.file:
-			# process a single file
-			file = Path(self._config.file).resolve()
-			self._config.logger.debug(f'file - {file}')
-			plots.extract(file)
+		merged:int = 0
+		with profiler.stage('merge'):
+			for summary_file in summary_files:
+				try:
+					summary = Summary.load(Path(summary_file))
+				except (OSError, ValueError, KeyError, TypeError) as e:
+					print(f'Error: cannot read summary {summary_file} - {e}')
+					continue
 
+				if self._config.details and summary.records is None:
+					print(f'Warning: summary {summary_file} has no plot details, summarize with --records')
+				analyze.merge(summary, plots.add_summary(summary))
+				merged += 1
+
+		if self._config.is_text:
+			print(f'Merged {merged} summaries containing {len(plots.plots)} plots')
 		else:
-			# process each log file directory (in the config file)
-			for log_directory in self._config.log_directories:
-				# process log files that match a pattern (*.log, etc.)
-				for pattern in self._config.patterns:
-					files = log_directory.glob(f'**/{pattern}')
-					if files:
-						for file in sorted(files):
-							self._config.logger.debug(f'files - {file}')
-							plots.extract(file)
+			self._config.logger.info('Merged %s summaries containing %s plots', merged, len(plots.plots))
 
-		print(f'Processed {len(plots.files)} files containing {len(plots.plots)} plots')
+		with profiler.stage('analyze'):
+			analyze.finish(plots)
+		with profiler.stage('report'):
+			analyze.print(plots)
 
-		# post-process each plot and add more information
-		plots.post_process()
+		profiler.stop()
+		profiler.print(self._config.console)
 
-		# analyze the plots
+	def query (self, query_filter:QueryFilter) -> None:
+		'''
+		Summarize the plots in the warehouse (the "query" command) with SQL
+		aggregates, without reading any log files.
+		'''
+
+		warehouse_file = self._config.warehouse_file
+		if not warehouse_file:
+			print(f'Error: no warehouse file in the config file')
+			return
+		if not warehouse_file.exists():
+			print(f'Error: warehouse file does not exist ({warehouse_file})')
+			return
+
+		with PlotWarehouse(warehouse_file, self._config.logger) as warehouse:
+			if self._config.is_text:
+				warehouse.print(query_filter)
+			else:
+				with open_report(self._config.output, self._config.output_file) as writer:
+					warehouse.write(writer, query_filter)
+
+	def _plots (self) -> Tuple[Plots, Analyze]:
+		'''Return the plots (with the plot cache) and their analysis.'''
+
+		# the cache of plots extracted from log files
+		self._cache = None
+		if self._config.cache_file:
+			with self._config.profiler.stage('cache load'):
+				self._cache = PlotCache(self._config.cache_file, self._config.logger, self._config.rebuild_cache)
+				self._cache.load()
+
+		plots = Plots(self._config, self._cache)
+
+		# each plot is post-processed and analyzed as soon as it is extracted,
+		# while the next log files are found and read in background threads
 		analyze = Analyze(self._config)
-		analyze.process(plots)
-		analyze.print(plots)
+		plots.stream_to(analyze.add_plot)
+
+		return plots, analyze
+
+	def _extract (self, plots:Plots) -> None:
+		'''Extract the plots from stdin or the log files, and save the plot cache.'''
+
+		profiler = self._config.profiler
+
+		if self._config.file == '-':
+			# process stdin
+			with profiler.stage('extract'):
+				plots.extract_stdin(sys.stdin.buffer)
+
+		else:
+			# process a single file or the log file directories, each file is
+			# extracted as soon as it is found
+			with profiler.stage('discovery and extract'):
+				plots.extract_files(self._log_files(), self._config.jobs)
+
+		if self._cache:
+			with profiler.stage('cache save'):
+				self._cache.save()
+
+		# keep stdout machine-readable for the other --output formats
+		if self._config.is_text:
+			print(f'Processed {len(plots.files)} files containing {len(plots.plots)} plots')
+		else:
+			self._config.logger.info('Processed %s files containing %s plots', len(plots.files), len(plots.plots))
+
+	def _report (self, plots:Plots, analyze:Analyze) -> None:
+		'''Store the plots in the warehouse, and print the analysis.'''
+
+		profiler = self._config.profiler
+
+		# store the plots in the warehouse for "chia-log.py query"
+		if self._config.warehouse_file:
+			with profiler.stage('warehouse'):
+				with PlotWarehouse(self._config.warehouse_file, self._config.logger) as warehouse:
+					warehouse.save(plots.store)
+
+		# analyze the plots
+		with profiler.stage('analyze'):
+			analyze.finish(plots)
+		with profiler.stage('report'):
+			analyze.print(plots)
+
+		profiler.stop()
+		profiler.print(self._config.console)
+
+	def _log_files (self) -> Iterator[Path]:
+		'''Return each log file in the log directories (in the config file).'''
+
+		if self._config.file:
+			# process a single file
+			file = Path(self._config.file).resolve()
+			self._config.logger.debug('file - %s', file)
+			yield file
+			return
+
+		# one walk of each log directory, matching every pattern; compressed
+		# logs (chia-1.log.gz) match too, and sort after the uncompressed log,
+		# which is used if both are found
+		discovery = FileDiscovery(self._config.patterns, self._config.excludes, self._config.max_depth, SUFFIXES, self._config.logger, self._config.profiler)
+		for file in discovery.files(self._config.log_directories):
+			self._config.logger.debug('files - %s', file)
+			yield file
 
 
 if __name__ == '__main__':
 	parser = argparse.ArgumentParser(description='Process chia log files.')
 	parser.add_argument('-c', '--config', type=str, default='chia-log.yaml', help='configuration file')
 	parser.add_argument('-d', '--details', action='store_true', default=False, help='details of every plot')
-	parser.add_argument('-f', '--file', type=str, default='', help='process a specific file')
-	parser.add_argument('-o', '--output', type=str, default='csv', help='output format (csv, json, or markdown)')
+	parser.add_argument('-f', '--file', type=str, default='', help='process a specific file, - reads stdin')
+	parser.add_argument('-F', '--follow', action='store_true', default=False, help='follow log files and update the analysis as plots finish')
+	parser.add_argument('-j', '--jobs', type=int, default=1, help='number of processes to extract plots (0 is one per CPU)')
+	parser.add_argument('--rebuild-cache', action='store_true', default=False, help='ignore the plot cache and create a new one')
+	parser.add_argument('-o', '--output', type=str, default='text', help='output format (text, csv, json (JSON Lines), or markdown)')
+	parser.add_argument('--output-file', type=str, default='', help='write the report to a file instead of stdout')
+	parser.add_argument('--readers', type=int, default=4, help='number of log files read ahead by background threads with one job (0 is no read ahead)')
+	parser.add_argument('--profile', action='store_true', default=False, help='print the time and counts for each stage (extractor timers need --jobs 1)')
+	parser.add_argument('--profile-pstats', type=str, default='', help='write a cProfile file, read it with pstats (implies --profile)')
+	parser.add_argument('--profile-trace', type=str, default='', help='write a Chrome trace-event JSON file (implies --profile)')
 	parser.add_argument('-v', '--verbose', action='count', default=0, help='')
+
+	commands = parser.add_subparsers(dest='command')
+	query = commands.add_parser('query', help='summarize the plots in the warehouse without reading the log files')
+	query.add_argument('--name', type=str, default='', help='plot configuration name')
+	query.add_argument('--threads', type=int, default=0, help='thread count')
+	query.add_argument('--since', type=str, default='', help='plots that ended on or after, yyyy-mm-dd [hh:mm:ss]')
+	query.add_argument('--until', type=str, default='', help='plots that ended before, yyyy-mm-dd [hh:mm:ss]')
+
+	summarize = commands.add_parser('summarize', help='process the log files and write a summary to merge with the summaries of other hosts')
+	summarize.add_argument('summary_file', type=str, help='summary file to write (compressed if it ends with .gz)')
+	summarize.add_argument('--host', type=str, default=socket.gethostname(), help='host name in the summary')
+	summarize.add_argument('--records', action='store_true', default=False, help='include every plot, needed for --details after the merge')
+	commands.add_parser('collect', help='copy the logs appended on the hosts in the collector section of the config file and process them')
+	merge = commands.add_parser('merge', help='report on the summaries of several hosts without reading the log files')
+	merge.add_argument('summary_files', type=str, nargs='+', help='summary files written by summarize')
+
 	args = parser.parse_args()
 
 	config = Config()
-	config.cli_options(args.config, args.details, args.file, args.output, args.verbose)
+	config.cli_options(args.config, args.details, args.file, args.output, args.verbose, args.jobs, args.rebuild_cache, args.follow, args.profile, args.profile_pstats, args.profile_trace, args.output_file, args.readers)
 	if config.valid:
 		main = Main(config)
-		main.run()
+		if args.command == 'query':
+			main.query(QueryFilter(args.name, args.threads, args.since, args.until))
+		elif args.command == 'summarize':
+			main.summarize(args.summary_file, args.host, args.records)
+		elif args.command == 'merge':
+			main.merge(args.summary_files)
+		elif args.command == 'collect':
+			main.collect()
+		else:
+			main.run()
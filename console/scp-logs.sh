@@ -1,12 +1,4 @@
 #!/bin/bash
-SRC=192.168.86.244
-RSA=~/Dropbox/Rob/SSH-keys/chia-id_rsa
-USER=chia
-
-for LOG in $(ssh -i $RSA $USER@$SRC "ls /home/chia/chialogs")
-do
-  if [ ! -f ../test-logs/$LOG ]
-  then
-    scp -i $RSA $USER@$SRC:/home/chia/chialogs/$LOG ../test-logs/
-  fi
-done
+# copy the logs of the hosts in the "collector" section of the config file,
+# only the bytes appended since the last copy (see src/collector.py)
+cd "$(dirname "$0")/.." && exec python chia-log.py -c "${1:-chia-log.yaml}" collect
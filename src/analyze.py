@@ -1,15 +1,23 @@
 # system packages
 from __future__  import annotations
-from datetime    import datetime
-from statistics  import mean
-from typing      import Dict, List, NamedTuple, Optional
+from typing      import Any, Dict, List, Sequence
 
 # local packages
-from src.config import Config
-from src.plots  import Plots
-class Range (NamedTuple):
-	start:datetime
-	end:datetime
+from src.config    import Config
+from src.overlap   import Interval, Overlaps
+from src.plot      import IncompletePlot, Plot, SummaryPlot
+from src.plots     import Plots
+from src.plotstats import PhaseStats
+from src.plottable import PlotTable
+from src.report    import PLOT_COLUMNS, ReportWriter, open_report, plot_row
+from src.summary   import Summary
+
+# phases 1 - 4 and the totals section (phase 5)
+PHASES = (1, 2, 3, 4, 5)
+
+# the PlotTable columns of phases 1 - 5
+PHASE_COLUMNS = ('phase_1', 'phase_2', 'phase_3', 'phase_4', 'total_time')
+
 
 class Analyze:
 	'''
@@ -21,104 +29,220 @@ class Analyze:
 
 		self._plot_configs = PlotConfigurations()
 
+		# a row for each plot, the rows from _folded on are not in the plot configurations yet (see _fold())
+		self._table = PlotTable()
+		self._folded:int = 0
+
 		# key is yyyy-mm-dd, value is number of plots
 		self._plots_per_day:Dict[str, int] = {}
 
 		# key is yyyy-mm, value is number of plots
 		self._plots_per_month:Dict[str, int] = {}
 
+		# plots that ran at the same time
+		self._overlaps = Overlaps()
+
 	def print (self, plots:Plots) -> None:
-		self._print_configs();
-		print()
-		self._print_dates();
+		if not self._config.is_text:
+			with open_report(self._config.output, self._config.output_file) as writer:
+				self.write(writer, plots)
+			return
+
+		self.print_summary()
 		print()
 		self._print_overlap(plots);
 
-		if self._config.is_csv:
-			pass
+		if plots.incomplete:
+			print()
+			self._print_incomplete(plots)
 
-		if self._config.is_json:
-			pass
+	def write (self, writer:ReportWriter, plots:Plots) -> None:
+		'''
+		Write the report (--output csv, json, or markdown) one row at a time:
+		each plot (--details), the plot configurations, the plots per month
+		and day, and the plots that did not finish.
+		'''
 
-		if self._config.is_markdown:
-			pass
+		self._fold()
+
+		if self._config.details:
+			writer.table('plot', PLOT_COLUMNS)
+			for plot in plots.store:
+				writer.row(plot_row(plot))
+
+		writer.table('summary', ('name', 'threads', 'plots', 'phase', 'mean', 'stdev', 'min', 'p50', 'p90', 'p99', 'max'))
+		for plot_config in self._plot_configs.plot_configs:
+			plot_config.write(writer)
+
+		writer.table('month', ('month', 'plots'))
+		for date in sorted(self._plots_per_month):
+			writer.row((date, self._plots_per_month[date]))
+
+		writer.table('day', ('day', 'plots'))
+		for date in sorted(self._plots_per_day):
+			writer.row((date, self._plots_per_day[date]))
+
+		writer.table('totals', ('plots', 'max_concurrent_plots'))
+		writer.row((len(plots.store), self._overlaps.max_concurrency))
+
+		writer.table('incomplete', IncompletePlot._fields)
+		for incomplete in plots.incomplete:
+			writer.row(incomplete)
+
+	def print_summary (self) -> None:
+		'''Print the plot configurations and the plots per month and day.'''
+
+		self._fold()
+		self._print_configs();
+		print()
+		self._print_dates();
 
 	def process (self, plots:Plots) -> None:
-		self._set_config(plots)		# group similar plots for analysis
-		self._set_dates(plots)		# plot totals per day and month
-		self._set_overlap(plots)	# number of overlaps for each plot
+		'''
+		Analyze every plot at once, after Plots.post_process(). This is the
+		batch form of add_plot() and finish(), for plots that were not
+		streamed to the analysis (see Plots.stream_to()); use one or the other.
+		'''
+
+		store = plots.store
+		profiler = self._config.profiler
+
+		# group similar plots for analysis
+		with profiler.stage('analyze/configs'):
+			for plot in store:
+				self._add_config(plot)
+
+		# plot totals per day and month
+		with profiler.stage('analyze/dates'):
+			for plot in store:
+				if not plot.end_date_yyyy_mm_dd:
+					print(f'missing end date - file {plot.log_file}, index {plot.index}')
+				else:
+					self._count_date(plot.end_date_yyyy_mm_dd, 1)
+
+		with profiler.stage('analyze/overlap'):
+			self._set_overlap(plots)	# number of overlaps for each plot
+
+		self._fold()
 
-	def _set_config (self, plots:Plots) -> None:
+	def finish (self, plots:Plots) -> None:
 		'''
-		Append each plot to a PlotConfiguration() object. This groups similar
-		plots together for analysis.
+		Finish the analysis of plots that were added one at a time as they
+		were extracted (see Plots.stream_to()); the overlaps need every plot.
 		'''
 
-		for plot in plots.plots:
-			# get the disk configuration that matches this plot
-			plot_config = self._plot_configs.get_plot_config(plot.name)
-			plot_config.increment_plot_count(plot.parameters.threads)
-			plot_config.append(plot.parameters.threads, 1, plot.phase_1.total_time)
-			plot_config.append(plot.parameters.threads, 2, plot.phase_2.total_time)
-			plot_config.append(plot.parameters.threads, 3, plot.phase_3.total_time)
-			plot_config.append(plot.parameters.threads, 4, plot.phase_4.total_time)
-			plot_config.append(plot.parameters.threads, 5, plot.totals.total_time)
-
-	def _set_dates (self, plots:Plots) -> None:
-		'''Determine the number of plots processed per day.'''
+		with self._config.profiler.stage('analyze/overlap'):
+			self._set_overlap(plots)	# number of overlaps for each plot
 
-		for plot in plots.plots:
-			if not plot.end_date_yyyy_mm_dd:
+		self._fold()
+
+	def add_plot (self, plot:Plot) -> None:
+		'''
+		Add a post-processed plot to the analysis. Plots are added one at a time
+		so the summaries can be updated as new plots finish (--follow).
+		'''
+
+		self._add_config(plot)		# group similar plots for analysis
+
+		# plot totals per day and month
+		if not plot.end_date_yyyy_mm_dd:
+			print(f'missing end date - file {plot.log_file}, index {plot.index}')
+		else:
+			self._count_date(plot.end_date_yyyy_mm_dd, 1)
+
+	def summarize (self, plots:Plots, host:str, records:bool = False) -> Summary:
+		'''
+		Return a Summary() of the analysis of the plots on this host, to be
+		merged with the summaries of other hosts (see merge()). With records
+		the summary includes the PlotRecord() of each plot, for --details.
+		'''
+
+		self._fold()
+
+		summary = Summary(host, len(plots.files))
+		for plot_config in self._plot_configs.plot_configs:
+			summary.configs[plot_config.name] = plot_config.to_record()
+		summary.plots_per_day = dict(self._plots_per_day)
+		summary.plots = [plot.to_summary() for plot in plots.store]
+		summary.incomplete = list(plots.incomplete)
+		if records:
+			summary.records = [plot.to_record() for plot in plots.store]
+
+		return summary
+
+	def merge (self, summary:Summary, added:List[SummaryPlot]) -> None:
+		'''
+		Add the analysis of a summary from another host; added are the plots of
+		the summary that were not in an earlier summary (see
+		Plots.add_summary()). If every plot was added the statistics of the
+		summary are merged as they are, so the cost does not depend on the
+		number of plots. Otherwise they are rebuilt from the plots that were
+		added, so a plot in two summaries is only counted once.
+		'''
+
+		if len(added) == len(summary.plots):
+			for name, record in summary.configs.items():
+				self._plot_configs.get_plot_config(name).merge(PlotConfiguration.from_record(name, record))
+			for date, count in summary.plots_per_day.items():
+				self._count_date(date, count)
+		else:
+			for plot in added:
+				self._plot_configs.get_plot_config(plot.name)		# keep the order the configurations are found
+				self._table.append_row(plot.name, dict(zip(PHASE_COLUMNS, plot.seconds), threads=plot.threads))
+				if plot.end_time:
+					self._count_date(f'{plot.end_time.year:04}-{plot.end_time.month:02}-{plot.end_time.day:02}', 1)
+
+		for plot in added:
+			if not plot.end_time:
 				print(f'missing end date - file {plot.log_file}, index {plot.index}')
-			else:
-				if plot.end_date_yyyy_mm_dd not in self._plots_per_day:
-					self._plots_per_day[plot.end_date_yyyy_mm_dd] = 0
-				self._plots_per_day[plot.end_date_yyyy_mm_dd] += 1
 
-				if plot.end_date_yyyy_mm not in self._plots_per_month:
-					self._plots_per_month[plot.end_date_yyyy_mm] = 0
-				self._plots_per_month[plot.end_date_yyyy_mm] += 1
+	def _add_config (self, plot:Plot) -> None:
+		'''Add a plot to the table, its phase times are added to its plot configuration by _fold().'''
+
+		self._plot_configs.get_plot_config(plot.name)		# keep the order the configurations are found
+		self._table.append(plot)
+
+	def _fold (self) -> None:
+		'''
+		Add the phase times of the rows appended to the table since the last
+		call to their plot configurations, grouped by name and thread count
+		over whole columns (see PlotTable.group_by()).
+		'''
+
+		with self._config.profiler.stage('analyze/fold'):
+			for (name, threads), stats in self._table.group_by(('name', 'threads'), PHASE_COLUMNS, self._folded).items():
+				self._plot_configs.get_plot_config(name).add_stats(threads, [stats[column] for column in PHASE_COLUMNS])
+			self._folded = len(self._table)
+
+	def _count_date (self, yyyy_mm_dd:str, count:int) -> None:
+		'''Add to the number of plots processed on a day (yyyy-mm-dd) and its month.'''
+
+		if yyyy_mm_dd not in self._plots_per_day:
+			self._plots_per_day[yyyy_mm_dd] = 0
+		self._plots_per_day[yyyy_mm_dd] += count
+
+		yyyy_mm = yyyy_mm_dd[:7]
+		if yyyy_mm not in self._plots_per_month:
+			self._plots_per_month[yyyy_mm] = 0
+		self._plots_per_month[yyyy_mm] += count
 
 	def _set_overlap (self, plots:Plots) -> None:
-		'''Set the number of overlaps for each plot.'''
-
-		range_source:Optional[Range] = None
-		range_dest:Optional[Range]   = None
-
-		for source in plots.plots:
-			range_source = None
-			range_dest   = None
-
-			if source.phase_1.start_time and source.totals.end_time:
-				range_source = Range(start=source.phase_1.start_time, end=source.totals.end_time)
-				print(f'source start {range_source.start} end {range_source.end}')
-
-			for dest in plots.plots:
-				# don't compare a plot to itself
-				if source.parameters.plot_id == dest.parameters.plot_id:
-					continue
-
-				if dest.phase_1.start_time and dest.totals.end_time:
-					range_dest = Range(start=dest.phase_1.start_time, end=dest.totals.end_time)
-
-				if range_source and range_dest:
-					# the source ended before the destinaton started
-					# src...src
-					#           dest...dest
-					if range_source.end < range_dest.start:
-						continue
-					# the destination ended before the source started
-					#             src...src
-					# dest...dest
-					if range_dest.end < range_source.start:
-						continue
-
-					latest_start = max(range_source.start, range_dest.start)
-					earliest_end = min(range_source.end, range_dest.end)
-					#delta = (earliest_end - latest_start).seconds + 1
-					delta = earliest_end - latest_start
-					#overlap = max(0, delta)
-					source.set_plot_overlap(source.parameters.plot_id, delta)
+		'''
+		Set the overlapping plots for each plot, and the number of plots running
+		at the same time.
+		'''
+
+		intervals:List[Interval] = []
+		for plot in plots.plots:
+			if plot.phase_1.start_time and plot.totals.end_time:
+				intervals.append(Interval(plot.parameters.plot_id, plot.phase_1.start_time, plot.totals.end_time))
+				self._config.logger.debug('source start %s end %s', plot.phase_1.start_time, plot.totals.end_time)
+
+		self._overlaps.process(intervals)
+
+		for plot in plots.plots:
+			for plot_id, overlap in self._overlaps.overlaps.get(plot.parameters.plot_id, {}).items():
+				plot.set_plot_overlap(plot_id, overlap)
 
 	def _print_configs (self) -> None:
 		for index, plot_config in enumerate(self._plot_configs.plot_configs):
@@ -149,7 +273,16 @@ class Analyze:
 	def _print_overlap (self, plots:Plots) -> None:
 		for plot in plots.plots:
 			for plot_id, overlap in plot.overlap.items():
-				print(f'plot id {plot_id}, elapsed {plot.elapsed_time} overlap {overlap}')
+				print(f'plot id {plot.parameters.plot_id}, elapsed {plot.elapsed_time} overlap plot id {plot_id} {overlap}')
+
+		print(f'Maximum concurrent plots - {self._overlaps.max_concurrency}')
+
+	def _print_incomplete (self, plots:Plots) -> None:
+		'''Print the plots that started but did not finish, and how far they got.'''
+
+		print(f'Incomplete plots - {len(plots.incomplete)}')
+		for p in plots.incomplete:
+			print(f'  file {p.log_file}, offset {p.offset}, plot id {p.plot_id or "unknown"}, phase {p.phase}, last time {p.last_time}, {p.reason}')
 
 
 class PlotConfigurations:
@@ -184,46 +317,98 @@ class PlotConfiguration:
 	one or more "rows." A row consists of the number of threads (plots create -r
 	parameter) and values for each phase. Phases are 1-4 and the 5th phase is
 	the totals section in the log file.
+
+	The values of each phase are kept as streaming statistics (see
+	PhaseStats), so memory does not grow with the number of plots and
+	configurations from separate runs can be merged. The statistics of the
+	plots of a run are computed from the columns of the PlotTable of the
+	analysis, a group at a time (see add_stats()).
 	'''
 
+	# quantiles printed for each phase
+	QUANTILES = (0.5, 0.9, 0.99)
+
 	def __init__ (self, name:str) -> None:
 		self.name = name
 
-		# key is thread count, value is a dictionary of phases (1 - 5) and a
-		# list of values (seconds) for each phase
-		self._rows:Dict[int, Dict[int, List[float]]] = {}
+		# key is thread count, value is a dictionary where the key is the phase
+		# (1 - 5) and the value is the statistics (seconds) for that phase
+		self._rows:Dict[int, Dict[int, PhaseStats]] = {}
 
-		# number of plots with this configuration; key is threads, value is plot count
-		self._plot_count:Dict[int, int] = {}
+	def add_stats (self, threads:int, stats:Sequence[PhaseStats]) -> None:
+		'''Add the statistics for phases 1 - 5 of plots with a thread count, such as a group of PlotTable.group_by().'''
 
-	def append (self, threads:int, phase:int, value:float) -> None:
 		if threads not in self._rows:
-			self._rows[threads] = {}
-		if phase not in self._rows[threads]:
-			self._rows[threads][phase] = []
-		self._rows[threads][phase].append(value)
+			self._rows[threads] = {phase: PhaseStats() for phase in PHASES}
+
+		row = self._rows[threads]
+		for phase, phase_stats in zip(PHASES, stats):
+			row[phase].merge(phase_stats)
+
+	def merge (self, other:PlotConfiguration) -> None:
+		'''Add the plots of another configuration, for example from another run.'''
+
+		for threads, other_row in other._rows.items():
+			self.add_stats(threads, [other_row[phase] for phase in PHASES])
+
+	def to_record (self) -> List[Any]:
+		'''Return the statistics of each thread count as [threads, [phase 1 - 5 statistics]], for a summary (see from_record()).'''
+
+		return [[threads, [row[phase].to_record() for phase in PHASES]] for threads, row in self._rows.items()]
+
+	@classmethod
+	def from_record (cls, name:str, record:List[Any]) -> PlotConfiguration:
+		plot_config = cls(name)
+		for threads, phases in record:
+			plot_config._rows[threads] = {phase: PhaseStats.from_record(stats) for phase, stats in zip(PHASES, phases)}
+		return plot_config
+
+	def stats (self, threads:int, phase:int) -> PhaseStats:
+		return self._rows[threads][phase]
 
 	def avg (self, threads:int, phase:int) -> int:
-		return int(mean(self._rows[threads][phase]))
+		return int(self._rows[threads][phase].mean)
 
-	def increment_plot_count (self, threads:int) -> None:
-		if threads not in self._plot_count:
-			self._plot_count[threads] = 0
-		self._plot_count[threads] += 1
+	def median (self, threads:int, phase:int) -> float:
+		return self._rows[threads][phase].quantile(0.5)
+
+	def plot_count (self, threads:int) -> int:
+		return self._rows[threads][5].count
 
 	def print (self) -> None:
 		print(f'Disk - {self.name}')
+		print(f'  threads plots phase     mean   stdev     min     p50     p90     p99     max')
+		for threads in sorted(self._rows.keys()):
+			for phase in PHASES:
+				stats = self._rows[threads][phase]
+				p50, p90, p99 = (stats.quantile(q) for q in self.QUANTILES)
+				label = 'tot' if phase == 5 else f'p{phase}'
+				lead = f'{threads:9} {self.plot_count(threads):5}' if phase == 1 else ' ' * 15
+				print(f'{lead} {label:5} {stats.mean:8,.0f} {number(stats.stdev)} {stats.min:7,.0f} {p50:7,.0f} {p90:7,.0f} {p99:7,.0f} {stats.max:7,.0f}')
+
+	def write (self, writer:ReportWriter) -> None:
+		'''Write a "summary" row for each thread count and phase.'''
+
 		for threads in sorted(self._rows.keys()):
-			print(f'  threads {threads} plots {self._plot_count[threads]:4} p1 {self.avg(threads, 1):6,} p2 {self.avg(threads, 2):6,} p3 {self.avg(threads, 3):6,} p4 {self.avg(threads, 4):6,} tot {self.avg(threads, 5):6,}')
+			for phase in PHASES:
+				stats = self._rows[threads][phase]
+				label = 'total' if phase == 5 else f'phase_{phase}'
+				writer.row((self.name, threads, self.plot_count(threads), label, stats.mean, stats.stdev, stats.min, *(stats.quantile(q) for q in self.QUANTILES), stats.max))
 
-	def sort_by_threads (self) -> Dict[int, Dict[int, List[float]]]:
+	def sort_by_threads (self) -> Dict[int, Dict[int, PhaseStats]]:
 		'''
 		Return self._rows sorted by the key, which is the number of threads.
 		'''
 
-		new_rows:Dict[int, Dict[int, List[float]]] = {}
+		new_rows:Dict[int, Dict[int, PhaseStats]] = {}
 
 		for thread_count in sorted(self._rows.keys()):
 			new_rows[thread_count] = self._rows[thread_count]
 
 		return new_rows
+
+
+def number (value:float) -> str:
+	'''Return a 7 character number, or "-" if it is not known (nan).'''
+
+	return f'{value:7,.0f}' if value == value else f'{"-":>7}'
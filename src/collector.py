@@ -0,0 +1,406 @@
+# system packages
+from pathlib import Path
+from typing  import BinaryIO, Dict, Iterator, List, NamedTuple, Optional
+import abc
+import fnmatch
+import hashlib
+import os
+import pickle
+import shlex
+import subprocess
+import tempfile
+import threading
+
+# local packages
+from src.logger    import Logger
+from src.logreader import SUFFIXES
+from src.pipeline  import concurrent
+
+
+class RemoteFile (NamedTuple):
+	'''A log file on a host, as listed by a Transport().'''
+
+	name:str				# file name, in the log directory of the host
+	size:int				# bytes
+	mtime:float				# modification time in seconds
+
+
+class Transport (abc.ABC):
+	'''
+	Read the log files in a directory of a host. A transport lists the files
+	and reads a byte range of a file, so only the bytes appended since the
+	last copy are transferred, and returns the checksum of a byte range
+	computed on the host, so a copy is verified without reading it twice.
+	'''
+
+	def __init__ (self, directory:str, patterns:List[str]) -> None:
+		self._directory = directory
+		self._patterns = patterns		# file name patterns, a compressed log (chia.log.gz) matches too
+
+	def matches (self, name:str) -> bool:
+		'''Return True if a file name matches one of the patterns.'''
+
+		for pattern in self._patterns:
+			if fnmatch.fnmatch(name, pattern) or any(fnmatch.fnmatch(name, pattern + suffix) for suffix in SUFFIXES):
+				return True
+		return False
+
+	@abc.abstractmethod
+	def list (self) -> List[RemoteFile]:
+		'''Return the log files that match the patterns.'''
+
+	@abc.abstractmethod
+	def read (self, name:str, offset:int, size:int) -> bytes:
+		'''Return size bytes of a file from a byte offset, fewer if the file is shorter.'''
+
+	@abc.abstractmethod
+	def checksum (self, name:str, offset:int, size:int) -> str:
+		'''Return the sha256 (hex) of size bytes of a file from a byte offset.'''
+
+	def close (self) -> None:
+		pass
+
+
+class LocalTransport (Transport):
+	'''
+	A log directory on this machine or mounted from a host (NFS, SMB, or
+	sshfs), so the logs of a host can be collected without ssh and the
+	collector can be run without a network.
+	'''
+
+	def list (self) -> List[RemoteFile]:
+		files:List[RemoteFile] = []
+		with os.scandir(self._directory) as entries:
+			for entry in entries:
+				if self.matches(entry.name) and entry.is_file():
+					stat = entry.stat()
+					files.append(RemoteFile(entry.name, stat.st_size, stat.st_mtime))
+		return files
+
+	def read (self, name:str, offset:int, size:int) -> bytes:
+		with open(os.path.join(self._directory, name), 'rb') as f:
+			f.seek(offset)
+			return f.read(size)
+
+	def checksum (self, name:str, offset:int, size:int) -> str:
+		return hashlib.sha256(self.read(name, offset, size)).hexdigest()
+
+
+class SshTransport (Transport):
+	'''
+	A log directory on a host reached with ssh. The commands of one host
+	share one ssh connection (ControlMaster), so listing the files and
+	copying each appended byte range do not log in again. The host needs
+	find, tail, head, and sha256sum, which every Linux plotter has.
+	'''
+
+	# seconds a command may take, a copy is at most Collector.READ_BYTES
+	TIMEOUT = 300.0
+
+	# seconds the shared connection stays open after the last command
+	PERSIST = 120
+
+	def __init__ (self, directory:str, patterns:List[str], address:str, user:str = '', key:str = '', port:int = 0, ssh:str = 'ssh') -> None:
+		super().__init__(directory, patterns)
+
+		self._destination = f'{user}@{address}' if user else address
+		self._ssh = shlex.split(ssh)
+		self._options = [
+			'-o', 'BatchMode=yes',
+			'-o', 'ControlMaster=auto',
+			'-o', f'ControlPath={os.path.join(tempfile.gettempdir(), "chia-log-ssh-%C")}',
+			'-o', f'ControlPersist={self.PERSIST}',
+		]
+		if key:
+			self._options += ['-i', os.path.expanduser(key)]
+		if port:
+			self._options += ['-p', str(port)]
+
+	def _run (self, command:str) -> bytes:
+		'''Run a shell command on the host and return its output, raise OSError if it fails.'''
+
+		try:
+			result = subprocess.run(self._ssh + self._options + [self._destination, command], capture_output=True, timeout=self.TIMEOUT)
+		except subprocess.TimeoutExpired:
+			raise OSError(f'ssh {self._destination} timed out')
+		if result.returncode != 0:
+			raise OSError(f'ssh {self._destination} failed ({result.returncode}) {result.stderr.decode(errors="replace").strip()}')
+		return result.stdout
+
+	def _range (self, name:str, offset:int, size:int) -> str:
+		'''Return a shell command that writes a byte range of a file.'''
+
+		path = shlex.quote(self._directory.rstrip('/') + '/' + name)
+		return f'tail -c +{offset + 1} {path} | head -c {size}'
+
+	def list (self) -> List[RemoteFile]:
+		output = self._run(f'find {shlex.quote(self._directory)} -maxdepth 1 -type f -printf "%f\\t%s\\t%T@\\n"')
+
+		files:List[RemoteFile] = []
+		for line in output.decode(errors='replace').splitlines():
+			name, size, mtime = line.rsplit('\t', 2)
+			if self.matches(name):
+				files.append(RemoteFile(name, int(size), float(mtime)))
+		return files
+
+	def read (self, name:str, offset:int, size:int) -> bytes:
+		return self._run(self._range(name, offset, size))
+
+	def checksum (self, name:str, offset:int, size:int) -> str:
+		return self._run(self._range(name, offset, size) + ' | sha256sum').split()[0].decode()
+
+	def close (self) -> None:
+		'''Close the shared connection.'''
+
+		subprocess.run(self._ssh + self._options + ['-O', 'exit', self._destination], capture_output=True, timeout=self.TIMEOUT)
+
+
+class HostConfig (NamedTuple):
+	'''A host in the "collector" section of the config file.'''
+
+	name:str				# sub-directory of the copies
+	transport:str			# local or ssh
+	directory:str			# log directory on the host
+	address:str = ''		# ssh host name or address
+	user:str = ''
+	key:str = ''			# ssh private key file
+	port:int = 0			# ssh port, 0 is the default
+	ssh:str = 'ssh'			# ssh command
+
+	def open (self, patterns:List[str]) -> Transport:
+		'''Return the Transport() of the host.'''
+
+		if self.transport == 'ssh':
+			return SshTransport(self.directory, patterns, self.address, self.user, self.key, self.port, self.ssh)
+		return LocalTransport(self.directory, patterns)
+
+
+class Checkpoint (NamedTuple):
+	'''The bytes of a log file copied from a host.'''
+
+	size:int				# bytes copied
+	mtime:float				# modification time of the file on the host
+	checksum:str			# sha256 of the bytes just before size
+
+
+class Appended (NamedTuple):
+	'''A byte range copied from a host, see Collector.collect().'''
+
+	host:str
+	path:Path				# the copy
+	offset:int				# byte offset of data in the file
+	data:bytes
+
+
+class Collector:
+	'''
+	Copy the log files of many hosts to a destination directory, with a
+	sub-directory for each host. A checkpoint of each file (the size copied
+	and the checksum of the bytes before it) is kept, so a file that grew is
+	copied from where the last copy ended, a file that did not change is not
+	read, and a file that was rewritten is copied again. Each byte range is
+	checked against the checksum computed on the host before it is written.
+
+	The hosts are copied at the same time, and the appended bytes are
+	returned as they are copied (see collect()), so they are parsed without
+	reading the copies again.
+	'''
+
+	VERSION = 1
+
+	# number of bytes before the checkpoint used to check a file was not rewritten
+	CHECKSUM_BYTES = 4096
+
+	# bytes copied at a time, each range is verified on its own; a few
+	# ranges of each host wait to be parsed, so this bounds the memory
+	READ_BYTES = 4 * 1024 * 1024
+
+	def __init__ (self, destination:Path, hosts:List[HostConfig], patterns:List[str], logger:Logger, checkpoint_file:Optional[Path] = None, jobs:int = 8, verify:bool = True) -> None:
+		self._destination = destination
+		self._hosts = hosts
+		self._patterns = patterns
+		self._logger = logger
+		self._checkpoint_file = checkpoint_file
+		self._jobs = jobs
+		self._verify = verify
+
+		# key is host/file name, value is a Checkpoint()
+		self._checkpoints:Dict[str, Checkpoint] = {}
+		self._lock = threading.Lock()
+		self._changed:bool = False
+
+		self._transports:Dict[str, Transport] = {}	# key is a host, kept open between collect() calls
+
+		self._copied:Dict[str, int] = {}		# key is a host, value is bytes copied by the last collect()
+		self._errors:Dict[str, str] = {}		# key is a host, value is why the last collect() did not finish it
+
+	@property
+	def copied (self) -> Dict[str, int]:
+		'''Return the bytes copied from each host by the last collect().'''
+
+		return self._copied
+
+	@property
+	def errors (self) -> Dict[str, str]:
+		'''Return the hosts the last collect() could not finish, value is the error.'''
+
+		return self._errors
+
+	def load (self) -> None:
+		'''Load the checkpoint file. A missing, old, or damaged file is ignored, so every log is copied again.'''
+
+		log_prefix = 'Collector'
+
+		if not self._checkpoint_file or not self._checkpoint_file.exists():
+			return
+
+		try:
+			with open(self._checkpoint_file, 'rb') as f:
+				data = pickle.load(f)
+		except Exception as e:
+			self._logger.warn('%s ignoring checkpoint file %s, %s', log_prefix, self._checkpoint_file, e)
+			return
+
+		if not isinstance(data, dict) or data.get('version') != self.VERSION:
+			self._logger.warn('%s ignoring checkpoint file %s, wrong version', log_prefix, self._checkpoint_file)
+			return
+
+		self._checkpoints = data['checkpoints']
+		self._logger.info('%s loaded %s checkpoints from %s', log_prefix, len(self._checkpoints), self._checkpoint_file)
+
+	def save (self) -> None:
+		'''Save the checkpoint file if it changed. The file is replaced atomically.'''
+
+		if not self._checkpoint_file or not self._changed:
+			return
+
+		with self._lock:
+			data = {'version': self.VERSION, 'checkpoints': dict(self._checkpoints)}
+			self._changed = False
+
+		temp_path = self._checkpoint_file.with_name(self._checkpoint_file.name + '.tmp')
+		with open(temp_path, 'wb') as f:
+			pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+		os.replace(temp_path, self._checkpoint_file)
+
+	def collect (self) -> Iterator[Appended]:
+		'''
+		Copy the bytes appended to the log files of every host since the last
+		collect(), at most jobs hosts at a time, and return each byte range
+		once it is verified and written. A host that fails (see errors) is
+		tried again by the next collect(). The destination and the directory
+		of each host are created the first time they are written.
+		'''
+
+		self._copied = {host.name: 0 for host in self._hosts}
+		self._errors = {}
+
+		yield from concurrent((self._collect_host(host) for host in self._hosts), self._jobs, 4)
+
+	def _collect_host (self, host:HostConfig) -> Iterator[Appended]:
+		'''Copy the appended bytes of the log files of one host.'''
+
+		transport = self._transports.get(host.name)
+		if not transport:
+			transport = self._transports[host.name] = host.open(self._patterns)
+		directory = self._destination / host.name
+
+		try:
+			directory.mkdir(parents=True, exist_ok=True)
+			for remote in transport.list():
+				yield from self._copy(host.name, transport, remote, directory / remote.name)
+
+		except (OSError, ValueError) as e:
+			self._logger.error('Collector %s %s', host.name, e)
+			self._errors[host.name] = str(e)
+
+			# connect again for the next collect()
+			del self._transports[host.name]
+			_close(transport)
+
+	def close (self) -> None:
+		'''Close the transports, such as the ssh connection of each host.'''
+
+		for transport in self._transports.values():
+			_close(transport)
+		self._transports = {}
+
+	def _copy (self, host:str, transport:Transport, remote:RemoteFile, path:Path) -> Iterator[Appended]:
+		'''Copy the bytes of one file after its checkpoint, a range at a time.'''
+
+		key = f'{host}/{remote.name}'
+		checkpoint = self._checkpoints.get(key)
+
+		offset = self._resume(key, transport, remote, path, checkpoint)
+		if offset is None:
+			return
+		if offset == 0 and checkpoint:
+			self._logger.info('Collector %s changed, copying it again', key)
+
+		with open(path, 'r+b' if path.exists() else 'wb') as f:
+			f.truncate(offset)
+			f.seek(offset)
+
+			while offset < remote.size:
+				size = min(self.READ_BYTES, remote.size - offset)
+				data = transport.read(remote.name, offset, size)
+				if len(data) != size:
+					raise OSError(f'{key} read {len(data)} of {size} bytes at offset {offset}, the file is shorter')
+				if self._verify and hashlib.sha256(data).hexdigest() != transport.checksum(remote.name, offset, size):
+					raise OSError(f'{key} checksum does not match at offset {offset}')
+
+				f.write(data)
+				f.flush()
+				self._checkpoint(key, f, offset + size, remote.mtime, data)
+				self._copied[host] += size
+				self._logger.debug('Collector %s copied %s bytes at offset %s', key, size, offset)
+
+				yield Appended(host, path, offset, data)
+				offset += size
+
+	def _resume (self, key:str, transport:Transport, remote:RemoteFile, path:Path, checkpoint:Optional[Checkpoint]) -> Optional[int]:
+		'''
+		Return the byte offset to copy a file from: the checkpoint if the file
+		only grew, or 0 if it is new or was rewritten. Return None if the file
+		has not changed.
+		'''
+
+		if not checkpoint or not path.exists() or path.stat().st_size < checkpoint.size or remote.size < checkpoint.size:
+			return 0
+
+		if remote.size == checkpoint.size and remote.mtime == checkpoint.mtime:
+			return None
+
+		start = max(0, checkpoint.size - self.CHECKSUM_BYTES)
+		if transport.checksum(remote.name, start, checkpoint.size - start) != checkpoint.checksum:
+			return 0
+
+		# only the modification time changed
+		if remote.size == checkpoint.size:
+			with self._lock:
+				self._checkpoints[key] = checkpoint._replace(mtime=remote.mtime)
+				self._changed = True
+			return None
+
+		return checkpoint.size
+
+	def _checkpoint (self, key:str, f:BinaryIO, size:int, mtime:float, data:bytes) -> None:
+		'''Store the checkpoint of a file after the byte range data, which ends at size, was written to the copy f.'''
+
+		tail = data[-self.CHECKSUM_BYTES:]
+		if len(tail) < self.CHECKSUM_BYTES and len(data) < size:
+			start = max(0, size - self.CHECKSUM_BYTES)
+			with open(f.name, 'rb') as copy:
+				copy.seek(start)
+				tail = copy.read(size - start)
+
+		with self._lock:
+			self._checkpoints[key] = Checkpoint(size, mtime, hashlib.sha256(tail).hexdigest())
+			self._changed = True
+
+
+def _close (transport:Transport) -> None:
+	try:
+		transport.close()
+	except (OSError, subprocess.SubprocessError):
+		pass
@@ -1,13 +1,18 @@
 # system packages
 from pathlib import Path
-from typing  import Any, Dict, List
+from typing  import Any, Dict, List, Optional, TextIO
+import os
+import sys
 #import pprint
 
 # third party packages
 import yaml
 
 # local packages
-from src.logger import Logger
+from src.collector   import HostConfig
+from src.logger      import Logger
+from src.plotmatcher import PlotMatcher
+from src.profiler    import Profiler
 
 
 class Config:
@@ -15,31 +20,114 @@ class Config:
 		# CLI options
 		self._option_config:str   = ''			# --config file
 		self._option_details:bool = False		# --details
-		self._option_file:str     = ''			# --file to process
+		self._option_file:str     = ''			# --file to process, - is stdin
+		self._option_follow:bool  = False		# --follow log files as they grow
+		self._option_jobs:int     = 1			# --jobs, number of processes
 		self._option_output:str   = ''			# --output format
+		self._option_output_file:str = ''		# --output-file, stdout if not set
+		self._option_profile:bool = False		# --profile
+		self._option_profile_pstats:str = ''	# --profile-pstats file
+		self._option_profile_trace:str  = ''	# --profile-trace file
+		self._option_readers:int  = 4			# --readers, log files read ahead
+		self._option_rebuild_cache:bool = False	# --rebuild-cache
 		self._option_verbose:int  = 0 			# --verbose logging
 
+		# cache section
+		self._cache_file:Optional[Path] = None	# plot cache file, None disables the cache
+
+		# warehouse section
+		self._warehouse_file:Optional[Path] = None	# plot database (SQLite), None disables the warehouse
+
 		# directories section
 		self._log_directories:List[Path] = []	# a list of log directories
 
+		# collector section
+		self._collector_destination:Optional[Path] = None	# directory of the copied logs, None disables the collector
+		self._collector_checkpoint_file:Optional[Path] = None	# bytes copied from each log, None copies every log again
+		self._collector_hosts:List[HostConfig] = []			# hosts to copy the logs of
+		self._collector_jobs:int = 8						# hosts copied at the same time
+		self._collector_verify:bool = True					# check each copied range with a checksum
+
 		# plotConfigurations section
 		self._plot_configs:List[Any]= []	# various plot configurations
+		self._plot_matcher = PlotMatcher()	# the plot configurations compiled for matching
 
 		# files section
 		self._patterns:List[str] = []			# log file patterns to look for
+		self._excludes:List[str] = []			# file and directory patterns to skip
+		self._max_depth:Optional[int] = None	# directory levels below a log directory, None is no limit
+		self._time_budget:Optional[float] = None	# seconds to extract one log file, None is no limit
+		self._mmap:bool = True					# memory-map large local log files
 
 		# is the configuration valid
 		self._valid:bool = False
 		self._logger = Logger()
+		self._profiler = Profiler()
 
 	@property
 	def plot_configurations (self) -> List[Any]:
 		return self._plot_configs
 
+	@property
+	def plot_matcher (self) -> PlotMatcher:
+		'''Match plot directories to a plot configuration name'''
+
+		return self._plot_matcher
+
+	@property
+	def cache_file (self) -> Optional[Path]:
+		'''The plot cache file, or None if the cache is disabled'''
+
+		return self._cache_file
+
+	@property
+	def collector_destination (self) -> Optional[Path]:
+		'''The directory of the logs copied by the collector, or None if the collector is disabled'''
+
+		return self._collector_destination
+
+	@property
+	def collector_checkpoint_file (self) -> Optional[Path]:
+		return self._collector_checkpoint_file
+
+	@property
+	def collector_hosts (self) -> List[HostConfig]:
+		return self._collector_hosts
+
+	@property
+	def collector_jobs (self) -> int:
+		return self._collector_jobs
+
+	@property
+	def collector_verify (self) -> bool:
+		return self._collector_verify
+
+	@property
+	def details (self) -> bool:
+		'''Report every plot, not only the summaries'''
+
+		return self._option_details
+
+	@property
+	def excludes (self) -> List[str]:
+		'''File and directory patterns to skip when looking for log files'''
+
+		return self._excludes
+
 	@property
 	def file (self) -> str:
 		return self._option_file
 
+	@property
+	def is_text (self) -> bool:
+		return self._option_output in ['', 'text']
+
+	@property
+	def console (self) -> TextIO:
+		'''Where messages for the user are printed: stdout, or stderr when stdout has a csv, json or markdown report'''
+
+		return sys.stdout if self.is_text else sys.stderr
+
 	@property
 	def is_csv (self) -> bool:
 		return self._option_output == 'csv'
@@ -50,7 +138,39 @@ class Config:
 
 	@property
 	def is_json (self) -> bool:
-		return self._option_output.lower() == 'json'
+		return self._option_output in ['json', 'jsonl']
+
+	@property
+	def output (self) -> str:
+		'''The --output format: text, csv, json (JSON Lines), or markdown'''
+
+		return self._option_output or 'text'
+
+	@property
+	def output_file (self) -> str:
+		'''The file the report is written to, stdout if empty'''
+
+		return self._option_output_file
+
+	@property
+	def follow (self) -> bool:
+		'''Follow log files as they grow'''
+
+		return self._option_follow
+
+	@property
+	def jobs (self) -> int:
+		'''Number of processes used to extract plots, 0 is one per CPU'''
+
+		if self._option_jobs == 0:
+			return os.cpu_count() or 1
+		return self._option_jobs
+
+	@property
+	def readers (self) -> int:
+		'''Number of log files read ahead by background threads with one job, 0 is no read ahead'''
+
+		return self._option_readers
 
 	@property
 	def log_directories (self) -> List[Path]:
@@ -62,25 +182,69 @@ class Config:
 	def logger (self) -> Logger:
 		return self._logger
 
+	@property
+	def max_depth (self) -> Optional[int]:
+		'''Directory levels below a log directory to look for log files, None is no limit'''
+
+		return self._max_depth
+
 	@property
 	def patterns (self) -> List[str]:
 		return self._patterns
 
+	@property
+	def time_budget (self) -> Optional[float]:
+		'''Seconds to spend extracting one log file before giving up on it, None is no limit'''
+
+		return self._time_budget
+
+	@property
+	def mmap (self) -> bool:
+		'''Memory-map large local log files and scan them as bytes, instead of reading them line by line'''
+
+		return self._mmap
+
+	@property
+	def profiler (self) -> Profiler:
+		'''Stage timers and counters, enabled by --profile'''
+
+		return self._profiler
+
+	@property
+	def rebuild_cache (self) -> bool:
+		'''Ignore the existing plot cache and create a new one'''
+
+		return self._option_rebuild_cache
+
 	@property
 	def valid (self) -> bool:
 		'''Is the configuration valid (True) or not (False)'''
 
 		return self._valid
 
+	@property
+	def warehouse_file (self) -> Optional[Path]:
+		'''The plot warehouse (SQLite) file, or None if the warehouse is disabled'''
+
+		return self._warehouse_file
+
 	@property
 	def verbose (self) -> int:
 		return self._option_verbose
 
-	def cli_options ( self, option_config:str, option_details:bool, option_file:str, option_output:str, option_verbose:int) -> None:
+	def cli_options ( self, option_config:str, option_details:bool, option_file:str, option_output:str, option_verbose:int, option_jobs:int = 1, option_rebuild_cache:bool = False, option_follow:bool = False, option_profile:bool = False, option_profile_pstats:str = '', option_profile_trace:str = '', option_output_file:str = '', option_readers:int = 4) -> None:
 		self._option_config:str   = option_config			# --config file
 		self._option_details:bool = option_details			# --details
-		self._option_file:str     = option_file				# --file to process
+		self._option_file:str     = option_file				# --file to process, - is stdin
+		self._option_follow:bool  = option_follow			# --follow log files as they grow
+		self._option_jobs:int     = option_jobs				# --jobs, number of processes
+		self._option_rebuild_cache:bool = option_rebuild_cache	# --rebuild-cache
 		self._option_output:str   = option_output.lower()	# --output format
+		self._option_output_file:str = option_output_file	# --output-file, stdout if not set
+		self._option_profile:bool = option_profile			# --profile
+		self._option_profile_pstats:str = option_profile_pstats	# --profile-pstats file
+		self._option_profile_trace:str  = option_profile_trace		# --profile-trace file
+		self._option_readers:int  = option_readers			# --readers, log files read ahead
 		self._option_verbose:int  = option_verbose 			# --verbose logging
 
 		# validate the configuration file and command-line arguments
@@ -89,6 +253,12 @@ class Config:
 		self._valid = valid_con and valid_cli
 
 		self._logger.set_log_level(self._option_verbose)
+		self._logger.set_stderr(not self.is_text)
+		self._profiler.configure(self._option_profile, self._option_profile_pstats, self._option_profile_trace)
+
+		# overlapping plot configurations are allowed (the first one is used), but may be a mistake
+		for overlap in self._plot_matcher.overlaps():
+			self._logger.warn('in config file, %s', overlap)
 
 	def _validate_config (self) -> bool:
 		'''Validate the configuration file'''
@@ -125,16 +295,46 @@ class Config:
 						else:
 							print(f'Error: in config file, log directory does not exist -> {log}')
 
-		if not self._log_directories:
+		# the "collector" section, the copies are log files too
+		if cfg and cfg.get('collector'):
+			if not self._validate_collector(cfg['collector']):
+				return False
+
+		if not self._log_directories and not self._collector_destination:
 			print(f'Error: in config file, no valid log directories found')
 			return False
 
+		# the "cache" section
+		if cfg and 'cache' in cfg:
+			cache:Dict[str, Any] = cfg['cache']
+
+			if cache and 'file' in cache and cache['file']:
+				self._cache_file = Path(cache['file']).resolve()
+
+		# the "warehouse" section
+		if cfg and 'warehouse' in cfg:
+			warehouse:Dict[str, Any] = cfg['warehouse']
+
+			if warehouse and 'file' in warehouse and warehouse['file']:
+				self._warehouse_file = Path(warehouse['file']).resolve()
+
 		# the "plotConfigurations" section
 		if cfg and 'plotConfigurations' in cfg:
 			plot_configs:List[Any] = cfg['plotConfigurations']
 
 			if plot_configs:
+				for index, plot_config in enumerate(plot_configs, 1):
+					if not isinstance(plot_config, dict):
+						print(f'Error: in config file, plot configuration {index} is not a mapping')
+						return False
+
+					for key in ['name', 'dest', 'temp']:
+						if not plot_config.get(key):
+							print(f'Error: in config file, plot configuration {index} has no "{key}"')
+							return False
+
 				self._plot_configs = plot_configs
+				self._plot_matcher = PlotMatcher(plot_configs)
 
 		# the "files" section
 		if cfg and 'files' in cfg:
@@ -147,6 +347,33 @@ class Config:
 					for pattern in patterns:
 						self._patterns.append(pattern)
 
+			if files and 'exclude' in files:
+				excludes:List[str] = files['exclude']
+
+				if excludes:
+					for exclude in excludes:
+						self._excludes.append(exclude)
+
+			if files and files.get('max-depth') is not None:
+				max_depth = files['max-depth']
+				if not isinstance(max_depth, int) or max_depth < 0:
+					print(f'Error: in config file, max-depth must be 0 or more -> {max_depth}')
+					return False
+				self._max_depth = max_depth
+
+			if files and files.get('time-budget') is not None:
+				time_budget = files['time-budget']
+				if isinstance(time_budget, bool) or not isinstance(time_budget, (int, float)) or time_budget <= 0:
+					print(f'Error: in config file, time-budget must be more than 0 seconds -> {time_budget}')
+					return False
+				self._time_budget = float(time_budget)
+
+			if files and files.get('mmap') is not None:
+				if not isinstance(files['mmap'], bool):
+					print(f'Error: in config file, mmap must be true or false -> {files["mmap"]}')
+					return False
+				self._mmap = files['mmap']
+
 		# the "logging" section
 		if cfg and 'logging' in cfg:
 			logging:Dict[str, Any] = cfg['logging']
@@ -165,6 +392,68 @@ class Config:
 
 		return True
 
+	def _validate_collector (self, collector:Dict[str, Any]) -> bool:
+		'''Validate the "collector" section of the configuration file'''
+
+		if not isinstance(collector, dict) or not collector.get('destination'):
+			print(f'Error: in config file, collector has no "destination"')
+			return False
+
+		# the destination is created by the first collect (see Collector.collect()), until then it has no logs
+		destination = Path(collector['destination']).expanduser().resolve()
+		self._collector_destination = destination
+		if destination.exists() and destination not in self._log_directories:
+			self._log_directories.append(destination)
+
+		if collector.get('checkpoints'):
+			self._collector_checkpoint_file = Path(collector['checkpoints']).expanduser().resolve()
+
+		if collector.get('jobs') is not None:
+			jobs = collector['jobs']
+			if isinstance(jobs, bool) or not isinstance(jobs, int) or jobs < 1:
+				print(f'Error: in config file, collector jobs must be 1 or more -> {jobs}')
+				return False
+			self._collector_jobs = jobs
+
+		if collector.get('verify') is not None:
+			if not isinstance(collector['verify'], bool):
+				print(f'Error: in config file, collector verify must be true or false -> {collector["verify"]}')
+				return False
+			self._collector_verify = collector['verify']
+
+		names:List[str] = []
+		for index, host in enumerate(collector.get('hosts') or [], 1):
+			if not isinstance(host, dict):
+				print(f'Error: in config file, collector host {index} is not a mapping')
+				return False
+
+			name = str(host.get('name') or host.get('address') or '')
+			transport = host.get('transport', 'ssh')
+			if not name or name in ('.', '..') or '/' in name or name in names:
+				print(f'Error: in config file, collector host {index} needs a unique "name" without a "/" -> {name}')
+				return False
+			if transport not in ('local', 'ssh'):
+				print(f'Error: in config file, collector host {name} transport must be local or ssh -> {transport}')
+				return False
+			if not host.get('directory'):
+				print(f'Error: in config file, collector host {name} has no "directory"')
+				return False
+			if transport == 'ssh' and not host.get('address'):
+				print(f'Error: in config file, collector host {name} has no "address"')
+				return False
+			port = host.get('port', 0)
+			if isinstance(port, bool) or not isinstance(port, int) or not 0 <= port < 65536:
+				print(f'Error: in config file, collector host {name} port is not valid -> {port}')
+				return False
+
+			names.append(name)
+			self._collector_hosts.append(HostConfig(
+				name, transport, str(host['directory']), str(host.get('address', '')), str(host.get('user', '')),
+				str(host.get('key', '')), port, str(host.get('ssh', 'ssh')),
+			))
+
+		return True
+
 	def _validate_cli (self) -> bool:
 		'''Validate the CLI arguments'''
 
@@ -177,20 +466,37 @@ class Config:
 				print(f'Error: config file does not exist ({self._option_config})')
 				valid = False
 
-		# --file - validate if a specified file exists
-		if self._option_file:
+		# --file - validate if a specified file exists, - is stdin
+		if self._option_file and self._option_file != '-':
 			p = Path(self._option_file).resolve()
 			if not p.exists():
 				print(f'Error: file does not exist ({self._option_file})')
 				valid = False
 
-		# --output - validate the output type (csv, json, md, or markdown)
+		# --jobs - validate the number of processes
+		if self._option_jobs < 0:
+			print(f'Error: jobs must be 0 (one per CPU) or more, you specified {self._option_jobs}')
+			valid = False
+
+		# --readers - validate the number of log files read ahead
+		if self._option_readers < 0:
+			print(f'Error: readers must be 0 (no read ahead) or more, you specified {self._option_readers}')
+			valid = False
+
+		# --output - validate the output type (text, csv, json, jsonl, md, or markdown)
 		if self._option_output:
-			valid_output = ['csv', 'json', 'markdown', 'md']
+			valid_output = ['text', 'csv', 'json', 'jsonl', 'markdown', 'md']
 			if self._option_output.lower() not in valid_output:
 				print(f'Error: output type not valid ({self._option_output})')
 				valid = False
 
+		# --output-file - the directory must exist
+		if self._option_output_file and self._option_output_file != '-':
+			p = Path(self._option_output_file).resolve().parent
+			if not p.is_dir():
+				print(f'Error: output file directory does not exist ({p})')
+				valid = False
+
 		# --verbose - validate the number of verbose flags
 		if self._option_verbose > 3:
 			print(f'Error: three (3) verbose flags is the limit, you specified {self._option_verbose}')
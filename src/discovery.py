@@ -0,0 +1,137 @@
+# system packages
+from pathlib import Path
+from typing  import Iterable, Iterator, List, Optional, Pattern, Set, Tuple
+import fnmatch
+import os
+import re
+
+# local packages
+from src.logger   import Logger
+from src.profiler import Profiler
+
+
+class FileDiscovery:
+	'''
+	Find the log files in directories with one os.scandir() walk of each
+	directory, matching every pattern at once with one regular expression.
+	Files are returned as they are found, in sorted path order, and a file
+	is only returned once even if it is found through a symlink, a hard
+	link, or in two of the directories. Directories and files that match an
+	exclude pattern are skipped, and max_depth limits how far below a
+	directory to look (0 is only the files in the directory).
+
+	A pattern without a "/" matches the file name, like "**/pattern" with
+	glob(). A pattern with a "/" matches the path relative to the directory.
+	'''
+
+	def __init__ (self, patterns:Iterable[str], excludes:Iterable[str] = (), max_depth:Optional[int] = None, suffixes:Iterable[str] = (), logger:Optional[Logger] = None, profiler:Optional[Profiler] = None) -> None:
+		'''
+		Suffixes are added to each pattern, for example ".gz" so "chia*.log"
+		also matches "chia-1.log.gz".
+		'''
+
+		patterns = list(patterns)
+		suffixes = list(suffixes)
+		patterns += [pattern + suffix for pattern in patterns for suffix in suffixes]
+
+		self._names, self._paths = compile_patterns(patterns)
+		self._exclude_names, self._exclude_paths = compile_patterns(excludes)
+
+		self._max_depth = max_depth
+		self._logger    = logger or Logger()
+		self._profiler  = profiler
+
+	def files (self, directories:Iterable[Path]) -> Iterator[Path]:
+		'''Return each file that matches a pattern in the directories.'''
+
+		seen_dirs:Set[Tuple[int, int]] = set()		# (device, inode) of directories walked
+		seen_files:Set[Tuple[int, int]] = set()		# (device, inode) of files returned
+
+		for directory in directories:
+			try:
+				stat = directory.stat()
+			except OSError as e:
+				self._logger.warn('FileDiscovery %s %s', directory, e)
+				continue
+
+			seen_dirs.add((stat.st_dev, stat.st_ino))
+			yield from self._walk(str(directory), stat.st_dev, '', 0, seen_dirs, seen_files)
+
+	def _walk (self, directory:str, device:int, relative:str, depth:int, seen_dirs:Set[Tuple[int, int]], seen_files:Set[Tuple[int, int]]) -> Iterator[Path]:
+		'''
+		Return the matching files in a directory and below it. Device is the
+		device of the directory, relative is its path below the root.
+		'''
+
+		try:
+			with os.scandir(directory) as scan:
+				entries = list(scan)
+		except OSError as e:
+			self._logger.warn('FileDiscovery %s %s', directory, e)
+			return
+
+		profiler = self._profiler
+		if profiler and profiler.enabled:
+			profiler.count('directories scanned')
+			profiler.count('directory entries', len(entries))
+
+		# sorted as full paths sort, "a.log" before the directory "a/"
+		entries.sort(key=lambda entry: entry.name + '/' if entry.is_dir() else entry.name)
+
+		for entry in entries:
+			name = entry.name
+			path = relative + name
+
+			if self._exclude_names.match(name) or self._exclude_paths.match(path):
+				continue
+
+			try:
+				if entry.is_dir():
+					if self._max_depth is not None and depth >= self._max_depth:
+						continue
+
+					# a directory is walked once, symlinks may loop
+					stat = entry.stat()
+					key = (stat.st_dev, stat.st_ino)
+					if key in seen_dirs:
+						continue
+					seen_dirs.add(key)
+
+					yield from self._walk(entry.path, stat.st_dev, path + '/', depth + 1, seen_dirs, seen_files)
+
+				elif self._names.match(name) or self._paths.match(path):
+					# the inode of a file comes with the directory entry, only a
+					# symlink needs a stat() call (which is slow on NFS)
+					if entry.is_symlink():
+						stat = entry.stat()
+						key = (stat.st_dev, stat.st_ino)
+					else:
+						key = (device, entry.inode())
+					if key in seen_files:
+						self._logger.debug('FileDiscovery %s already found', entry.path)
+						continue
+					seen_files.add(key)
+
+					yield Path(entry.path)
+
+			except OSError as e:		# a broken symlink, or the entry was removed
+				self._logger.debug('FileDiscovery %s %s', entry.path, e)
+
+
+def compile_patterns (patterns:Iterable[str]) -> Tuple[Pattern[str], Pattern[str]]:
+	'''
+	Return one regular expression for the patterns without a "/" (matched
+	against a name) and one for the patterns with a "/" (matched against a
+	relative path). An empty list never matches.
+	'''
+
+	names:List[str] = []
+	paths:List[str] = []
+	for pattern in patterns:
+		if '/' in pattern:
+			paths.append(fnmatch.translate(pattern.lstrip('/')))
+		else:
+			names.append(fnmatch.translate(pattern))
+
+	never = r'(?!)'
+	return re.compile('|'.join(names) or never), re.compile('|'.join(paths) or never)
@@ -0,0 +1,283 @@
+# system packages
+from contextlib import redirect_stdout
+from pathlib    import Path
+from typing     import BinaryIO, Callable, Dict, Iterable, List, Optional
+import os
+import time
+
+# local packages
+from src.analyze      import Analyze
+from src.collector    import Collector
+from src.config       import Config
+from src.logreader    import compression
+from src.plot         import Plot
+from src.plots        import Plots
+from src.plotsplitter import MAX_LINE_BYTES, PlotSplitter, read_lines
+
+
+class FollowedFile:
+	'''
+	A log file that is kept open while it grows. Only the bytes appended since
+	the last read are processed.
+	'''
+
+	# number of bytes read at a time
+	READ_BYTES = 1024 * 1024
+
+	def __init__ (self, path:Path, offset:int = 0, index:int = 1) -> None:
+		self.path = path
+
+		self._f:Optional[BinaryIO] = None
+		self._reset(offset, index)
+
+	def _reset (self, offset:int, index:int) -> None:
+		self._position:int = offset				# bytes read so far
+		self._index:int = index					# index of the next plot
+		self._partial:bytes = b''				# the last line, until it is complete
+		self._splitter = PlotSplitter(offset)
+
+	def close (self) -> None:
+		if self._f:
+			self._f.close()
+			self._f = None
+
+	def read (self) -> List[List[str]]:
+		'''Read the appended bytes and return the lines of each plot that finished.'''
+
+		# the file was truncated or replaced, start over
+		stat = self.path.stat()
+		if self._f and (stat.st_ino != os.fstat(self._f.fileno()).st_ino or stat.st_size < self._position):
+			self.close()
+			self._reset(0, 1)
+
+		if not self._f:
+			self._f = open(self.path, 'rb')
+			self._f.seek(self._position)
+
+		plots:List[List[str]] = []
+		while True:
+			data = self._f.read(self.READ_BYTES)
+			if not data:
+				break
+			self._position += len(data)
+			plots.extend(self.feed(data))
+
+		return plots
+
+	def append (self, offset:int, data:bytes) -> List[List[str]]:
+		'''
+		Process bytes that were written to the file at a byte offset, such as
+		a range copied by the Collector(), without reading them back. If they
+		do not follow the bytes already processed, the file is read instead,
+		from the start if it was rewritten.
+		'''
+
+		if offset < self._position:
+			self.close()
+			self._reset(0, 1)
+
+		if offset != self._position:
+			return self.read()
+
+		self._position += len(data)
+		if self._f:
+			self._f.seek(self._position)
+		return self.feed(data)
+
+	def feed (self, data:bytes) -> List[List[str]]:
+		'''
+		Feed bytes to the splitter, holding back a line that is not complete. A
+		line longer than MAX_LINE_BYTES is fed in pieces, as read_lines() returns
+		it, so at most MAX_LINE_BYTES are held back however long a line grows.
+		'''
+
+		plots:List[List[str]] = []
+
+		lines = (self._partial + data).split(b'\n')
+		partial = lines.pop()
+
+		# the pieces of the line that is not complete, except the last one
+		complete = (len(partial) - 1) // MAX_LINE_BYTES * MAX_LINE_BYTES if partial else 0
+		self._partial = partial[complete:]
+
+		pieces = [line + b'\n' for line in lines]
+		if complete:
+			pieces.append(partial[:complete])
+
+		for piece in pieces:
+			for start in range(0, len(piece), MAX_LINE_BYTES):
+				result = self._splitter.feed(piece[start:start + MAX_LINE_BYTES])
+				if result is not None:
+					plots.append(result)
+
+		return plots
+
+	def next_index (self) -> int:
+		index = self._index
+		self._index += 1
+		return index
+
+
+class Follow:
+	'''
+	Follow log files as plotters write them (--follow). Each plot is analyzed
+	as soon as it finishes and the summaries are printed again, so the work for
+	each update depends on the new data, not on the history.
+	'''
+
+	# seconds between reads of the followed files
+	INTERVAL = 5.0
+
+	# seconds between looking for new log files
+	RESCAN = 60.0
+
+	def __init__ (self, config:Config, plots:Plots, analyze:Analyze) -> None:
+		self._config  = config
+		self._plots   = plots
+		self._analyze = analyze
+
+		# each new plot is post-processed and added to the analysis by Plots.add_plot()
+		plots.stream_to(analyze.add_plot)
+
+		# key is a log file path, value is a FollowedFile()
+		self._files:Dict[Path, FollowedFile] = {}
+
+	def run (self, log_files:Callable[[], Iterable[Path]]) -> None:
+		'''
+		Follow the log files returned by log_files(), which is called again
+		every RESCAN seconds to pick up new files. Runs until interrupted.
+		'''
+
+		last_scan:float = 0.0
+
+		try:
+			while True:
+				if time.monotonic() - last_scan >= self.RESCAN:
+					self._add_files(log_files())
+					last_scan = time.monotonic()
+
+				if self._read_files():
+					self._print()
+
+				time.sleep(self.INTERVAL)
+
+		except KeyboardInterrupt:
+			pass
+
+		finally:
+			for followed in self._files.values():
+				followed.close()
+
+	def run_stream (self, stream:BinaryIO) -> None:
+		'''
+		Follow a stream, such as "chia plots create" piped to stdin, until the
+		end of the stream. A line longer than MAX_LINE_BYTES is read in pieces
+		(see read_lines()), so a stream without newlines is not held in memory.
+		'''
+
+		followed = FollowedFile(Path('-'))
+
+		try:
+			for line in read_lines(stream):
+				for lines in followed.feed(line):
+					if self._add_plot(followed, lines):
+						self._print()
+
+		except KeyboardInterrupt:
+			pass
+
+	def run_collector (self, collector:Collector) -> None:
+		'''
+		Collect the logs of the hosts every INTERVAL seconds (see collect()).
+		Runs until interrupted.
+		'''
+
+		try:
+			while True:
+				if self.collect(collector):
+					self._print()
+				collector.save()
+
+				time.sleep(self.INTERVAL)
+
+		except KeyboardInterrupt:
+			pass
+
+		finally:
+			collector.save()
+			collector.close()
+			for followed in self._files.values():
+				followed.close()
+
+	def collect (self, collector:Collector) -> bool:
+		'''
+		Copy the bytes appended to the logs of the hosts and analyze the plots
+		that finished in them, as each range is copied. Return True if a plot
+		was added.
+		'''
+
+		added:bool = False
+
+		for appended in collector.collect():
+			followed = self._files.get(appended.path)
+			if not followed:
+				# a compressed log is read by the next run
+				if compression(appended.path):
+					continue
+				offset, index = self._plots.offset(appended.path)
+				followed = self._files[appended.path] = FollowedFile(appended.path, offset, index)
+
+			for lines in followed.append(appended.offset, appended.data):
+				added = self._add_plot(followed, lines) or added
+
+		return added
+
+	def _add_files (self, paths:Iterable[Path]) -> None:
+		'''Start following new files; files already processed resume at their offset.'''
+
+		for path in paths:
+			if path not in self._files:
+				# compressed logs are finished, they do not grow
+				if compression(path):
+					continue
+
+				offset, index = self._plots.offset(path)
+				self._files[path] = FollowedFile(path, offset, index)
+				self._config.logger.info('Follow %s from offset %s', path, offset)
+
+	def _read_files (self) -> bool:
+		'''Read each followed file. Return True if a plot was added.'''
+
+		added:bool = False
+
+		for path, followed in list(self._files.items()):
+			try:
+				for lines in followed.read():
+					added = self._add_plot(followed, lines) or added
+
+			except OSError as e:
+				# the file was removed, it is picked up again by the next scan
+				self._config.logger.warn('Follow %s %s', path, e)
+				followed.close()
+				del self._files[path]
+
+		return added
+
+	def _add_plot (self, followed:FollowedFile, lines:List[str]) -> bool:
+		'''Extract and analyze a plot that finished. Return True if it was added.'''
+
+		plot = Plot(self._config, followed.path, followed.next_index())
+		if not plot.extract(lines) or not self._plots.add_plot(plot):
+			return False
+
+		self._config.logger.info('Follow %s plot %s %s', followed.path, plot.index, plot.parameters.plot_id)
+
+		return True
+
+	def _print (self) -> None:
+		'''Print the summaries again, to stderr when stdout has a report in another format (see Config.console).'''
+
+		with redirect_stdout(self._config.console):
+			print()
+			print(f'{time.strftime("%Y-%m-%d %H:%M:%S")} - {len(self._plots.plots)} plots')
+			self._analyze.print_summary()
@@ -1,29 +1,122 @@
+# system packages
+from typing import Any, Dict
+import logging
+import sys
+
+
 class Logger:
+	'''
+	Log messages through the standard library "logging" module, printed as
+	"Error: ...", "Warn: ...", "Info: ..." or "Debug: ...". Messages take
+	%-style arguments like the logging module and are only formatted when the
+	level is enabled, so a disabled message costs a comparison:
+
+		self._logger.debug('PlotPhase1 index %s table %s seconds %s', self._index, table, seconds)
+
+	Use is_enabled() to skip computing arguments that are expensive.
+	'''
+
+	ERROR = logging.ERROR
+	WARN  = logging.WARNING
+	INFO  = logging.INFO
+	DEBUG = logging.DEBUG
+
+	# the level for each --verbose count
+	LEVELS = (ERROR, WARN, INFO, DEBUG)
+
+	# name of the standard library logger
+	NAME = 'chia-log'
+
 	def __init__ (self) -> None:
-		self._verbose:int = 0
+		self._level:int = self.ERROR
+		self._stderr:bool = False		# see set_stderr()
+		self._logger = _logger(self.NAME)
+		self._logger.setLevel(self._level)
+		self.set_stderr(False)
+
+	def __getstate__ (self) -> Dict[str, Any]:
+		# the standard library logger is set up again in a worker process
+		return {'_level': self._level, '_stderr': self._stderr}
+
+	def __setstate__ (self, state:Dict[str, Any]) -> None:
+		self._level = state['_level']
+		self._logger = _logger(self.NAME)
+		self._logger.setLevel(self._level)
+		self.set_stderr(state['_stderr'])
 
 	def set_log_level (self, verbose:int) -> None:
-		self._verbose:int = verbose
+		self._level = self.LEVELS[max(0, min(verbose, len(self.LEVELS) - 1))]
+		self._logger.setLevel(self._level)
+
+	def set_stderr (self, stderr:bool) -> None:
+		'''Print to stderr instead of stdout, when stdout has a csv, json or markdown report (see Config.console).'''
+
+		self._stderr = stderr
+		for handler in self._logger.handlers:
+			if isinstance(handler, _ConsoleHandler):
+				handler.stderr = stderr
+
+	def is_enabled (self, level:int) -> bool:
+		'''Return True if messages at a level (Logger.DEBUG, ...) are printed.'''
+
+		return level >= self._level
 
-	def error (self, t:str) -> None:
+	def error (self, msg:str, *args:Any) -> None:
 		'''Errors are always printed'''
 
-		print(f'Error: {t}')
+		self._logger.error(msg, *args)
 
-	def warn (self, t:str) -> None:
+	def warn (self, msg:str, *args:Any) -> None:
 		'''Warnings are the minimum level of logging'''
 
-		if self._verbose >= 1:
-			print(f'Warn: {t}')
+		if self._level <= self.WARN:
+			self._logger.warning(msg, *args)
 
-	def info (self, t:str) -> None:
+	def info (self, msg:str, *args:Any) -> None:
 		'''Info is the 2nd level of logging'''
 
-		if self._verbose >= 2:
-			print(f'Info: {t}')
+		if self._level <= self.INFO:
+			self._logger.info(msg, *args)
 
-	def debug (self, t:str) -> None:
+	def debug (self, msg:str, *args:Any) -> None:
 		'''Debug is the most verbose level of logging'''
 
-		if self._verbose == 3:
-			print(f'Debug: {t}')
+		if self._level <= self.DEBUG:
+			self._logger.debug(msg, *args)
+
+
+class _Formatter (logging.Formatter):
+	'''Format a record as "Error: message", the same as before the logging module was used.'''
+
+	PREFIXES = {logging.ERROR: 'Error', logging.WARNING: 'Warn', logging.INFO: 'Info', logging.DEBUG: 'Debug'}
+
+	def format (self, record:logging.LogRecord) -> str:
+		return f'{self.PREFIXES.get(record.levelno, record.levelname)}: {record.getMessage()}'
+
+
+class _ConsoleHandler (logging.StreamHandler):
+	'''
+	Write to the current sys.stdout, so messages stay in order with print(),
+	or to the current sys.stderr if stderr is set.
+	'''
+
+	def __init__ (self) -> None:
+		super().__init__(sys.stdout)
+		self.stderr:bool = False
+
+	def emit (self, record:logging.LogRecord) -> None:
+		self.stream = sys.stderr if self.stderr else sys.stdout
+		super().emit(record)
+
+
+def _logger (name:str) -> logging.Logger:
+	'''Return the standard library logger, adding the console handler once per process.'''
+
+	logger = logging.getLogger(name)
+	if not logger.handlers:
+		handler = _ConsoleHandler()
+		handler.setFormatter(_Formatter())
+		logger.addHandler(handler)
+		logger.propagate = False
+
+	return logger
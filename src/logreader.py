@@ -0,0 +1,207 @@
+# system packages
+from functools import lru_cache
+from pathlib   import Path
+from typing    import BinaryIO, Callable, Dict, List, Optional, Tuple, Union
+import bz2
+import gzip
+import io
+import lzma
+import mmap
+import os
+import queue
+import stat
+import threading
+
+# the first bytes of a compressed file, key is the magic bytes, value is the codec
+MAGIC:Dict[bytes, str] = {
+	b'\x1f\x8b':          'gz',
+	b'\xfd7zXZ\x00':      'xz',
+	b'BZh':               'bz2',
+}
+
+# the function that opens a compressed file for reading, key is the codec
+OPENERS:Dict[str, Callable[[Path], BinaryIO]] = {
+	'gz':  lambda path: gzip.open(path, 'rb'),		# type: ignore
+	'xz':  lambda path: lzma.open(path, 'rb'),		# type: ignore
+	'bz2': lambda path: bz2.open(path, 'rb'),		# type: ignore
+}
+
+# file system types where a file is not memory-mapped, because another host
+# can truncate it under the mapping (see map_log())
+NETWORK_FILESYSTEMS = ('nfs', 'nfs4', 'cifs', 'smb3', 'smbfs', 'fuse.sshfs', 'sshfs', '9p', 'ceph', 'fuse.ceph', 'glusterfs', 'fuse.glusterfs', 'afs', 'fuse.rclone')
+
+# file name suffixes of compressed logs, "chia-1.log.gz" is the same log as "chia-1.log"
+SUFFIXES = ('.gz', '.xz', '.bz2')
+
+
+class BackgroundReader (io.RawIOBase):
+	'''
+	Read a file (or a decompressor) in a background thread. The thread reads
+	CHUNK_BYTES at a time into a queue of at most QUEUE_CHUNKS, so reading
+	and decompression (which release the GIL) overlap with parsing, and
+	memory is bounded. Use open_log(), which wraps this in a buffered reader
+	so lines can be iterated.
+	'''
+
+	CHUNK_BYTES  = 1024 * 1024
+	QUEUE_CHUNKS = 8
+
+	def __init__ (self, stream:BinaryIO) -> None:
+		super().__init__()
+		self._stream = stream
+		self._queue:queue.Queue = queue.Queue(self.QUEUE_CHUNKS)
+		self._data = memoryview(b'')		# the rest of the chunk being read
+		self._eof:bool = False
+		self._stop = threading.Event()
+
+		self._thread = threading.Thread(target=self._read, name='read', daemon=True)
+		self._thread.start()
+
+	def _read (self) -> None:
+		'''Read the file into the queue, the end is b'' or the exception raised.'''
+
+		item:Union[bytes, BaseException]
+		try:
+			while not self._stop.is_set():
+				item = self._stream.read(self.CHUNK_BYTES)
+				self._put(item)
+				if not item:
+					return
+		except BaseException as e:
+			self._put(e)
+
+	def _put (self, item:Union[bytes, BaseException]) -> None:
+		while not self._stop.is_set():
+			try:
+				self._queue.put(item, timeout=0.1)
+				return
+			except queue.Full:
+				pass
+
+	def readable (self) -> bool:
+		return True
+
+	def readinto (self, buffer:bytearray) -> int:		# type: ignore
+		if not self._data:
+			if self._eof:
+				return 0
+
+			item = self._queue.get()
+			if isinstance(item, BaseException):
+				self._eof = True
+				raise item
+			if not item:
+				self._eof = True
+				return 0
+			self._data = memoryview(item)
+
+		count = min(len(buffer), len(self._data))
+		buffer[:count] = self._data[:count]
+		self._data = self._data[count:]
+		return count
+
+	def close (self) -> None:
+		if not self.closed:
+			self._stop.set()
+			self._thread.join()
+			self._stream.close()
+		super().close()
+
+
+def compression (path:Path) -> Optional[str]:
+	'''Return the codec of a compressed file (gz, xz, or bz2) from its magic bytes, None if it is not compressed.'''
+
+	with open(path, 'rb') as f:
+		head = f.read(6)
+
+	for magic, codec in MAGIC.items():
+		if head.startswith(magic):
+			return codec
+	return None
+
+
+def open_log (path:Path, start:int = 0, background:bool = False) -> BinaryIO:
+	'''
+	Open a log file for reading in binary mode at a byte offset. A compressed
+	file (see compression()) is decompressed in a background thread and can
+	only be read from the start. With background, an uncompressed file is
+	read ahead by a background thread too; neither can seek.
+	'''
+
+	codec = compression(path)
+	if codec is None:
+		f = open(path, 'rb')
+		if start:
+			f.seek(start)
+		if not background:
+			return f
+	else:
+		if start:
+			raise ValueError(f'compressed file {path} can only be read from the start')
+		f = OPENERS[codec](path)
+
+	return io.BufferedReader(BackgroundReader(f), BackgroundReader.CHUNK_BYTES)		# type: ignore
+
+
+def map_log (path:Path, min_bytes:int = 0) -> Optional[mmap.mmap]:
+	'''
+	Memory-map a log file for reading, so it can be scanned as bytes without
+	reading it line by line. Return None if it should be read with open_log()
+	instead: a compressed file, a pipe or other file that is not a regular
+	file, a file smaller than min_bytes, or a file on a network file system
+	(see network_filesystem()), where the file can change under the mapping.
+	The mapping is the size of the file when it is opened, lines appended
+	later are read on the next run.
+	'''
+
+	with open(path, 'rb') as f:
+		info = os.fstat(f.fileno())
+		if not stat.S_ISREG(info.st_mode) or info.st_size == 0 or info.st_size < min_bytes:
+			return None
+		if compression(path) is not None or network_filesystem(path):
+			return None
+
+		try:
+			data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+		except (OSError, ValueError):		# a file system without mmap
+			return None
+
+	if hasattr(mmap, 'MADV_SEQUENTIAL'):
+		data.madvise(mmap.MADV_SEQUENTIAL)
+	return data
+
+
+def network_filesystem (path:Path) -> bool:
+	'''Return True if a file is on a network file system (see NETWORK_FILESYSTEMS), False if it is local or not known.'''
+
+	path = path.resolve()
+	for mount_point, fs_type in _mounts():
+		if path == mount_point or mount_point in path.parents:
+			return fs_type in NETWORK_FILESYSTEMS
+	return False
+
+
+@lru_cache(maxsize=None)
+def _mounts () -> List[Tuple[Path, str]]:
+	'''Return the mount points and their file system types, the longest first, empty if they are not known.'''
+
+	mounts:List[Tuple[Path, str]] = []
+	try:
+		with open('/proc/self/mounts', encoding='utf-8', errors='replace') as f:
+			for line in f:
+				fields = line.split()
+				if len(fields) >= 3:
+					# spaces and other characters in a mount point are octal escapes
+					mount_point = fields[1].encode().decode('unicode_escape')
+					mounts.append((Path(mount_point), fields[2]))
+	except OSError:		# not Linux
+		pass
+
+	mounts.sort(key=lambda mount: len(str(mount[0])), reverse=True)
+	return mounts
+
+
+def source_key (path:Path) -> Path:
+	'''Return the uncompressed name of a log, so "chia-1.log.gz" and "chia-1.log" are the same source.'''
+
+	return path.with_suffix('') if path.suffix in SUFFIXES else path
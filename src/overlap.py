@@ -0,0 +1,77 @@
+# system packages
+from datetime import datetime, timedelta
+from typing   import Dict, Iterable, List, NamedTuple, Tuple
+import heapq
+
+
+class Interval (NamedTuple):
+	key:str				# plot id
+	start:datetime
+	end:datetime
+
+
+class Overlaps:
+	'''
+	Find the plots that ran at the same time with a sweep line. Intervals are
+	sorted by start time and a heap holds the intervals that are still active,
+	so the cost is O(n log n + k) where k is the number of overlapping pairs.
+	Intervals that touch (one ends when the other starts) overlap by zero.
+	'''
+
+	def __init__ (self) -> None:
+		# key is a plot id, value is a dictionary where the key is the id of an
+		# overlapping plot and the value is the overlap duration
+		self.overlaps:Dict[str, Dict[str, timedelta]] = {}
+
+		# the number of plots running, changed at each time in the list
+		self.concurrency:List[Tuple[datetime, int]] = []
+
+		# the largest number of plots running at the same time
+		self.max_concurrency:int = 0
+
+	def process (self, intervals:Iterable[Interval]) -> None:
+		'''Find the overlapping plots and the number of plots running over time.'''
+
+		ordered = sorted(intervals, key=lambda interval: (interval.start, interval.end))
+
+		self._set_overlaps(ordered)
+		self._set_concurrency(ordered)
+
+	def _set_overlaps (self, ordered:List[Interval]) -> None:
+		overlaps = self.overlaps
+		active:List[Tuple[datetime, int]] = []	# heap of (end time, index into ordered)
+
+		for index, interval in enumerate(ordered):
+			overlaps.setdefault(interval.key, {})
+
+			# remove plots that ended before this plot started
+			while active and active[0][0] < interval.start:
+				heapq.heappop(active)
+
+			# every plot still active started before (or with) this plot and
+			# ends after it started
+			for end, other_index in active:
+				other = ordered[other_index]
+				overlap = min(end, interval.end) - interval.start
+				overlaps[interval.key][other.key] = overlap
+				overlaps[other.key][interval.key] = overlap
+
+			heapq.heappush(active, (interval.end, index))
+
+	def _set_concurrency (self, ordered:List[Interval]) -> None:
+		# starts sort before ends at the same time, so plots that touch count
+		# as running together, the same as the overlaps
+		events:List[Tuple[datetime, int]] = []
+		for interval in ordered:
+			events.append((interval.start, 0))
+			events.append((interval.end, 1))
+		events.sort()
+
+		count:int = 0
+		for time, event in events:
+			count += 1 if event == 0 else -1
+			if self.concurrency and self.concurrency[-1][0] == time:
+				self.concurrency[-1] = (time, count)
+			else:
+				self.concurrency.append((time, count))
+			self.max_concurrency = max(self.max_concurrency, count)
@@ -0,0 +1,111 @@
+# system packages
+from typing import Any, Iterable, Iterator, TypeVar
+import queue
+import threading
+
+T = TypeVar('T')
+
+# marks the end of the items in the queue
+_END = object()
+
+
+def background (items:Iterable[T], size:int = 64) -> Iterator[T]:
+	'''
+	Return the items of an iterable that is run in a background thread, for
+	example the file discovery walk, so it overlaps with the work on the
+	items. At most size items wait in a queue (backpressure); an exception
+	in the thread is raised here. Closing the iterator stops the thread.
+	'''
+
+	buffer:queue.Queue = queue.Queue(size)
+	stop = threading.Event()
+
+	def put (item:Any) -> bool:
+		while not stop.is_set():
+			try:
+				buffer.put(item, timeout=0.1)
+				return True
+			except queue.Full:
+				pass
+		return False
+
+	def run () -> None:
+		try:
+			for item in items:
+				if not put(item):
+					return
+			put(_END)
+		except BaseException as e:
+			put(e)
+
+	thread = threading.Thread(target=run, name='background', daemon=True)
+	thread.start()
+
+	try:
+		while True:
+			item = buffer.get()
+			if item is _END:
+				return
+			if isinstance(item, BaseException):
+				raise item
+			yield item
+	finally:
+		stop.set()
+		thread.join()
+
+
+def concurrent (iterables:Iterable[Iterable[T]], threads:int, size:int = 64) -> Iterator[T]:
+	'''
+	Return the items of several iterables as they are produced, each
+	iterable is run in a background thread with at most threads running at
+	a time, for example the log files copied from each host (see Collector).
+	The items of one iterable are in order. Backpressure, exceptions, and
+	closing the iterator are the same as background().
+	'''
+
+	buffer:queue.Queue = queue.Queue(size)
+	stop = threading.Event()
+	lock = threading.Lock()
+	pending = iter(iterables)
+
+	def put (item:Any) -> bool:
+		while not stop.is_set():
+			try:
+				buffer.put(item, timeout=0.1)
+				return True
+			except queue.Full:
+				pass
+		return False
+
+	def run () -> None:
+		try:
+			while True:
+				with lock:
+					items = next(pending, _END)
+				if items is _END:
+					break
+				for item in items:		# type: ignore
+					if not put(item):
+						return
+			put(_END)
+		except BaseException as e:
+			put(e)
+
+	workers = [threading.Thread(target=run, name=f'concurrent-{worker}', daemon=True) for worker in range(max(1, threads))]
+	for worker in workers:
+		worker.start()
+
+	try:
+		running = len(workers)
+		while running:
+			item = buffer.get()
+			if item is _END:
+				running -= 1
+				continue
+			if isinstance(item, BaseException):
+				raise item
+			yield item
+	finally:
+		stop.set()
+		for worker in workers:
+			worker.join()
@@ -1,23 +1,112 @@
 # system packages
+from __future__ import annotations
 from datetime import datetime, timedelta
-from typing   import Dict, Optional
+from typing   import Dict, List, NamedTuple, Optional, Tuple
 from pathlib import Path
+import mmap
+import sys
+import time
 
 # local packages
 from src.config         import Config
 from src.plotparameters import PlotParameters
-from src.plotphase1     import PlotPhase1
-from src.plotphase2     import PlotPhase2
-from src.plotphase3     import PlotPhase3
+from src.plotparser     import PlotParser
+from src.plotscanner    import PlotScanner
+from src.plotphase1     import Phase1, PlotPhase1
+from src.plotphase2     import Phase2, PlotPhase2
+from src.plotphase3     import Phase3, PlotPhase3
 from src.plotphase4     import PlotPhase4
 from src.plottotals     import PlotTotals
 
+class PlotRecord (NamedTuple):
+	'''
+	The values extracted from a plot, without the Config() and Logger()
+	references a Plot() holds. Records are small and can be pickled, so they
+	are passed between processes and stored in caches.
+	'''
+
+	log_file:str
+	index:int
+
+	# parameters
+	temp_dir_1:str
+	temp_dir_2:str
+	plot_id:str
+	plot_size:int
+	buffer_size:int
+	buckets:int
+	threads:int
+	stripe_size:int
+
+	# phases 1 to 4, tables are (table, seconds) or for phase 3
+	# (table 1, table 2, first pass, second pass, seconds)
+	phase_1_start:Optional[datetime]
+	phase_1_total:float
+	phase_1_tables:Tuple[Tuple[int, float], ...]
+	phase_2_start:Optional[datetime]
+	phase_2_total:float
+	phase_2_tables:Tuple[Tuple[int, float], ...]
+	phase_3_start:Optional[datetime]
+	phase_3_total:float
+	phase_3_tables:Tuple[Tuple[int, int, float, float, float], ...]
+	phase_4_start:Optional[datetime]
+	phase_4_total:float
+
+	# totals
+	working_gb:float
+	file_gb:float
+	total_time:float
+	temp_path:str
+	dest_path:str
+	copy_secs:float
+	end_time:Optional[datetime]
+
+
+class IncompletePlot (NamedTuple):
+	'''
+	A plot that started in a log file but did not finish, such as a plotter
+	that crashed or is still running, or a plot that is missing some of its
+	values. Records are small and can be pickled, like PlotRecord().
+	'''
+
+	log_file:str
+	offset:int						# byte offset of the line that started the plot
+	plot_id:str						# empty if the plot did not get that far
+	phase:int						# last phase started, 0 if none
+	last_time:Optional[datetime]	# last time stamp in the plot
+	reason:str						# restarted, too long, unfinished, or invalid
+
+
+class SummaryPlot (NamedTuple):
+	'''
+	What a merged report needs from a plot (see Summary()): its plot
+	configuration, thread count, phase times, and start and end time,
+	without the rest of the PlotRecord().
+	'''
+
+	log_file:str
+	index:int
+	plot_id:str
+	name:str										# plot configuration name
+	threads:int
+	seconds:Tuple[float, float, float, float, float]	# phases 1 - 4 and the total
+	start_time:Optional[datetime]					# start of phase 1
+	end_time:Optional[datetime]						# end of the copy
+
 
 class Plot:
 	'''
-	Process a plot.
+	Process a plot. Plots and their parts use __slots__, so a large history of
+	plots can be kept in memory.
 	'''
 
+	__slots__ = (
+		'_config', 'log_file', 'index',
+		'parameters', 'phase_1', 'phase_2', 'phase_3', 'phase_4', 'totals',
+		'start_time', 'end_time', 'elapsed_time', 'overlap',
+		'name', 'end_date_yyyy_mm_dd', 'end_date_yyyy_mm',
+	)
+
 	def __init__ (self, config:Config, log_file:Path, index:int) -> None:
 		self._config = config
 
@@ -44,31 +133,147 @@ class Plot:
 		self.end_date_yyyy_mm_dd:str = ''	# end date yyyy-mm-dd
 		self.end_date_yyyy_mm:str = ''		# end date yyyy-mm
 
-	def extract (self, data:str) -> bool:
+	def extract (self, lines:List[str]) -> bool:
+		'''
+		Extract a plot from its lines in a single pass. Return True if the
+		extract was good, otherwise False.
+		'''
+
+		parser = PlotParser(self._config.logger, self.index, self._config.profiler)
+		return parser.extract(lines, self.parameters, self.phase_1, self.phase_2, self.phase_3, self.phase_4, self.totals)
+
+	def extract_mmap (self, data:mmap.mmap, start:int, end:int) -> Optional[bool]:
+		'''
+		Extract a plot from a byte range of a memory-mapped log file (see
+		PlotSplitter.split_mmap()) without decoding its lines. Return True if
+		the extract was good, False if it was not, or None if the plot has a
+		line too long to scan and must be extracted from its lines.
+		'''
+
+		scanner = PlotScanner(self._config.logger, self.index, self._config.profiler)
+		return scanner.scan(data, start, end, self.parameters, self.phase_1, self.phase_2, self.phase_3, self.phase_4, self.totals)
+
+	def to_incomplete (self, lines:List[str], offset:int, reason:str) -> IncompletePlot:
 		'''
-		Extract a plot. Return True if the extract was good, otherwise False.
+		Extract what there is of a plot that did not finish and return it as
+		an IncompletePlot(). Offset is the byte offset of the line that
+		started the plot.
 		'''
 
-		if not self.parameters.extract(data):
-			return False
+		parser = PlotParser(self._config.logger, self.index)
+		phase, last_time = parser.progress(lines, self.parameters, self.phase_1, self.phase_2, self.phase_3, self.phase_4, self.totals)
+		return IncompletePlot(str(self.log_file), offset, self.parameters.plot_id, phase, last_time, reason)
 
-		if not self.phase_1.extract(data):
-			return False
+	def extract_regex (self, data:str) -> bool:
+		'''
+		Extract a plot by running each regex extractor over the flattened plot
+		(see plotsplitter.flatten()). This is slower than extract() and is kept
+		as the reference implementation. Return True if the extract was good,
+		otherwise False.
+		'''
 
-		if not self.phase_2.extract(data):
-			return False
+		profiler = self._config.profiler
 
-		if not self.phase_3.extract(data):
-			return False
+		for part in (self.parameters, self.phase_1, self.phase_2, self.phase_3, self.phase_4, self.totals):
+			if not profiler.enabled:
+				if not part.extract(data):
+					return False
+				continue
 
-		if not self.phase_4.extract(data):
-			return False
+			begin = time.perf_counter()
+			good = part.extract(data)
+			profiler.add_time(f'extract/{type(part).__name__}', time.perf_counter() - begin)
 
-		if not self.totals.extract(data):
-			return False
+			if not good:
+				profiler.count(f'plots rejected by {type(part).__name__}')
+				return False
 
 		return True
 
+	def to_record (self) -> PlotRecord:
+		'''Return the extracted values as a PlotRecord().'''
+
+		p = self.parameters
+		t = self.totals
+
+		return PlotRecord(
+			str(self.log_file), self.index,
+			p.temp_dir_1, p.temp_dir_2, p.plot_id, p.plot_size, p.buffer_size, p.buckets, p.threads, p.stripe_size,
+			self.phase_1.start_time, self.phase_1.total_time, tuple(tuple(ph) for ph in self.phase_1.table_time),
+			self.phase_2.start_time, self.phase_2.total_time, tuple(tuple(ph) for ph in self.phase_2.table_time),
+			self.phase_3.start_time, self.phase_3.total_time, tuple(tuple(ph) for ph in self.phase_3.table_time),
+			self.phase_4.start_time, self.phase_4.total_time,
+			t.working_gb, t.file_gb, t.total_time, t.temp_path, t.dest_path, t.copy_secs, t.end_time,
+		)
+
+	def to_summary (self) -> SummaryPlot:
+		'''Return the values of a post-processed plot that a summary keeps, as a SummaryPlot().'''
+
+		return SummaryPlot(
+			str(self.log_file), self.index, self.parameters.plot_id, self.name, self.parameters.threads,
+			(self.phase_1.total_time, self.phase_2.total_time, self.phase_3.total_time, self.phase_4.total_time, self.totals.total_time),
+			self.phase_1.start_time, self.totals.end_time,
+		)
+
+	@classmethod
+	def from_summary (cls, config:Config, summary:SummaryPlot) -> Plot:
+		'''Return a post-processed Plot() with the values of a SummaryPlot(), the other values are not known.'''
+
+		plot = cls(config, Path(summary.log_file), summary.index)
+		plot.parameters.plot_id = summary.plot_id
+		plot.parameters.threads = summary.threads
+
+		plot.phase_1.total_time, plot.phase_2.total_time, plot.phase_3.total_time, plot.phase_4.total_time, plot.totals.total_time = summary.seconds
+		plot.phase_1.start_time = summary.start_time
+		plot.totals.end_time = summary.end_time
+
+		plot.name = summary.name
+		plot.set_plot_date()
+		plot.set_plot_time()
+		return plot
+
+	@classmethod
+	def from_record (cls, config:Config, record:PlotRecord, log_file:Optional[Path] = None) -> Plot:
+		'''
+		Return a Plot() with the extracted values from a PlotRecord(). Pass the
+		log file path to share one Path() between the plots of a file.
+		'''
+
+		plot = cls(config, log_file or Path(record.log_file), record.index)
+
+		p = plot.parameters
+		p.temp_dir_1  = record.temp_dir_1
+		p.temp_dir_2  = record.temp_dir_2
+		p.plot_id     = record.plot_id
+		p.plot_size   = record.plot_size
+		p.buffer_size = record.buffer_size
+		p.buckets     = record.buckets
+		p.threads     = record.threads
+		p.stripe_size = record.stripe_size
+
+		plot.phase_1.start_time = record.phase_1_start
+		plot.phase_1.total_time = record.phase_1_total
+		plot.phase_1.table_time = [Phase1(*ph) for ph in record.phase_1_tables]
+		plot.phase_2.start_time = record.phase_2_start
+		plot.phase_2.total_time = record.phase_2_total
+		plot.phase_2.table_time = [Phase2(*ph) for ph in record.phase_2_tables]
+		plot.phase_3.start_time = record.phase_3_start
+		plot.phase_3.total_time = record.phase_3_total
+		plot.phase_3.table_time = [Phase3(*ph) for ph in record.phase_3_tables]
+		plot.phase_4.start_time = record.phase_4_start
+		plot.phase_4.total_time = record.phase_4_total
+
+		t = plot.totals
+		t.working_gb = record.working_gb
+		t.file_gb    = record.file_gb
+		t.total_time = record.total_time
+		t.temp_path  = record.temp_path
+		t.dest_path  = record.dest_path
+		t.copy_secs  = record.copy_secs
+		t.end_time   = record.end_time
+
+		return plot
+
 	def set_plot_configuration (self) -> None:
 		'''
 		Determine the plot configuration based on the "temp" and "dest"
@@ -78,20 +283,15 @@ class Plot:
 		log_prefix = 'Plot'
 
 		# get the dest and temp directories for this plot
-		dest_dir = str(self.totals.dest_dir)
+		dest_dir = self.totals.dest_dir_str
 		temp_dir_1, temp_dir_2 = self.parameters.temp_dirs	# at the top of the log file
 
 		# match the dest and temp directories to a "mount" entry in the config file
-		found:bool = False
-		for plot_config in self._config.plot_configurations:
-			if dest_dir in plot_config['dest']:
-				if temp_dir_1 in plot_config['temp'] and temp_dir_2 in plot_config['temp']:
-					self.name = plot_config['name']
-					found = True
-					break
-
-		if not found:
-			self._config.logger.error(f'{log_prefix} plot config not found, temp-1 {temp_dir_1}, temp-2 {temp_dir_2}, dest {dest_dir}')
+		name = self._config.plot_matcher.match(dest_dir, temp_dir_1, temp_dir_2)
+		if name is None:
+			self._config.logger.error('%s plot config not found, temp-1 %s, temp-2 %s, dest %s', log_prefix, temp_dir_1, temp_dir_2, self.totals.dest_dir)
+		else:
+			self.name = name
 
 	def set_plot_date (self) -> None:
 		'''
@@ -101,8 +301,8 @@ class Plot:
 
 		et = self.totals.end_time
 		if et:
-			self.end_date_yyyy_mm_dd = f'{et.year:04}-{et.month:02}-{et.day:02}'
-			self.end_date_yyyy_mm = f'{et.year:04}-{et.month:02}'
+			self.end_date_yyyy_mm_dd = sys.intern(f'{et.year:04}-{et.month:02}-{et.day:02}')
+			self.end_date_yyyy_mm = sys.intern(f'{et.year:04}-{et.month:02}')
 
 	def set_plot_time (self) -> None:
 		'''
@@ -0,0 +1,123 @@
+# system packages
+from pathlib import Path
+from typing  import Dict, List, NamedTuple, Optional, Tuple
+import os
+import pickle
+import zlib
+
+# local packages
+from src.logger import Logger
+from src.plot   import IncompletePlot, PlotRecord
+
+
+class CacheEntry (NamedTuple):
+	'''The plots extracted from a log file and the file identity when it was read.'''
+
+	size:int				# file size in bytes
+	mtime_ns:int			# modification time in nanoseconds
+	inode:int				# inode number
+	offset:int				# byte offset after the last complete plot
+	index:int				# index of the next plot in the file
+	checksum:int			# crc32 of the bytes just before the offset
+	records:List[PlotRecord]
+	incomplete:List[IncompletePlot]		# plots before the offset that did not finish
+
+
+class PlotCache:
+	'''
+	An on-disk cache of the plots extracted from each log file. A file that
+	has not changed (same size, modification time, and inode) is not read at
+	all. A file that has only grown, such as the log of a plotter that is still
+	running, is read from the end of the last complete plot.
+	'''
+
+	VERSION = 2
+
+	# number of bytes before the offset used to check a file was not rewritten
+	CHECKSUM_BYTES = 4096
+
+	def __init__ (self, path:Path, logger:Logger, rebuild:bool = False) -> None:
+		self._path    = path
+		self._logger  = logger
+		self._rebuild = rebuild		# ignore the existing cache and create a new one
+
+		# key is the log file path, value is a CacheEntry()
+		self._entries:Dict[str, CacheEntry] = {}
+
+		self._changed:bool = False
+
+	def load (self) -> None:
+		'''Load the cache file. A missing, old, or damaged cache is ignored.'''
+
+		log_prefix = 'PlotCache'
+
+		if self._rebuild or not self._path.exists():
+			return
+
+		try:
+			with open(self._path, 'rb') as f:
+				data = pickle.load(f)
+		except Exception as e:
+			self._logger.warn('%s ignoring cache file %s, %s', log_prefix, self._path, e)
+			return
+
+		if not isinstance(data, dict) or data.get('version') != self.VERSION:
+			self._logger.warn('%s ignoring cache file %s, wrong version', log_prefix, self._path)
+			return
+
+		self._entries = data['entries']
+		self._logger.info('%s loaded %s files from %s', log_prefix, len(self._entries), self._path)
+
+	def save (self) -> None:
+		'''Save the cache file if it changed. The file is replaced atomically.'''
+
+		if not self._changed:
+			return
+
+		temp_path = self._path.with_name(self._path.name + '.tmp')
+		with open(temp_path, 'wb') as f:
+			pickle.dump({'version': self.VERSION, 'entries': self._entries}, f, protocol=pickle.HIGHEST_PROTOCOL)
+		os.replace(temp_path, self._path)
+
+		self._changed = False
+		self._logger.info('PlotCache saved %s files to %s', len(self._entries), self._path)
+
+	def lookup (self, path:Path, stat:os.stat_result) -> Tuple[Optional[CacheEntry], bool]:
+		'''
+		Return the cache entry for a file and True if the file is unchanged.
+		The entry is None if the file is not cached or it changed in a way that
+		requires reading it from the beginning.
+		'''
+
+		log_prefix = 'PlotCache'
+
+		entry = self._entries.get(str(path))
+		if not entry:
+			return None, False
+
+		if entry.inode == stat.st_ino and entry.size == stat.st_size and entry.mtime_ns == stat.st_mtime_ns:
+			return entry, True
+
+		# the file has grown, check the plots already read were not rewritten
+		if entry.inode == stat.st_ino and entry.size < stat.st_size:
+			if checksum(path, entry.offset) == entry.checksum:
+				self._logger.info('%s resume %s at offset %s', log_prefix, path, entry.offset)
+				return entry, False
+
+		self._logger.info('%s changed %s', log_prefix, path)
+		return None, False
+
+	def update (self, path:Path, stat:os.stat_result, offset:int, index:int, records:List[PlotRecord], incomplete:List[IncompletePlot]) -> None:
+		'''Store the plots extracted from a file.'''
+
+		self._entries[str(path)] = CacheEntry(stat.st_size, stat.st_mtime_ns, stat.st_ino, offset, index, checksum(path, offset), records, incomplete)
+		self._changed = True
+
+
+def checksum (path:Path, offset:int) -> int:
+	'''Return the crc32 of the bytes just before an offset in a file.'''
+
+	start = max(0, offset - PlotCache.CHECKSUM_BYTES)
+	with open(path, 'rb') as f:
+		f.seek(start)
+		return zlib.crc32(f.read(offset - start))
@@ -0,0 +1,175 @@
+# system packages
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import re
+
+# directories are split on either slash, so Windows paths work too
+SEPARATORS = re.compile(r'[/\\]+')
+
+
+class MountTrie:
+	'''
+	Mount points (directories) stored by path component, so the mount points
+	that contain a directory are found in one walk down the trie. For example
+	"/media/temp001/sub" is found under the mount "/media/temp001", and
+	"/media/temp0011" is not.
+	'''
+
+	__slots__ = ('_root',)
+
+	# the key in a trie node that holds the mount point ending at that node
+	MOUNT = None
+
+	def __init__ (self) -> None:
+		self._root:Dict[Optional[str], Any] = {}
+
+	def add (self, mount:str) -> str:
+		'''Add a mount point and return it normalized (no trailing slash).'''
+
+		node = self._root
+		parts = split_dir(mount)
+		for part in parts:
+			node = node.setdefault(part, {})
+
+		mount = join_dir(parts)
+		node[self.MOUNT] = mount
+		return mount
+
+	def enclosing (self, directory:str) -> List[str]:
+		'''Return the mount points that are or contain the directory, the longest first.'''
+
+		node = self._root
+		mounts:List[str] = []
+		if self.MOUNT in node:
+			mounts.append(node[self.MOUNT])
+		for part in split_dir(directory):
+			node = node.get(part)
+			if node is None:
+				break
+			if self.MOUNT in node:
+				mounts.append(node[self.MOUNT])
+
+		mounts.reverse()
+		return mounts
+
+
+class PlotMatcher:
+	'''
+	Match the dest and temp directories of a plot to a plot configuration in
+	the config file. The configurations are compiled once: each directory is
+	mapped to the mount points that contain it with a MountTrie, then
+	(dest, temp 1, temp 2) mount points are looked up in a dictionary, the
+	longest mount points first, so a configuration for a nested mount point
+	is used for the directories below it. When configurations match the same
+	mount points, the first one in the config file is used, as it always was.
+	Results are remembered for each distinct (dest, temp 1, temp 2), so most
+	plots are a single dictionary lookup.
+	'''
+
+	__slots__ = ('_dest', '_temp', '_index', '_overlaps', '_matches')
+
+	def __init__ (self, plot_configs:Iterable[Dict[str, Any]] = ()) -> None:
+		self._dest = MountTrie()		# dest mount points
+		self._temp = MountTrie()		# temp mount points
+
+		# key is (dest, temp 1, temp 2) mount points, value is the configuration name
+		self._index:Dict[Tuple[str, str, str], str] = {}
+
+		# key is (name used, name hidden), value is the overlapping (dest, temp 1, temp 2) mount points
+		self._overlaps:Dict[Tuple[str, str], List[Tuple[str, str, str]]] = {}
+
+		# key is (dest, temp 1, temp 2) directories of a plot, value is the configuration name or None
+		self._matches:Dict[Tuple[str, str, str], Optional[str]] = {}
+
+		for plot_config in plot_configs:
+			self._add(plot_config)
+		self._add_nested()
+
+	def _add (self, plot_config:Dict[str, Any]) -> None:
+		name = plot_config['name']
+		dests = [self._dest.add(dest) for dest in as_list(plot_config['dest'])]
+		temps = [self._temp.add(temp) for temp in as_list(plot_config['temp'])]
+
+		for dest in dests:
+			for temp_1 in temps:
+				for temp_2 in temps:
+					key = (dest, temp_1, temp_2)
+					used = self._index.setdefault(key, name)
+					if used != name:
+						self._overlaps.setdefault((used, name), []).append(key)
+
+	def _add_nested (self) -> None:
+		'''
+		Add the overlaps of nested mount points: the directories below the
+		mount points of one configuration are also below the mount points of
+		another, so both match them and the nested one is used.
+		'''
+
+		for key, used in self._index.items():
+			dest, temp_1, temp_2 = key
+			for dest_mount in self._dest.enclosing(dest):
+				for temp_1_mount in self._temp.enclosing(temp_1):
+					for temp_2_mount in self._temp.enclosing(temp_2):
+						hidden = self._index.get((dest_mount, temp_1_mount, temp_2_mount))
+						if hidden is not None and hidden != used:
+							self._overlaps.setdefault((used, hidden), []).append(key)
+
+	def overlaps (self) -> List[str]:
+		'''Return a description of each pair of configurations that match the same directories, also through nested mount points.'''
+
+		messages:List[str] = []
+		for (used, hidden), keys in self._overlaps.items():
+			dest, temp_1, temp_2 = keys[0]
+			more = f' (and {len(keys) - 1} more)' if len(keys) > 1 else ''
+			messages.append(f'plot configurations "{used}" and "{hidden}" both match dest {dest}, temp {temp_1}, temp {temp_2}{more}, "{used}" is used')
+
+		return messages
+
+	def match (self, dest_dir:str, temp_dir_1:str, temp_dir_2:str) -> Optional[str]:
+		'''Return the name of the plot configuration for the directories, None if there is none.'''
+
+		key = (dest_dir, temp_dir_1, temp_dir_2)
+		try:
+			return self._matches[key]
+		except KeyError:
+			pass
+
+		self._matches[key] = name = self._lookup(dest_dir, temp_dir_1, temp_dir_2)
+		return name
+
+	def _lookup (self, dest_dir:str, temp_dir_1:str, temp_dir_2:str) -> Optional[str]:
+		'''Return the configuration of the longest mount points that contain the directories.'''
+
+		temps_1 = self._temp.enclosing(temp_dir_1)
+		temps_2 = self._temp.enclosing(temp_dir_2)
+		for dest in self._dest.enclosing(dest_dir):
+			for temp_1 in temps_1:
+				for temp_2 in temps_2:
+					name = self._index.get((dest, temp_1, temp_2))
+					if name is not None:
+						return name
+
+		return None
+
+
+def as_list (value:Any) -> List[str]:
+	'''Return a config value as a list of strings, a single string is a list of one.'''
+
+	if isinstance(value, (list, tuple)):
+		return [str(item) for item in value]
+	return [str(value)]
+
+
+def split_dir (directory:str) -> List[str]:
+	'''
+	Split a directory into its parts. An absolute directory starts with an
+	empty part, and a trailing slash is ignored.
+	'''
+
+	parts = SEPARATORS.split(directory.strip())
+	if len(parts) > 1 and not parts[-1]:
+		parts.pop()
+	return parts
+
+
+def join_dir (parts:List[str]) -> str:
+	return '/'.join(parts) if parts != [''] else '/'
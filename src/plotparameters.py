@@ -1,6 +1,7 @@
 # system packages
-from typing import Tuple
+from typing import Tuple, Union
 import re
+import sys
 
 # local packages
 from src.logger import Logger
@@ -8,26 +9,63 @@ from src.logger import Logger
 
 class PlotParameters:
 	'''
-	Process plot parameters at the top of each plot log.
+	Process plot parameters at the top of each plot log. The temp directories
+	are interned and the plot ID is stored as a 32 byte digest, to keep the
+	memory per plot small.
 	'''
 
+	__slots__ = ('_logger', '_index', '_temp_dir_1', '_temp_dir_2', '_plot_id', 'plot_size', 'buffer_size', 'buckets', 'threads', 'stripe_size')
+
 	def __init__ (self, logger:Logger, index:int) -> None:
 		self._logger = logger
 		self._index  = index
 
 		# parameters at the top of the log file
-		self.temp_dir_1:str  = ''		# into temporary dirs: /media/temp001 and /media/temp002
-		self.temp_dir_2:str  = ''		# into temporary dirs: /media/temp001 and /media/temp002
-		self.plot_id:str     = ''		# ID: c259696a3a94a3b9302ec95d24a5763d9e1125f6ac5ff68f7aca1790501986e9
+		self._temp_dir_1:str = ''		# into temporary dirs: /media/temp001 and /media/temp002
+		self._temp_dir_2:str = ''		# into temporary dirs: /media/temp001 and /media/temp002
+		self._plot_id:Union[bytes, str] = ''	# ID: c259696a3a94a3b9302ec95d24a5763d9e1125f6ac5ff68f7aca1790501986e9
 		self.plot_size:int   = 0		# Plot size is: 32
 		self.buffer_size:int = 0		# Buffer size is: 4096MiB
 		self.buckets:int     = 0		# Using 128 buckets
 		self.threads:int     = 0		# Using 4 threads of stripe size 65536
 		self.stripe_size:int = 0		# Using 4 threads of stripe size 65536
 
+	@property
+	def temp_dir_1 (self) -> str:
+		return self._temp_dir_1
+
+	@temp_dir_1.setter
+	def temp_dir_1 (self, value:str) -> None:
+		self._temp_dir_1 = sys.intern(value)
+
+	@property
+	def temp_dir_2 (self) -> str:
+		return self._temp_dir_2
+
+	@temp_dir_2.setter
+	def temp_dir_2 (self, value:str) -> None:
+		self._temp_dir_2 = sys.intern(value)
+
 	@property
 	def temp_dirs (self) -> Tuple[str, str]:
-		return self.temp_dir_1, self.temp_dir_2
+		return self._temp_dir_1, self._temp_dir_2
+
+	@property
+	def plot_id (self) -> str:
+		'''Return the plot ID as hex.'''
+
+		plot_id = self._plot_id
+		return plot_id.hex() if isinstance(plot_id, bytes) else plot_id
+
+	@plot_id.setter
+	def plot_id (self, value:str) -> None:
+		self._plot_id = plot_key(value)
+
+	@property
+	def plot_key (self) -> Union[bytes, str]:
+		'''Return the plot ID as stored (32 bytes), for dictionary keys.'''
+
+		return self._plot_id
 
 	def extract (self, data:str) -> bool:
 		'''
@@ -55,13 +93,13 @@ class PlotParameters:
 
 		results = re.search(pattern, data)
 		if not results:
-			self._logger.error(f'{log_prefix} index {self._index} failed to extract data')
+			self._logger.error('%s index %s failed to extract data', log_prefix, self._index)
 			return False
 
 		have:int = len(results.groups())
 		need:int = 8
 		if have != need:
-			self._logger.error(f'{log_prefix} index {self._index} failed to match data, need {need} groups, have {have} groups')
+			self._logger.error('%s index %s failed to match data, need %s groups, have %s groups', log_prefix, self._index, need, have)
 			return False
 
 		self.temp_dir_1  = str(results.group(1))
@@ -73,6 +111,23 @@ class PlotParameters:
 		self.threads     = int(results.group(7))
 		self.stripe_size = int(results.group(8))
 
-		self._logger.debug(f'{log_prefix} index {self._index} res {results.groups()}')
+		self._logger.debug('%s index %s res %s', log_prefix, self._index, results.groups())
 
 		return True
+
+
+def plot_key (plot_id:str) -> Union[bytes, str]:
+	'''
+	Return a 64 character (lower case) hex plot ID as 32 bytes, or any other
+	plot ID as is. This is how a plot ID is stored, see PlotParameters.plot_key.
+	'''
+
+	if len(plot_id) == 64:
+		try:
+			digest = bytes.fromhex(plot_id)
+		except ValueError:
+			return plot_id
+		if digest.hex() == plot_id:
+			return digest
+
+	return plot_id
@@ -0,0 +1,415 @@
+# system packages
+from datetime import datetime
+from typing   import Callable, Dict, List, Optional, Tuple
+import re
+import time
+
+# local packages
+from src.logger         import Logger
+from src.plotparameters import PlotParameters
+from src.plotphase1     import Phase1, PlotPhase1
+from src.plotphase2     import Phase2, PlotPhase2
+from src.plotphase3     import Phase3, PlotPhase3
+from src.plotphase4     import PlotPhase4
+from src.plottotals     import PlotTotals
+from src.plotutility    import phase_start_time, time_stamp
+from src.profiler       import Profiler
+
+# The patterns are matched at a fixed position and can only backtrack a
+# constant amount for each character, so a long line of digits or quotes
+# takes linear time.
+
+# a number of seconds, as in "time: 213.466 seconds"
+SECONDS = re.compile(r'(\d+(?:\.\d+)?) seconds')
+
+# a GiB value, as in "Final File size: 101.336 GiB"
+GIB = re.compile(r'(\d+(?:\.\d+)?) GiB')
+
+# Copied final file from "/temp2/name.plot.2.tmp" to "/dest/name.plot.2.tmp"
+COPIED = re.compile(r'Copied final file from "([^"]*)" to "([^"]*)"')
+
+
+class PlotParser:
+	'''
+	Extract a plot in a single pass over its lines. Each line is dispatched on
+	its first word to a handler that fills in the parameters, phase 1-4, and
+	totals objects. The result is the same as running each object's regex
+	extract() over the flattened plot, without scanning the plot six times.
+	'''
+
+	# the extractor each part of a plot replaces, for --profile
+	PARTS = ('PlotParameters', 'PlotPhase1', 'PlotPhase2', 'PlotPhase3', 'PlotPhase4', 'PlotTotals')
+
+	def __init__ (self, logger:Logger, index:int, profiler:Optional[Profiler] = None) -> None:
+		self._logger   = logger
+		self._index    = index
+		self._profiler = profiler
+
+		self._phase:int = 0					# phase currently being processed (1 to 4)
+		self._table:Optional[int] = None	# phase 1 or 2 table waiting for a time
+		self._tables:List[int] = []			# phase 3 tables waiting for a time
+		self._passes:List[float] = []		# phase 3 first and second pass times
+
+		# which parts of the plot were found
+		self._have_dirs:bool    = False
+		self._have_id:bool      = False
+		self._have_size:bool    = False
+		self._have_buffer:bool  = False
+		self._have_buckets:bool = False
+		self._have_threads:bool = False
+		self._have_phase:List[bool] = [False] * 5	# index is the phase (1 to 4), both begin and end
+		self._have_begin:List[bool] = [False] * 5	# index is the phase (1 to 4), "Starting phase N"
+		self._have_totals:List[bool] = [False] * 5	# working space, file size, total, copied, copy time
+
+	def extract (self, lines:List[str], parameters:PlotParameters, phase_1:PlotPhase1, phase_2:PlotPhase2, phase_3:PlotPhase3, phase_4:PlotPhase4, totals:PlotTotals) -> bool:
+		'''
+		Extract a plot from its lines. Return True if the extract was good,
+		otherwise False.
+		'''
+
+		self._parameters = parameters
+		self._phases = (None, phase_1, phase_2, phase_3, phase_4)
+		self._totals = totals
+
+		if self._profiler and self._profiler.enabled:
+			return self._extract_profiled(lines, self._profiler)
+
+		self._parse(lines)
+		return self._validate() is None
+
+	def progress (self, lines:List[str], parameters:PlotParameters, phase_1:PlotPhase1, phase_2:PlotPhase2, phase_3:PlotPhase3, phase_4:PlotPhase4, totals:PlotTotals) -> Tuple[int, Optional[datetime]]:
+		'''
+		Extract what there is of a plot that did not finish, without checking
+		it is complete. Return the last phase started (0 if none) and the last
+		time stamp in the lines.
+		'''
+
+		self._parameters = parameters
+		self._phases = (None, phase_1, phase_2, phase_3, phase_4)
+		self._totals = totals
+
+		self._parse(lines)
+
+		for line in reversed(lines):
+			dt = time_stamp(line.rstrip())
+			if dt:
+				return self._phase, dt
+		return self._phase, None
+
+	def _parse (self, lines:List[str]) -> None:
+		'''Dispatch each line to its handler.'''
+
+		handlers = self.HANDLERS
+		for line in lines:
+			text = line.lstrip()
+			space = text.find(' ')
+			handler = handlers.get(text[:space] if space > 0 else text)
+			if handler:
+				handler(self, text)
+
+	def _extract_profiled (self, lines:List[str], profiler:Profiler) -> bool:
+		'''Extract a plot like extract(), timing the lines of each part and counting rejected plots.'''
+
+		secs = [0.0] * len(self.PARTS)
+
+		handlers = self.HANDLERS
+		for line in lines:
+			part = 5 if self._have_phase[4] else self._phase
+			begin = time.perf_counter()
+
+			text = line.lstrip()
+			space = text.find(' ')
+			handler = handlers.get(text[:space] if space > 0 else text)
+			if handler:
+				handler(self, text)
+
+			secs[part] += time.perf_counter() - begin
+
+		for part, name in enumerate(self.PARTS):
+			profiler.add_time(f'extract/{name}', secs[part])
+
+		rejected = self._validate()
+		if rejected:
+			profiler.count(f'plots rejected by {rejected}')
+		return rejected is None
+
+	def _validate (self) -> Optional[str]:
+		'''
+		Log an error for the first part of the plot that is missing. Return
+		the extractor for that part (see PARTS), or None if the plot is good.
+		'''
+
+		if not (self._have_dirs and self._have_id and self._have_size and self._have_buffer and self._have_buckets and self._have_threads):
+			self._logger.error('PlotParameters index %s failed to extract data', self._index)
+			return 'PlotParameters'
+
+		for phase in range(1, 5):
+			if not (self._have_begin[phase] and self._have_phase[phase]):
+				if phase == 4:
+					self._logger.error('PlotPhase4 failed to extract outer data')
+				else:
+					self._logger.error('PlotPhase%s index %s failed to extract outer data', phase, self._index)
+				return self.PARTS[phase]
+
+		if not all(self._have_totals):
+			self._logger.error('PlotTotals index %s failed to extract outer data', self._index)
+			return 'PlotTotals'
+
+		if self._logger.is_enabled(Logger.DEBUG):
+			self._logger.debug('PlotParameters index %s res %s', self._index, self._parameters_groups())
+
+		return None
+
+	def _parameters_groups (self) -> tuple:
+		p = self._parameters
+		return (p.temp_dir_1, p.temp_dir_2, p.plot_id, str(p.plot_size), str(p.buffer_size), str(p.buckets), str(p.threads), str(p.stripe_size))
+
+	# parameters at the top of the plot
+
+	def _into (self, text:str) -> None:
+		# into temporary dirs: /media/temp001 and /media/temp002
+		prefix = 'into temporary dirs: '
+		if text.startswith(prefix):
+			temp_dir_1, _, temp_dir_2 = text[len(prefix):].rpartition(' and ')
+			if temp_dir_1 and temp_dir_2:
+				self._parameters.temp_dir_1 = temp_dir_1
+				self._parameters.temp_dir_2 = temp_dir_2
+				self._have_dirs = True
+
+	def _id (self, text:str) -> None:
+		# ID: c259696a3a94a3b9302ec95d24a5763d9e1125f6ac5ff68f7aca1790501986e9
+		plot_id = text[4:].split(' ', 1)[0]
+		if plot_id.isalnum() and not self._have_id:
+			self._parameters.plot_id = plot_id
+			self._have_id = True
+
+	def _plot (self, text:str) -> None:
+		# Plot size is: 32
+		prefix = 'Plot size is: '
+		if text.startswith(prefix) and not self._have_size:
+			size = text[len(prefix):].split(' ', 1)[0]
+			if size.isdigit():
+				self._parameters.plot_size = int(size)
+				self._have_size = True
+
+	def _buffer (self, text:str) -> None:
+		# Buffer size is: 4096MiB
+		prefix = 'Buffer size is: '
+		if text.startswith(prefix) and not self._have_buffer:
+			size = text[len(prefix):].split('MiB', 1)[0]
+			if size.isdigit():
+				self._parameters.buffer_size = int(size)
+				self._have_buffer = True
+
+	def _using (self, text:str) -> None:
+		# Using 128 buckets
+		# Using 4 threads of stripe size 65536
+		words = text.split(' ')
+		if len(words) < 3 or not words[1].isdigit():
+			return
+
+		if words[2] == 'buckets' and not self._have_buckets:
+			self._parameters.buckets = int(words[1])
+			self._have_buckets = True
+		elif len(words) >= 7 and words[2] == 'threads' and words[6].isdigit() and not self._have_threads:
+			self._parameters.threads = int(words[1])
+			self._parameters.stripe_size = int(words[6])
+			self._have_threads = True
+
+	# phases 1 to 4
+
+	def _starting (self, text:str) -> None:
+		# Starting phase 1/4: Forward Propagation into tmp files... Sun Apr 25 16:59:09 2021
+		prefix = 'Starting phase '
+		if not text.startswith(prefix) or len(text) <= len(prefix):
+			return
+
+		phase = ord(text[len(prefix)]) - ord('0')
+		if phase < 1 or phase > 4:
+			return
+
+		self._phase = phase
+		self._table = None
+		self._tables = []
+		if not self._have_begin[phase]:
+			self._have_begin[phase] = True
+			log_prefix = f'PlotPhase{phase}'
+			self._phases[phase].start_time = phase_start_time(self._logger, log_prefix, self._index, text[len(prefix) + 1:])
+
+	def _time (self, text:str) -> None:
+		# Time for phase 1 = 7518.443 seconds. CPU (162.750%) Sun Apr 25 19:04:27 2021
+		prefix = 'Time for phase '
+		if not text.startswith(prefix) or len(text) <= len(prefix):
+			return
+
+		phase = ord(text[len(prefix)]) - ord('0')
+		if phase < 1 or phase > 4 or not self._have_begin[phase]:
+			return
+
+		seconds = SECONDS.match(text, len(prefix) + 4)
+		if seconds:
+			self._phases[phase].total_time = float(seconds.group(1))
+			self._have_phase[phase] = True
+			self._logger.debug('PlotPhase%s index %s total seconds %s', phase, self._index, self._phases[phase].total_time)
+
+	def _computing (self, text:str) -> None:
+		# Computing table 1
+		if self._phase == 1 and text.startswith('Computing table ') and text[16:17].isdigit():
+			self._table = int(text[16])
+
+	def _table_time (self, text:str) -> None:
+		# F1 complete, time: 213.466 seconds. CPU (158.13%) Sun Apr 25 17:02:43 2021
+		# Forward propagation table time: 1086.462 seconds. CPU (189.780%) Sun Apr 25 17:20:49 2021
+		if self._phase != 1 or self._table is None:
+			return
+
+		position = text.find('time: ')
+		if position < 0:
+			return
+
+		seconds = SECONDS.match(text, position + 6)
+		if seconds:
+			table = self._table
+			value = float(seconds.group(1))
+			self._phases[1].add_table_time(Phase1(table, value))
+			self._table = None
+			self._logger.debug('PlotPhase1 index %s table %s seconds %s', self._index, table, value)
+
+	def _backpropagating (self, text:str) -> None:
+		# Backpropagating on table 7
+		if self._phase == 2 and text.startswith('Backpropagating on table ') and text[25:26].isdigit():
+			self._table = int(text[25])
+
+	def _scanned (self, text:str) -> None:
+		# scanned time =  36.093 seconds. CPU (23.590%) Sun Apr 25 19:05:03 2021
+		if self._phase != 2 or self._table is None:
+			return
+
+		position = text.find('time =  ')
+		if position < 0:
+			return
+
+		seconds = SECONDS.match(text, position + 8)
+		if seconds:
+			table = self._table
+			value = float(seconds.group(1))
+			self._phases[2].add_table_time(Phase2(table, value))
+			self._table = None
+			self._logger.debug('PlotPhase2 index %s table %s seconds %s', self._index, table, value)
+
+	def _compressing (self, text:str) -> None:
+		# Compressing tables 1 and 2
+		if self._phase == 3 and text.startswith('Compressing tables ') and text[19:20].isdigit() and text[25:26].isdigit():
+			self._tables = [int(text[19]), int(text[25])]
+			self._passes = []
+
+	def _pass (self, text:str) -> None:
+		# First computation pass time: 200.000 seconds. CPU (...) Sun Apr 25 ...
+		# Second computation pass time: 180.000 seconds. CPU (...) Sun Apr 25 ...
+		if self._phase != 3 or not self._tables:
+			return
+
+		position = text.find('pass time: ')
+		if position < 0:
+			return
+
+		seconds = SECONDS.match(text, position + 11)
+		if seconds and len(self._passes) < 2:
+			self._passes.append(float(seconds.group(1)))
+
+	def _total (self, text:str) -> None:
+		# Total compress table time: 400.000 seconds. CPU (...) Sun Apr 25 ...
+		# Total time = 13508.459 seconds. CPU (133.870%) Sun Apr 25 20:44:18 2021
+		if text.startswith('Total compress table time: '):
+			if self._phase != 3 or not self._tables or len(self._passes) != 2:
+				return
+
+			seconds = SECONDS.match(text, 27)
+			if seconds:
+				table_1, table_2 = self._tables
+				first_pass, second_pass = self._passes
+				value = float(seconds.group(1))
+				self._phases[3].add_table_time(Phase3(table_1, table_2, first_pass, second_pass, value))
+				self._tables = []
+				self._passes = []
+				self._logger.debug('PlotPhase3 index %s compress tables %s and %s first %s second %s seconds %s', self._index, table_1, table_2, first_pass, second_pass, value)
+
+		elif text.startswith('Total time = '):
+			seconds = SECONDS.match(text, 13)
+			if seconds:
+				self._totals.total_time = float(seconds.group(1))
+				self._have_totals[2] = True
+
+	# totals at the end of the plot
+
+	def _approximate (self, text:str) -> None:
+		# Approximate working space used (without final file): 269.308 GiB
+		prefix = 'Approximate working space used (without final file): '
+		if text.startswith(prefix):
+			gib = GIB.match(text, len(prefix))
+			if gib:
+				self._totals.working_gb = float(gib.group(1))
+				self._have_totals[0] = True
+
+	def _final (self, text:str) -> None:
+		# Final File size: 101.336 GiB
+		prefix = 'Final File size: '
+		if text.startswith(prefix):
+			gib = GIB.match(text, len(prefix))
+			if gib:
+				self._totals.file_gb = float(gib.group(1))
+				self._have_totals[1] = True
+
+	def _copied (self, text:str) -> None:
+		# Copied final file from "/temp2/name.plot.2.tmp" to "/dest/name.plot.2.tmp"
+		copied = COPIED.match(text)
+		if copied:
+			self._totals.temp_path = copied.group(1)
+			self._totals.dest_path = copied.group(2)
+			self._have_totals[3] = True
+
+	def _copy (self, text:str) -> None:
+		# Copy time = 371.657 seconds. CPU (21.260%) Sun Apr 25 20:50:30 2021
+		prefix = 'Copy time = '
+		if not text.startswith(prefix):
+			return
+
+		seconds = SECONDS.match(text, len(prefix))
+		if seconds:
+			totals = self._totals
+			totals.copy_secs = float(seconds.group(1))
+			totals.end_time = phase_start_time(self._logger, 'PlotTotals', self._index, text[seconds.end():])
+			self._have_totals[4] = True
+
+			if self._logger.is_enabled(Logger.DEBUG):
+				self._logger.debug('PlotTotals index %s working GB %s', self._index, totals.working_gb)
+				self._logger.debug('PlotTotals index %s file GB %s', self._index, totals.file_gb)
+				self._logger.debug('PlotTotals index %s total seconds %s', self._index, totals.total_time)
+				self._logger.debug('PlotTotals index %s copy seconds %s', self._index, totals.copy_secs)
+				self._logger.debug('PlotTotals index %s end time %s', self._index, totals.end_time)
+				self._logger.debug('PlotTotals index %s temp path %s', self._index, totals.temp_path)
+				self._logger.debug('PlotTotals index %s dest path %s', self._index, totals.dest_path)
+
+	# key is the first word of a line, value is the handler for that line
+	HANDLERS:Dict[str, Callable[['PlotParser', str], None]] = {
+		'into':            _into,
+		'ID:':             _id,
+		'Plot':            _plot,
+		'Buffer':          _buffer,
+		'Using':           _using,
+		'Starting':        _starting,
+		'Time':            _time,
+		'Computing':       _computing,
+		'F1':              _table_time,
+		'Forward':         _table_time,
+		'Backpropagating': _backpropagating,
+		'scanned':         _scanned,
+		'Compressing':     _compressing,
+		'First':           _pass,
+		'Second':          _pass,
+		'Total':           _total,
+		'Approximate':     _approximate,
+		'Final':           _final,
+		'Copied':          _copied,
+		'Copy':            _copy,
+	}
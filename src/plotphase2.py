@@ -1,6 +1,7 @@
 # system packages
+from array    import array
 from datetime import datetime
-from typing   import List, NamedTuple, Optional
+from typing   import Iterable, List, NamedTuple, Optional
 import re
 
 # local packages
@@ -14,9 +15,12 @@ class Phase2 (NamedTuple):
 
 class PlotPhase2:
 	'''
-	Process a plot and extract the time for phase 2.
+	Process a plot and extract the time for phase 2. The table times are
+	stored in an array, 2 values per table, see table_time.
 	'''
 
+	__slots__ = ('_logger', '_index', 'start_time', 'total_time', '_table_time')
+
 	def __init__ (self, logger:Logger, index:int) -> None:
 		self._logger = logger
 		self._index  = index
@@ -24,7 +28,22 @@ class PlotPhase2:
 		self.start_time:Optional[datetime] = None
 		self.total_time:float = 0.0
 
-		self.table_time:List[Phase2] = []
+		self._table_time = array('d')
+
+	@property
+	def table_time (self) -> List[Phase2]:
+		values = self._table_time
+		rows = [values[i:i + 2] for i in range(0, len(values), 2)]
+		return [Phase2(int(row[0]), row[1]) for row in rows]
+
+	@table_time.setter
+	def table_time (self, value:Iterable[Phase2]) -> None:
+		self._table_time = array('d')
+		for ph in value:
+			self.add_table_time(ph)
+
+	def add_table_time (self, ph:Phase2) -> None:
+		self._table_time.extend(ph)
 
 	def extract (self, data:str) -> bool:
 		'''Extract the time for phase 2. Return True if the extract was good, otherwise False.'''
@@ -38,13 +57,13 @@ class PlotPhase2:
 
 		outer = re.search(outer_begin + outer_end, data)
 		if not outer:
-			self._logger.error(f'{log_prefix} index {self._index} failed to extract outer data')
+			self._logger.error('%s index %s failed to extract outer data', log_prefix, self._index)
 			return False
 
 		have:int = len(outer.groups())
 		need:int = 2
 		if have != need:
-			self._logger.error(f'{log_prefix} index {self._index} failed to match outer data, need {need} groups, have {have} groups')
+			self._logger.error('%s index %s failed to match outer data, need %s groups, have %s groups', log_prefix, self._index, need, have)
 			return False
 
 		body = outer.group(1)
@@ -56,15 +75,15 @@ class PlotPhase2:
 		for result in inner:
 			have = len(result)
 			if have != need:
-				self._logger.error(f'{log_prefix} index {self._index} failed to match inner data, need {need} groups, have {have} groups')
+				self._logger.error('%s index %s failed to match inner data, need %s groups, have %s groups', log_prefix, self._index, need, have)
 				return False
 
 			table = int(result[1])
 			seconds = float(result[3])
 			ph = Phase2(table, seconds)
-			self.table_time.append(ph)
-			self._logger.debug(f'{log_prefix} index {self._index} table {table} seconds {seconds}')
+			self.add_table_time(ph)
+			self._logger.debug('%s index %s table %s seconds %s', log_prefix, self._index, table, seconds)
 
-		self._logger.debug(f'{log_prefix} index {self._index} total seconds {self.total_time}')
+		self._logger.debug('%s index %s total seconds %s', log_prefix, self._index, self.total_time)
 
 		return True
@@ -1,6 +1,7 @@
 # system packages
+from array    import array
 from datetime import datetime
-from typing   import List, NamedTuple, Optional
+from typing   import Iterable, List, NamedTuple, Optional
 import re
 
 # local packages
@@ -17,9 +18,12 @@ class Phase3 (NamedTuple):
 
 class PlotPhase3:
 	'''
-	Process a plot and extract the time for phase 3.
+	Process a plot and extract the time for phase 3. The table times are
+	stored in an array, 5 values per table, see table_time.
 	'''
 
+	__slots__ = ('_logger', '_index', 'start_time', 'total_time', '_table_time')
+
 	def __init__ (self, logger:Logger, index:int) -> None:
 		self._logger = logger
 		self._index  = index
@@ -27,7 +31,22 @@ class PlotPhase3:
 		self.start_time:Optional[datetime] = None
 		self.total_time:float = 0.0
 
-		self.table_time:List[Phase3] = []
+		self._table_time = array('d')
+
+	@property
+	def table_time (self) -> List[Phase3]:
+		values = self._table_time
+		rows = [values[i:i + 5] for i in range(0, len(values), 5)]
+		return [Phase3(int(row[0]), int(row[1]), row[2], row[3], row[4]) for row in rows]
+
+	@table_time.setter
+	def table_time (self, value:Iterable[Phase3]) -> None:
+		self._table_time = array('d')
+		for ph in value:
+			self.add_table_time(ph)
+
+	def add_table_time (self, ph:Phase3) -> None:
+		self._table_time.extend(ph)
 
 	def extract (self, data:str) -> bool:
 		'''Extract the time for phase 3. Return True if the extract was good, otherwise False.'''
@@ -38,45 +57,50 @@ class PlotPhase3:
 		outer_end    = r'Time for phase 3 = (\d+.\d+) seconds'
 		pattern_outer = outer_begin + outer_end
 
-		inner_head   = r'(.+?)Compressing tables (\d) and (\d)(.+?)'
-		inner_first  = r'First computation pass time: (\d+.\d+) seconds(.+?)'
-		inner_second = r'Second computation pass time: (\d+.\d+) seconds(.+?)'
-		inner_total  = r'Total compress table time: (\d+.\d+) seconds'
+		# the text between the values of a table can not run into the next
+		# table, so a table with a missing line does not make every search
+		# scan to the end of the phase (which takes quadratic time)
+		gap = r'(?:(?!Compressing tables ).)*?'
+
+		inner_head   = r'Compressing tables (\d) and (\d)' + gap
+		inner_first  = r'First computation pass time: (\d+\.\d+) seconds' + gap
+		inner_second = r'Second computation pass time: (\d+\.\d+) seconds' + gap
+		inner_total  = r'Total compress table time: (\d+\.\d+) seconds'
 		pattern_inner = inner_head + inner_first + inner_second + inner_total
 
 		outer = re.search(pattern_outer, data)
 		if not outer:
-			self._logger.error(f'{log_prefix} index {self._index} failed to extract outer data')
+			self._logger.error('%s index %s failed to extract outer data', log_prefix, self._index)
 			return False
 
 		have:int = len(outer.groups())
 		need:int = 2
 		if have != need:
-			self._logger.error(f'{log_prefix} index {self._index} failed to match outer data, need {need} groups, have {have} groups')
+			self._logger.error('%s index %s failed to match outer data, need %s groups, have %s groups', log_prefix, self._index, need, have)
 			return False
 
 		body = outer.group(1)
 		self.start_time = phase_start_time(self._logger, log_prefix, self._index, body)
 		self.total_time = float(outer.group(2))
 
-		need = 9
+		need = 5
 		inner = re.findall(pattern_inner, body)
 		for result in inner:
 			have = len(result)
 			if have != need:
-				self._logger.error(f'{log_prefix} index {self._index} failed to match inner data, need {need} groups, have {have} groups')
+				self._logger.error('%s index %s failed to match inner data, need %s groups, have %s groups', log_prefix, self._index, need, have)
 				return False
 
-			table_1 = int(result[1])
-			table_2 = int(result[2])
-			first_pass = float(result[4])
-			second_pass = float(result[6])
-			seconds  = float(result[8])
+			table_1 = int(result[0])
+			table_2 = int(result[1])
+			first_pass = float(result[2])
+			second_pass = float(result[3])
+			seconds  = float(result[4])
 			ph = Phase3(table_1, table_2, first_pass, second_pass, seconds)
-			self.table_time.append(ph)
+			self.add_table_time(ph)
 
-			self._logger.debug(f'{log_prefix} index {self._index} compress tables {table_1} and {table_2} first {first_pass} second {second_pass} seconds {seconds}')
+			self._logger.debug('%s index %s compress tables %s and %s first %s second %s seconds %s', log_prefix, self._index, table_1, table_2, first_pass, second_pass, seconds)
 
-		self._logger.debug(f'{log_prefix} index {self._index} total seconds {self.total_time}')
+		self._logger.debug('%s index %s total seconds %s', log_prefix, self._index, self.total_time)
 
 		return True
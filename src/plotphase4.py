@@ -13,6 +13,8 @@ class PlotPhase4:
 	Process a plot and extract the time for phase 4.
 	'''
 
+	__slots__ = ('_logger', '_index', 'start_time', 'total_time')
+
 	def __init__ (self, logger:Logger, index:int) -> None:
 		self._logger = logger
 		self._index  = index
@@ -31,19 +33,19 @@ class PlotPhase4:
 
 		outer = re.search(pattern, data)
 		if not outer:
-			self._logger.error(f'{log_prefix} failed to extract outer data')
+			self._logger.error('%s failed to extract outer data', log_prefix)
 			return False
 
 		have:int = len(outer.groups())
 		need:int = 2
 		if have != need:
-			self._logger.error(f'{log_prefix} index {self._index} failed to match outer data, need {need} groups, have {have} groups')
+			self._logger.error('%s index %s failed to match outer data, need %s groups, have %s groups', log_prefix, self._index, need, have)
 			return False
 
 		body = outer.group(1)
 		self.start_time = phase_start_time(self._logger, log_prefix, self._index, body)
 		self.total_time = float(outer.group(2))
 
-		self._logger.debug(f'{log_prefix} index {self._index} total seconds {self.total_time}')
+		self._logger.debug('%s index %s total seconds %s', log_prefix, self._index, self.total_time)
 
 		return True
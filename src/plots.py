@@ -1,11 +1,62 @@
 # system packages
-from pathlib  import Path
-from typing   import List
-import re
+from collections import deque
+from contextlib  import ExitStack
+from pathlib     import Path
+from typing      import Any, BinaryIO, Callable, Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple, Union
+import mmap
+import multiprocessing
+import os
+import time
 
 # local packages
-from src.config import Config
-from src.plot   import Plot
+from src.config       import Config
+from src.logreader    import compression, map_log, open_log, source_key
+from src.pipeline     import background
+from src.plot         import IncompletePlot, Plot, PlotRecord, SummaryPlot
+from src.plotcache    import PlotCache
+from src.plotsplitter import PlotSplitter, mmap_lines
+from src.plotstore    import PlotStore
+from src.summary      import Summary
+
+
+class ExtractTask (NamedTuple):
+	'''
+	A byte range of a log file to extract plots from. Large files are split
+	into several tasks at plot boundaries so they can be extracted in parallel.
+	'''
+
+	path:str
+	start:int				# byte offset of the first line
+	size:Optional[int]		# number of bytes, None reads to the end of the file
+	index:int				# index of the first plot in the range (1 is the first plot in the file)
+
+
+# an opened log file, a stream (see open_log()) or a memory-mapped file (see map_log())
+LogData = Union[BinaryIO, mmap.mmap]
+
+
+class PendingFile (NamedTuple):
+	'''A log file that is being read ahead, waiting for its turn to be extracted.'''
+
+	path:Path
+	stat:os.stat_result
+	task:Optional[ExtractTask]		# None if the file is unchanged (all plots are in the cache)
+	records:List[PlotRecord]		# plots in the cache
+	incomplete:List[IncompletePlot]	# incomplete plots in the cache
+	offset:Tuple[int, int]			# cached offset and next index
+	f:Optional[LogData]				# the file, positioned at the start of the task, or memory-mapped
+
+
+class ExtractResult (NamedTuple):
+	'''The plots extracted from an ExtractTask().'''
+
+	task:ExtractTask
+	plots:List[Any]			# Plot() objects, or PlotRecord() objects from a worker process
+	offset:int				# byte offset after the last complete plot
+	index:int				# index of the next plot in the file
+	size:int				# number of bytes read
+	incomplete:List[IncompletePlot]
+	error:str				# why the file could not be read to the end, empty if it was
 
 
 class Plots:
@@ -13,64 +64,381 @@ class Plots:
 	Process plots in log files. A log file may contain more than one plot entry.
 	'''
 
-	def __init__ (self, config:Config) -> None:
+	# log files larger than this are split into tasks of about this size when
+	# extracting in parallel
+	SPLIT_BYTES = 16 * 1024 * 1024
+
+	# local log files at least this large are memory-mapped (see Config.mmap)
+	MMAP_BYTES = 1024 * 1024
+
+	def __init__ (self, config:Config, cache:Optional[PlotCache] = None) -> None:
 		self._config = config
+		self._cache  = cache
+
+		self._files:Dict[Path, None] = {}	# files that were processed, in order
+		self._sources:Dict[Path, Path] = {}	# key is a log without a compression suffix, value is the file processed
+		self._store = PlotStore()			# plots, by plot id
 
-		self._files:List[Path] = []		# files that were processed
-		self._plots:List[Plot] = []		# a single plot extracted from a log file
-		self._plot_ids:List[str] = []	# plot id's are used to check for duplicates
+		self._incomplete:List[IncompletePlot] = []	# plots that did not finish, in file order
+		self._errors:Dict[Path, str] = {}			# key is a file that could not be read to the end, value is the error
+
+		# the incomplete plots added from summaries, as (host, log file, offset), see add_summary()
+		self._summary_incomplete:Set[Tuple[str, str, int]] = set()
+
+		# key is a file that was processed, value is the byte offset after the
+		# last complete plot and the index of the next plot
+		self._offsets:Dict[Path, Tuple[int, int]] = {}
+
+		# called with each plot that is added, after it is post-processed (see stream_to())
+		self._on_plot:Optional[Callable[[Plot], None]] = None
 
 	@property
 	def files (self) -> List[Path]:
 		'''Return a list of files processed, each element is a Path() object.'''
 
-		return self._files
+		return list(self._files)
 
 	@property
 	def plots (self) -> List[Plot]:
 		'''Return a list of Plot() objects.'''
 
-		return self._plots
+		return self._store.plots
+
+	@property
+	def store (self) -> PlotStore:
+		'''Return the PlotStore(), the plots by plot id in the order they were added.'''
+
+		return self._store
+
+	@property
+	def incomplete (self) -> List[IncompletePlot]:
+		'''Return the plots that started but did not finish, see IncompletePlot().'''
+
+		return self._incomplete
+
+	@property
+	def errors (self) -> Dict[Path, str]:
+		'''Return the files that could not be read to the end, value is the error.'''
+
+		return self._errors
+
+	def offset (self, log_file_path:Path) -> Tuple[int, int]:
+		'''
+		Return the byte offset after the last complete plot in a processed file
+		and the index of the next plot, which is where reading resumes.
+		'''
+
+		return self._offsets.get(log_file_path, (0, 1))
+
+	def stream_to (self, on_plot:Callable[[Plot], None]) -> None:
+		'''
+		Post-process each plot as it is added and pass it to on_plot (such as
+		Analyze.add_plot), so the plots flow from the parser to the analysis
+		without later passes over every plot.
+		'''
+
+		self._on_plot = on_plot
+
+	def add_plot (self, plot:Plot) -> bool:
+		'''Add a plot unless it is a duplicate. Return True if the plot was added.'''
+
+		if self._store.add(plot):
+			if self._on_plot:
+				self.post_process_plot(plot)
+				self._on_plot(plot)
+			return True
+
+		if self._config.profiler.enabled:
+			self._config.profiler.count('plots duplicate')
+		return False
+
+	def add_summary (self, summary:Summary) -> List[SummaryPlot]:
+		'''
+		Add the plots of a summary from another host (see Summary), which are
+		already post-processed, and its incomplete plots. A plot with the plot
+		ID of a plot already added, from an earlier summary, is skipped, and
+		so is an incomplete plot already added from the same log file and
+		offset of the same host. Return the plots that were added.
+		'''
+
+		added:List[SummaryPlot] = []
+		for position, summary_plot in enumerate(summary.plots):
+			if summary.records is None:
+				plot = Plot.from_summary(self._config, summary_plot)
+			else:
+				plot = Plot.from_record(self._config, summary.records[position])
+				plot.name = summary_plot.name
+				plot.set_plot_date()
+				plot.set_plot_time()
+
+			if self._store.add(plot):
+				added.append(summary_plot)
+			elif self._config.profiler.enabled:
+				self._config.profiler.count('plots duplicate')
+
+		for incomplete in summary.incomplete:
+			key = (summary.host, incomplete.log_file, incomplete.offset)
+			if key not in self._summary_incomplete:
+				self._summary_incomplete.add(key)
+				self._incomplete.append(incomplete)
+
+		return added
 
 	def extract (self, log_file_path:Path) -> None:
-		'''Extract one or more plots from a log file.'''
+		'''
+		Extract one or more plots from a log file. The file is read one line at
+		a time, or memory-mapped if it is large and local (see open_task()), and
+		each plot is extracted as soon as it ends, so only one plot is held in
+		memory. Files in the cache are not read again.
+		'''
+
+		pending = self._open(log_file_path, False)
+		if pending:
+			self._finish(pending)
+
+	def _open (self, log_file_path:Path, read_ahead:bool) -> Optional[PendingFile]:
+		'''
+		Plan the extraction of a log file and open it, or return None if the
+		file was already processed. With read_ahead a background thread starts
+		reading the file, unless it is memory-mapped (see open_task()).
+		'''
+
+		if log_file_path in self._files or not self._new_source(log_file_path):
+			return None
+		self._files[log_file_path] = None
+
+		try:
+			stat, task, records, incomplete, offset = self._plan(log_file_path)
+			f = open_task(self._config, task, read_ahead) if task else None
+		except OSError as e:
+			self._error(log_file_path, str(e))
+			return None
+
+		return PendingFile(log_file_path, stat, task, records, incomplete, offset, f)
+
+	def _finish (self, pending:PendingFile) -> None:
+		'''Extract the plots of an opened log file and add them, with the plots in the cache.'''
+
+		path, stat, task, records, incomplete, offset, f = pending
+
+		for record in records:
+			self.add_plot(Plot.from_record(self._config, record, path))
+		self._incomplete.extend(incomplete)
+		self._count(task, len(records))
+
+		if task and f:
+			with f:
+				result = extract_data(self._config, f, task)
+			self._count_result(result)
+			for plot in result.plots:
+				self.add_plot(plot)
+			self._incomplete.extend(result.incomplete)
+
+			# a file with an error is read again next time
+			if result.error:
+				self._error(path, result.error)
+			elif self._cache:
+				records = records + [plot.to_record() for plot in result.plots]
+				self._cache.update(path, stat, result.offset, result.index, records, incomplete + result.incomplete)
+
+			offset = (result.offset, result.index)
 
-		# define the output from a single plot; a log file may contain more than
-		# one plot
-		plot_begin = r'Starting plotting progress (.+?)'
-		plot_end   = r'Renamed final file'
-		pattern = plot_begin + plot_end
+		self._offsets[path] = offset
 
-		if log_file_path in self._files:
+	def extract_stdin (self, stream:BinaryIO) -> None:
+		'''Extract plots from a stream, such as "chia plots create" piped to stdin.'''
+
+		path = Path('-')
+		result = extract_stream(self._config, stream, ExtractTask(str(path), 0, None, 1))
+		self._count(result.task, 0)
+		self._count_result(result)
+		for plot in result.plots:
+			self.add_plot(plot)
+		self._incomplete.extend(result.incomplete)
+
+		if result.error:
+			self._error(path, result.error)
+
+		self._files[path] = None
+
+	def extract_files (self, log_file_paths:Iterable[Path], jobs:int = 1) -> None:
+		'''
+		Extract plots from log files. With more than one job the files are
+		extracted by a pool of processes; large files are split at plot
+		boundaries so one huge log does not keep a single process busy at the
+		end of the run. Plots are added in the same order as a serial run.
+
+		With one job the files are a pipeline: the paths (such as the file
+		discovery walk) are produced by a background thread, the next
+		"readers" files are read ahead by background threads, and each file is
+		extracted in turn, in the order of the paths. The queues between the
+		stages are bounded, so a slow stage holds back the others.
+		'''
+
+		if jobs <= 1:
+			readers = self._config.readers
+			if readers <= 0:
+				for log_file_path in log_file_paths:
+					self.extract(log_file_path)
+				return
+
+			window:Deque[PendingFile] = deque()
+			try:
+				for log_file_path in background(log_file_paths):
+					pending = self._open(log_file_path, True)
+					if pending:
+						window.append(pending)
+					if len(window) > readers:
+						self._finish(window.popleft())
+
+				while window:
+					self._finish(window.popleft())
+
+			finally:
+				for pending in window:
+					if pending.f:
+						pending.f.close()
 			return
 
-		with open(log_file_path, 'r') as f:
-			log_data = f.read()
-			data_replace = log_data.replace('\n', ' ')
+		# skip files that were already processed, duplicate files, and
+		# compressed copies of a log that was processed
+		paths = [path for path in dict.fromkeys(log_file_paths) if path not in self._files and self._new_source(path)]
+
+		# files in the cache are not sent to the pool
+		plans = []
+		for path in paths:
+			try:
+				plans.append((path, *self._plan(path)))
+			except OSError as e:
+				self._error(path, str(e))
+		tasks = [task for _, _, task, _, _, _ in plans if task]
+
+		with ExitStack() as stack:
+			if tasks:
+				pool = stack.enter_context(multiprocessing.Pool(jobs, _init_worker, (self._config,)))
+				results = pool.imap(_extract_task, self._split_tasks(tasks))
+
+			for path, stat, task, records, incomplete, offset in plans:
+				self._count(task, len(records))
+				if task:
+					# a file may be split into several tasks, the last one reads
+					# to the end of the file
+					records = list(records)
+					incomplete = list(incomplete)
+					errors:List[str] = []
+					while True:
+						result = next(results)
+						self._count_result(result)
+						records.extend(result.plots)
+						incomplete.extend(result.incomplete)
+						if result.error:
+							errors.append(result.error)
+						if result.task.size is None:
+							break
+
+					# a file with an error is read again next time
+					if errors:
+						self._error(path, errors[0])
+					elif self._cache:
+						self._cache.update(path, stat, result.offset, result.index, records, incomplete)
+
+					offset = (result.offset, result.index)
+
+				self._offsets[path] = offset
+
+				for record in records:
+					self.add_plot(Plot.from_record(self._config, record, path))
+				self._incomplete.extend(incomplete)
+
+		self._files.update(dict.fromkeys(paths))
+
+	def _new_source (self, path:Path) -> bool:
+		'''
+		Return True if a log file is a new source. A compressed copy of a log
+		("chia-1.log.gz" and "chia-1.log") is the same source, only the first
+		one found is processed.
+		'''
+
+		source = self._sources.setdefault(source_key(path), path)
+		if source == path:
+			return True
+
+		self._config.logger.info('Plots skipping %s, same log as %s', path, source)
+		return False
+
+	def _error (self, path:Path, error:str) -> None:
+		'''Record a file that could not be read to the end, the other files are still extracted.'''
+
+		self._config.logger.error('Plots %s %s', path, error)
+		self._errors[path] = error
 
-			plots = re.findall(pattern, data_replace)
-			self._config.logger.debug(f'number of  plots {len(plots)}')
+		profiler = self._config.profiler
+		if profiler.enabled:
+			profiler.count('files with errors')
 
-			# process each plot in the log file
-			for index, result in enumerate(plots, 1):
-				self._config.logger.debug(f'results len {len(result)}')
+	def _count (self, task:Optional[ExtractTask], cached:int) -> None:
+		'''Count a file that is read (task) or unchanged, and the plots from the cache (--profile).'''
 
-				plot = Plot(self._config, log_file_path, index)
-				if plot.extract(result):
-					plot_id = plot.parameters.plot_id
-					if plot_id not in self._plot_ids:
-						self._plots.append(plot)
-						self._plot_ids.append(plot_id)
+		profiler = self._config.profiler
+		if profiler.enabled:
+			profiler.count('files read' if task else 'files unchanged')
+			profiler.count('plots from cache', cached)
+
+	def _count_result (self, result:ExtractResult) -> None:
+		'''Count the bytes read and the plots extracted (--profile).'''
+
+		profiler = self._config.profiler
+		if profiler.enabled:
+			profiler.count('bytes read', result.size)
+			profiler.count('plots extracted', len(result.plots))
+
+	def _plan (self, path:Path) -> Tuple[os.stat_result, Optional[ExtractTask], List[PlotRecord], List[IncompletePlot], Tuple[int, int]]:
+		'''
+		Return the file status, the task to extract the file, the complete and
+		incomplete plots already in the cache, and the cached offset and next
+		index. The task is None if the file is unchanged.
+		'''
 
-			self._files.append(log_file_path)
+		stat = path.stat()
+
+		if self._cache:
+			entry, unchanged = self._cache.lookup(path, stat)
+			if entry and unchanged:
+				return stat, None, entry.records, entry.incomplete, (entry.offset, entry.index)
+
+			# a compressed file can not be read from an offset, read it all again;
+			# the incomplete plots after the offset are read again
+			if entry and not compression(path):
+				incomplete = [plot for plot in entry.incomplete if plot.offset < entry.offset]
+				return stat, ExtractTask(str(path), entry.offset, None, entry.index), entry.records, incomplete, (entry.offset, entry.index)
+
+		return stat, ExtractTask(str(path), 0, None, 1), [], [], (0, 1)
+
+	def _split_tasks (self, tasks:List[ExtractTask]) -> Iterator[ExtractTask]:
+		'''Return the tasks for each file, splitting large files at plot boundaries.'''
+
+		for task in tasks:
+			# a compressed file can not be split, it is read from the start
+			if Path(task.path).stat().st_size - task.start <= self.SPLIT_BYTES or compression(Path(task.path)):
+				yield task
+				continue
+
+			start:int = task.start
+			index:int = task.index
+
+			for count, offset in enumerate(plot_boundaries(Path(task.path), task.start), task.index):
+				if offset - start >= self.SPLIT_BYTES:
+					yield ExtractTask(task.path, start, offset - start, index)
+					start = offset
+					index = count + 1
+
+			yield ExtractTask(task.path, start, None, index)
 
 	def post_process (self) -> None:
 		'''Post-process each plot and add more information.'''
 
-		for plot in self._plots:
-			plot.set_plot_configuration()	# group plots by disks/SSDs used
-			plot.set_plot_date()			# plot yyyy-mm and yyyy-mm-dd and
-			plot.set_plot_time()			# start, end, and elapsed time
+		for plot in self._store:
+			self.post_process_plot(plot)
 
 			'''
 			from datetime    import datetime
@@ -85,6 +453,21 @@ class Plots:
 			overlap = max(0, delta)
 			'''
 
+	def post_process_plot (self, plot:Plot) -> None:
+		'''Post-process a plot and add more information.'''
+
+		# group plots by disks/SSDs used
+		profiler = self._config.profiler
+		if profiler.enabled:
+			begin = time.perf_counter()
+			plot.set_plot_configuration()
+			profiler.add_time('post_process/configuration', time.perf_counter() - begin)
+		else:
+			plot.set_plot_configuration()
+
+		plot.set_plot_date()			# plot yyyy-mm and yyyy-mm-dd and
+		plot.set_plot_time()			# start, end, and elapsed time
+
 	def sort_by_start_time (self) -> List[Plot]:
 		'''
 		Return all Plot() objects sorted by the start time. Duplicate start
@@ -92,3 +475,196 @@ class Plots:
 		'''
 
 		return []
+
+
+def plot_boundaries (path:Path, start:int = 0) -> Iterator[int]:
+	'''
+	Return the byte offset after each complete plot in a log file, from a
+	byte offset. The file is memory-mapped and only the lines that start or
+	end a plot are looked at (see PlotSplitter.scan_mmap()); a file that can
+	not be mapped is read one line at a time.
+	'''
+
+	splitter = PlotSplitter(start)
+
+	with open(path, 'rb') as f:
+		try:
+			data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+		except (OSError, ValueError):		# an empty file, or a file system without mmap
+			f.seek(start)
+			yield from splitter.scan(f)
+			return
+
+		with data:
+			yield from splitter.scan_mmap(data)
+
+
+def extract_range (config:Config, task:ExtractTask) -> ExtractResult:
+	'''Extract the plots in a byte range of a log file, which may be compressed or memory-mapped (see open_task()).'''
+
+	try:
+		f = open_task(config, task)
+	except OSError as e:
+		return ExtractResult(task, [], task.start, task.index, 0, [], str(e))
+
+	with f:
+		return extract_data(config, f, task)
+
+
+def open_task (config:Config, task:ExtractTask, background:bool = False) -> LogData:
+	'''
+	Open the log file of a task. A large local file is memory-mapped (see
+	map_log() and Config.mmap), any other file is opened with open_log(), read
+	ahead by a background thread with background.
+	'''
+
+	path = Path(task.path)
+	if config.mmap:
+		data = map_log(path, Plots.MMAP_BYTES)
+		if data is not None:
+			return data
+	return open_log(path, task.start, background)
+
+
+def extract_data (config:Config, f:LogData, task:ExtractTask) -> ExtractResult:
+	'''Extract the plots of a task from a file opened by open_task().'''
+
+	if isinstance(f, mmap.mmap):
+		return extract_mmap(config, f, task)
+	return extract_stream(config, f, task)
+
+
+def extract_stream (config:Config, f:BinaryIO, task:ExtractTask) -> ExtractResult:
+	'''
+	Extract the plots in a stream opened in binary mode. The stream is read
+	from its current position, which is the start of the task.
+
+	Plots that did not finish are returned as IncompletePlot() objects. An
+	error while reading, such as a damaged compressed file, or running out of
+	the time budget (see Config.time_budget) stops the extract; the plots
+	found so far are returned with the error, so one bad file does not stop
+	the others.
+	'''
+
+	path = Path(task.path)
+	plots:List[Plot] = []
+	incomplete:List[IncompletePlot] = []
+	index:int = task.index
+	error:str = ''
+
+	def on_incomplete (offset:int, lines:List[str], reason:str) -> None:
+		incomplete.append(Plot(config, path, index).to_incomplete(lines, offset, reason))
+
+	splitter = PlotSplitter(task.start, on_incomplete)
+	deadline = time.perf_counter() + config.time_budget if config.time_budget else None
+
+	# process each plot in the byte range
+	try:
+		for lines in splitter.split(f, task.size, deadline):
+			config.logger.debug('results len %s', len(lines))
+
+			plot = Plot(config, path, index)
+			if plot.extract(lines):
+				plots.append(plot)
+			else:
+				on_incomplete(splitter.plot_start, lines, 'invalid')
+			index += 1
+
+	except Exception as e:
+		error = str(e) or type(e).__name__
+
+	else:
+		# the last plot in the file has not finished, the plotter may still be running
+		unfinished = splitter.unfinished()
+		if unfinished:
+			on_incomplete(*unfinished, 'unfinished')
+
+	config.logger.debug('number of  plots %s', index - task.index)
+
+	return ExtractResult(task, plots, splitter.offset, index, splitter.position - task.start, incomplete, error)
+
+
+def extract_mmap (config:Config, data:mmap.mmap, task:ExtractTask) -> ExtractResult:
+	'''
+	Extract the plots in a memory-mapped log file, like extract_stream().
+	The plots are found in the mapped bytes (see PlotSplitter.split_mmap())
+	and scanned without decoding their lines (see Plot.extract_mmap()); only
+	the lines of an incomplete plot, or of a plot with a line too long to
+	scan, are decoded. The pages that were scanned are released every
+	RELEASE_BYTES, so the resident memory of a huge file stays bounded.
+	'''
+
+	path = Path(task.path)
+	plots:List[Plot] = []
+	incomplete:List[IncompletePlot] = []
+	index:int = task.index
+	error:str = ''
+
+	def on_incomplete (offset:int, lines:List[str], reason:str) -> None:
+		incomplete.append(Plot(config, path, index).to_incomplete(lines, offset, reason))
+
+	splitter = PlotSplitter(task.start, on_incomplete)
+	deadline = time.perf_counter() + config.time_budget if config.time_budget else None
+	released = task.start // mmap.PAGESIZE * mmap.PAGESIZE
+
+	# process each plot in the byte range
+	try:
+		for start, end in splitter.split_mmap(data, task.size, deadline):
+			plot = Plot(config, path, index)
+			good = plot.extract_mmap(data, start, end)
+			if good is None:
+				# a line too long to scan, extract the plot from its lines as split() returns them
+				plot = Plot(config, path, index)
+				good = plot.extract(mmap_lines(data, start, end, splitter.plot_start))
+
+			if good:
+				plots.append(plot)
+			else:
+				on_incomplete(splitter.plot_start, mmap_lines(data, start, end, splitter.plot_start), 'invalid')
+			index += 1
+
+			if splitter.offset - released >= RELEASE_BYTES:
+				released = release_pages(data, released, splitter.offset)
+
+	except Exception as e:
+		error = str(e) or type(e).__name__
+
+	else:
+		# the last plot in the file has not finished, the plotter may still be running
+		if splitter.in_plot:
+			on_incomplete(splitter.plot_start, mmap_lines(data, splitter.text_start, splitter.position, splitter.plot_start), 'unfinished')
+
+	config.logger.debug('number of  plots %s', index - task.index)
+
+	return ExtractResult(task, plots, splitter.offset, index, splitter.position - task.start, incomplete, error)
+
+
+# the pages of a memory-mapped file are released after this many bytes are scanned
+RELEASE_BYTES = 16 * 1024 * 1024
+
+def release_pages (data:mmap.mmap, start:int, end:int) -> int:
+	'''
+	Drop the pages of a memory-mapped file from start (a page boundary) to
+	end from the resident memory of this process, they are read from the
+	file again if needed. Return the page boundary released up to.
+	'''
+
+	end = end // mmap.PAGESIZE * mmap.PAGESIZE
+	if hasattr(mmap, 'MADV_DONTNEED') and end > start:
+		data.madvise(mmap.MADV_DONTNEED, start, end - start)
+	return max(start, end)
+
+
+# the configuration used by each worker process
+_worker_config:Optional[Config] = None
+
+def _init_worker (config:Config) -> None:
+	global _worker_config
+	_worker_config = config
+
+def _extract_task (task:ExtractTask) -> ExtractResult:
+	'''Extract a task in a worker process and return compact plot records.'''
+
+	assert _worker_config is not None
+	result = extract_range(_worker_config, task)
+	return result._replace(plots=[plot.to_record() for plot in result.plots])
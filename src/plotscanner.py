@@ -0,0 +1,282 @@
+# system packages
+from typing import Callable, Dict, Optional
+import mmap
+import re
+import time
+
+# local packages
+from src.logger         import Logger
+from src.plotparameters import PlotParameters
+from src.plotparser     import PlotParser
+from src.plotphase1     import Phase1, PlotPhase1
+from src.plotphase2     import Phase2, PlotPhase2
+from src.plotphase3     import Phase3, PlotPhase3
+from src.plotphase4     import PlotPhase4
+from src.plotsplitter   import MAX_LINE_BYTES
+from src.plottotals     import PlotTotals
+from src.plotutility    import phase_start_time
+
+def number (name:str) -> bytes:
+	'''Return a named group for a number, as SECONDS and GIB in plotparser.py.'''
+
+	return rb'(?P<%s>\d+(?:\.\d+)?)' % name.encode()
+
+
+# a line of a plot that PlotParser has a handler for, each alternative
+# matches what its handler accepts. Leading ASCII white space is skipped as
+# str.lstrip() does. The last group
+# of each alternative names the handler (see PlotScanner.NAMED_HANDLERS).
+# Like the patterns of plotparser.py, each alternative can only backtrack a
+# constant amount for each byte of a line.
+LINE = rb'''
+	[ \t\r\x0b\x0c\x1c-\x1f]*
+	(?:
+		into\ temporary\ dirs:\ (?P<into>[^\n]*)
+	|	ID:\ (?P<id>[^ \n]*)
+	|	Plot\ size\ is:\ (?P<plot>[^ \n]*)
+	|	Buffer\ size\ is:\ (?P<buffer>[^\n]*)
+	|	(?P<using>Using\ [^\n]*)
+	|	Starting\ phase\ (?P<starting_phase>[1-4])(?P<starting>[^\n]*)
+	|	Time\ for\ phase\ (?P<time_phase>[1-4]).{3}''' + number('time') + rb'''\ seconds
+	|	Computing\ table\ (?P<computing>\d)
+	|	(?:F1|Forward)\ (?:(?!time:\ )[^\n])*time:\ ''' + number('table_time') + rb'''\ seconds
+	|	Backpropagating\ on\ table\ (?P<backpropagating>\d)
+	|	scanned\ (?:(?!time\ =\ \ )[^\n])*time\ =\ \ ''' + number('scanned') + rb'''\ seconds
+	|	Compressing\ tables\ (?P<compressing_1>\d).{5}(?P<compressing>\d)
+	|	(?:First|Second)\ (?:(?!pass\ time:\ )[^\n])*pass\ time:\ ''' + number('pass') + rb'''\ seconds
+	|	Total\ compress\ table\ time:\ ''' + number('compress') + rb'''\ seconds
+	|	Total\ time\ =\ ''' + number('total') + rb'''\ seconds
+	|	Approximate\ working\ space\ used\ \(without\ final\ file\):\ ''' + number('approximate') + rb'''\ GiB
+	|	Final\ File\ size:\ ''' + number('final') + rb'''\ GiB
+	|	Copied\ final\ file\ from\ "(?P<copied_from>[^"\n]*)"\ to\ "(?P<copied>[^"\n]*)"
+	|	Copy\ time\ =\ ''' + number('copy_secs') + rb'''\ seconds(?P<copy>[^\n]*)
+	)'''
+
+# the first line of a plot, after "Starting plotting progress "
+FIRST_LINE = re.compile(LINE, re.VERBOSE)
+
+# the other lines, after a line ending. Starting with a literal lets the
+# regex engine skip to each line ending, which is several times faster than ^
+LINES = re.compile(rb'\n' + LINE, re.VERBOSE)
+
+
+def text (value:bytes) -> str:
+	'''Decode a captured field, without the carriage return of a Windows line ending.'''
+
+	return value.rstrip(b'\r').decode('utf-8', errors='replace')
+
+
+def long_line (data:mmap.mmap, start:int, end:int) -> bool:
+	'''Return True if a line in data[start:end] is longer than MAX_LINE_BYTES, start is the start of a line.'''
+
+	while start < end:
+		line_end = data.find(b'\n', start, end)
+		if line_end < 0:
+			line_end = end
+		if line_end - start > MAX_LINE_BYTES:
+			return True
+		start = line_end + 1
+	return False
+
+
+class PlotScanner (PlotParser):
+	'''
+	Extract a plot from a byte range of a memory-mapped log file, without
+	decoding the lines. One regex (LINES) finds the lines PlotParser has a
+	handler for and captures their values; only the values that are text
+	(directories, the plot ID, paths, and time stamps) are decoded, numbers
+	are converted from bytes. The result is the same as PlotParser.extract()
+	on the lines of the plot. A plot with a line longer than MAX_LINE_BYTES,
+	which split() returns in pieces, is left to PlotParser.
+	'''
+
+	def scan (self, data:mmap.mmap, start:int, end:int, parameters:PlotParameters, phase_1:PlotPhase1, phase_2:PlotPhase2, phase_3:PlotPhase3, phase_4:PlotPhase4, totals:PlotTotals) -> Optional[bool]:
+		'''
+		Extract a plot from data[start:end], which is the text after "Starting
+		plotting progress " up to "Renamed final file" (see
+		PlotSplitter.split_mmap()). Return True if the extract was good, False
+		if it was not, or None if a line is longer than MAX_LINE_BYTES and the
+		plot must be extracted from its lines instead (see mmap_lines()).
+		'''
+
+		self._parameters = parameters
+		self._phases = (None, phase_1, phase_2, phase_3, phase_4)
+		self._totals = totals
+
+		profiler = self._profiler if self._profiler and self._profiler.enabled else None
+		begin = time.perf_counter() if profiler else 0.0
+
+		# split() returns a line longer than MAX_LINE_BYTES in pieces, and
+		# PlotParser dispatches each piece as a line. The first line starts
+		# before "Starting plotting progress ".
+		line_start = data.rfind(b'\n', max(0, start - MAX_LINE_BYTES), start) + 1
+		if (line_start == 0 and start > MAX_LINE_BYTES) or (end - line_start > MAX_LINE_BYTES and long_line(data, line_start, end)):
+			return None
+
+		handlers = self.MATCH_HANDLERS
+		first = FIRST_LINE.match(data, start, end)
+		if first:
+			handlers[first.lastindex](self, first)
+		for match in LINES.finditer(data, start, end):
+			handlers[match.lastindex](self, match)
+
+		rejected = self._validate()
+		if profiler:
+			profiler.add_time('extract/PlotScanner', time.perf_counter() - begin)
+			if rejected:
+				profiler.count(f'plots rejected by {rejected}')
+		return rejected is None
+
+	# parameters at the top of the plot
+
+	def _scan_into (self, match:re.Match) -> None:
+		temp_dir_1, _, temp_dir_2 = text(match.group('into')).rpartition(' and ')
+		if temp_dir_1 and temp_dir_2:
+			self._parameters.temp_dir_1 = temp_dir_1
+			self._parameters.temp_dir_2 = temp_dir_2
+			self._have_dirs = True
+
+	def _scan_id (self, match:re.Match) -> None:
+		plot_id = text(match.group('id'))
+		if plot_id.isalnum() and not self._have_id:
+			self._parameters.plot_id = plot_id
+			self._have_id = True
+
+	def _scan_plot (self, match:re.Match) -> None:
+		size = match.group('plot').rstrip(b'\r')
+		if size.isdigit() and not self._have_size:
+			self._parameters.plot_size = int(size)
+			self._have_size = True
+
+	def _scan_buffer (self, match:re.Match) -> None:
+		size = match.group('buffer').rstrip(b'\r').split(b'MiB', 1)[0]
+		if size.isdigit() and not self._have_buffer:
+			self._parameters.buffer_size = int(size)
+			self._have_buffer = True
+
+	def _scan_using (self, match:re.Match) -> None:
+		self._using(text(match.group('using')))
+
+	# phases 1 to 4
+
+	def _scan_starting (self, match:re.Match) -> None:
+		phase = int(match.group('starting_phase'))
+
+		self._phase = phase
+		self._table = None
+		self._tables = []
+		if not self._have_begin[phase]:
+			self._have_begin[phase] = True
+			self._phases[phase].start_time = phase_start_time(self._logger, f'PlotPhase{phase}', self._index, text(match.group('starting')))
+
+	def _scan_time (self, match:re.Match) -> None:
+		phase = int(match.group('time_phase'))
+		if self._have_begin[phase]:
+			self._phases[phase].total_time = float(match.group('time'))
+			self._have_phase[phase] = True
+			self._logger.debug('PlotPhase%s index %s total seconds %s', phase, self._index, self._phases[phase].total_time)
+
+	def _scan_computing (self, match:re.Match) -> None:
+		if self._phase == 1:
+			self._table = int(match.group('computing'))
+
+	def _scan_table_time (self, match:re.Match) -> None:
+		if self._phase == 1 and self._table is not None:
+			table = self._table
+			value = float(match.group('table_time'))
+			self._phases[1].add_table_time(Phase1(table, value))
+			self._table = None
+			self._logger.debug('PlotPhase1 index %s table %s seconds %s', self._index, table, value)
+
+	def _scan_backpropagating (self, match:re.Match) -> None:
+		if self._phase == 2:
+			self._table = int(match.group('backpropagating'))
+
+	def _scan_scanned (self, match:re.Match) -> None:
+		if self._phase == 2 and self._table is not None:
+			table = self._table
+			value = float(match.group('scanned'))
+			self._phases[2].add_table_time(Phase2(table, value))
+			self._table = None
+			self._logger.debug('PlotPhase2 index %s table %s seconds %s', self._index, table, value)
+
+	def _scan_compressing (self, match:re.Match) -> None:
+		if self._phase == 3:
+			self._tables = [int(match.group('compressing_1')), int(match.group('compressing'))]
+			self._passes = []
+
+	def _scan_pass (self, match:re.Match) -> None:
+		if self._phase == 3 and self._tables and len(self._passes) < 2:
+			self._passes.append(float(match.group('pass')))
+
+	def _scan_compress (self, match:re.Match) -> None:
+		if self._phase != 3 or not self._tables or len(self._passes) != 2:
+			return
+
+		table_1, table_2 = self._tables
+		first_pass, second_pass = self._passes
+		value = float(match.group('compress'))
+		self._phases[3].add_table_time(Phase3(table_1, table_2, first_pass, second_pass, value))
+		self._tables = []
+		self._passes = []
+		self._logger.debug('PlotPhase3 index %s compress tables %s and %s first %s second %s seconds %s', self._index, table_1, table_2, first_pass, second_pass, value)
+
+	# totals at the end of the plot
+
+	def _scan_total (self, match:re.Match) -> None:
+		self._totals.total_time = float(match.group('total'))
+		self._have_totals[2] = True
+
+	def _scan_approximate (self, match:re.Match) -> None:
+		self._totals.working_gb = float(match.group('approximate'))
+		self._have_totals[0] = True
+
+	def _scan_final (self, match:re.Match) -> None:
+		self._totals.file_gb = float(match.group('final'))
+		self._have_totals[1] = True
+
+	def _scan_copied (self, match:re.Match) -> None:
+		self._totals.temp_path = match.group('copied_from').decode('utf-8', errors='replace')
+		self._totals.dest_path = match.group('copied').decode('utf-8', errors='replace')
+		self._have_totals[3] = True
+
+	def _scan_copy (self, match:re.Match) -> None:
+		totals = self._totals
+		totals.copy_secs = float(match.group('copy_secs'))
+		totals.end_time = phase_start_time(self._logger, 'PlotTotals', self._index, text(match.group('copy')))
+		self._have_totals[4] = True
+
+		if self._logger.is_enabled(Logger.DEBUG):
+			self._logger.debug('PlotTotals index %s working GB %s', self._index, totals.working_gb)
+			self._logger.debug('PlotTotals index %s file GB %s', self._index, totals.file_gb)
+			self._logger.debug('PlotTotals index %s total seconds %s', self._index, totals.total_time)
+			self._logger.debug('PlotTotals index %s copy seconds %s', self._index, totals.copy_secs)
+			self._logger.debug('PlotTotals index %s end time %s', self._index, totals.end_time)
+			self._logger.debug('PlotTotals index %s temp path %s', self._index, totals.temp_path)
+			self._logger.debug('PlotTotals index %s dest path %s', self._index, totals.dest_path)
+
+	# key is the name of the last group of each line in LINES, value is the handler
+	NAMED_HANDLERS:Dict[str, Callable[['PlotScanner', re.Match], None]] = {
+		'into':            _scan_into,
+		'id':              _scan_id,
+		'plot':            _scan_plot,
+		'buffer':          _scan_buffer,
+		'using':           _scan_using,
+		'starting':        _scan_starting,
+		'time':            _scan_time,
+		'computing':       _scan_computing,
+		'table_time':      _scan_table_time,
+		'backpropagating': _scan_backpropagating,
+		'scanned':         _scan_scanned,
+		'compressing':     _scan_compressing,
+		'pass':            _scan_pass,
+		'compress':        _scan_compress,
+		'total':           _scan_total,
+		'approximate':     _scan_approximate,
+		'final':           _scan_final,
+		'copied':          _scan_copied,
+		'copy':            _scan_copy,
+	}
+
+	# key is the group number of match.lastindex, value is the handler
+	MATCH_HANDLERS:Dict[int, Callable[['PlotScanner', re.Match], None]] = {LINES.groupindex[name]: handler for name, handler in NAMED_HANDLERS.items()}
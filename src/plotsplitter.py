@@ -0,0 +1,347 @@
+# system packages
+from typing import BinaryIO, Callable, Iterator, List, Optional, Tuple
+import mmap
+import time
+
+# called with the byte offset, the lines, and the reason of a plot that did not finish
+OnIncomplete = Callable[[int, List[str], str], None]
+
+
+class PlotSplitter:
+	'''
+	Split a log file into individual plots, one line at a time. A plot starts
+	with "Starting plotting progress" and ends with "Renamed final file". Only
+	the lines of the current plot are held in memory, so memory is bounded by
+	the size of one plot no matter how big the log file is.
+
+	Each plot is returned as a list of lines without line endings. The first
+	line is the text after "Starting plotting progress " and the last line is
+	the text before "Renamed final file" (usually empty).
+
+	The work for each byte is bounded, so any input is split in linear time: a
+	line longer than MAX_LINE_BYTES is split into several lines (see
+	read_lines()), and a plot longer than MAX_PLOT_BYTES is dropped. A plot
+	that is dropped, because it is too long or another plot started before it
+	finished, is passed to on_incomplete.
+	'''
+
+	PLOT_BEGIN = 'Starting plotting progress '
+	PLOT_END   = 'Renamed final file'
+
+	# a plot is a few hundred lines of less than 200 bytes
+	MAX_PLOT_BYTES = 16 * 1024 * 1024
+
+	def __init__ (self, offset:int = 0, on_incomplete:Optional[OnIncomplete] = None) -> None:
+		self._offset:int      = offset		# bytes consumed so far
+		self._plot_offset:int = offset		# byte offset after the last complete plot
+		self._plot_start:int  = offset		# byte offset of the line that started the current (or last) plot
+		self._text_start:int  = offset		# byte offset of the text after PLOT_BEGIN, see split_mmap()
+		self._plot_bytes:int  = 0			# bytes in the plot in progress
+		self._lines:List[str] = []			# lines of the plot in progress
+		self._in_plot:bool    = False		# a plot has started but not finished
+
+		self._on_incomplete = on_incomplete
+
+	@property
+	def offset (self) -> int:
+		'''Return the byte offset just after the last complete plot.'''
+
+		return self._plot_offset
+
+	@property
+	def position (self) -> int:
+		'''Return the byte offset after the last line fed.'''
+
+		return self._offset
+
+	@property
+	def plot_start (self) -> int:
+		'''Return the byte offset of the line that started the current plot, or the last plot returned.'''
+
+		return self._plot_start
+
+	@property
+	def text_start (self) -> int:
+		'''Return the byte offset of the text of the current plot, after "Starting plotting progress ", see split_mmap().'''
+
+		return self._text_start
+
+	@property
+	def in_plot (self) -> bool:
+		'''Return True if a plot has started but has not finished.'''
+
+		return self._in_plot
+
+	def unfinished (self) -> Optional[Tuple[int, List[str]]]:
+		'''Return the byte offset and lines of the plot in progress, or None.'''
+
+		if not self._in_plot:
+			return None
+		return self._plot_start, self._lines
+
+	def feed (self, line:bytes) -> Optional[List[str]]:
+		'''
+		Feed one line (including the line ending) from the log file. Return the
+		lines of a plot when the line finishes that plot, otherwise None.
+		'''
+
+		self._offset += len(line)
+		text = line.decode('utf-8', errors='replace').rstrip('\r\n')
+
+		if not self._in_plot:
+			begin = text.find(self.PLOT_BEGIN)
+			if begin < 0:
+				return None
+			self._start_plot(len(line))
+			text = text[begin + len(self.PLOT_BEGIN):]
+
+		# a new plot started before the previous one finished (the plotter
+		# crashed or was stopped), so drop the unfinished plot
+		elif self.PLOT_BEGIN in text:
+			self._drop('restarted')
+			self._start_plot(len(line))
+			text = text[text.find(self.PLOT_BEGIN) + len(self.PLOT_BEGIN):]
+
+		self._plot_bytes += len(line)
+
+		end = text.find(self.PLOT_END)
+		if end < 0:
+			self._lines.append(text)
+			if self._plot_bytes > self.MAX_PLOT_BYTES:
+				self._drop('too long')
+				self._in_plot = False
+			return None
+
+		self._lines.append(text[:end])
+		lines = self._lines
+
+		self._lines = []
+		self._in_plot = False
+		self._plot_offset = self._offset
+
+		return lines
+
+	def _start_plot (self, line_bytes:int) -> None:
+		'''Start a plot at the line that was just fed.'''
+
+		self._in_plot = True
+		self._lines = []
+		self._plot_start = self._offset - line_bytes
+		self._plot_bytes = 0
+
+	def _drop (self, reason:str) -> None:
+		'''Drop the plot in progress, passing it to on_incomplete.'''
+
+		if self._on_incomplete:
+			self._on_incomplete(self._plot_start, self._lines, reason)
+		self._lines = []
+
+	def split (self, f:BinaryIO, size:Optional[int] = None, deadline:Optional[float] = None) -> Iterator[List[str]]:
+		'''
+		Return each plot in a file opened in binary mode. If size is given, stop
+		after the line that reaches that many bytes from the current position.
+		If deadline (a time.perf_counter() value) is given, raise TimeoutError
+		once it has passed.
+		'''
+
+		count:int = 0
+		for line in read_lines(f, size):
+			lines = self.feed(line)
+			if lines is not None:
+				yield lines
+
+			count += 1
+			if deadline is not None and count % 4096 == 0 and time.perf_counter() > deadline:
+				raise TimeoutError(f'time budget exceeded at byte offset {self._offset}')
+
+	def scan (self, f:BinaryIO) -> Iterator[int]:
+		'''
+		Return the byte offset after each complete plot in a file opened in
+		binary mode, without decoding or keeping any lines. The plots are found
+		exactly as feed() finds them, so a PlotSplitter() started at one of these
+		offsets picks up where the previous plot ended.
+		'''
+
+		begin = self.PLOT_BEGIN.encode()
+		end   = self.PLOT_END.encode()
+
+		for line in read_lines(f):
+			self._offset += len(line)
+
+			position = line.find(begin)
+			if position >= 0:
+				self._in_plot = True
+				self._plot_bytes = 0
+				complete = line.find(end, position + len(begin)) >= 0
+			else:
+				complete = self._in_plot and end in line
+
+			self._plot_bytes += len(line)
+
+			if complete:
+				self._in_plot = False
+				self._plot_offset = self._offset
+				yield self._offset
+
+			elif self._plot_bytes > self.MAX_PLOT_BYTES:
+				self._in_plot = False
+
+	def scan_mmap (self, data:mmap.mmap) -> Iterator[int]:
+		'''
+		Return the byte offset after each complete plot like scan(), from the
+		offset of the splitter to the end of a memory-mapped file. Only the
+		lines with "Starting plotting progress" or "Renamed final file" are
+		looked at, found with mmap.find(), so a plot takes a few steps instead
+		of a few hundred lines.
+		'''
+
+		for _ in self.split_mmap(data):
+			yield self._plot_offset
+
+	def split_mmap (self, data:mmap.mmap, size:Optional[int] = None, deadline:Optional[float] = None) -> Iterator[Tuple[int, int]]:
+		'''
+		Return the byte range of each plot in a memory-mapped file, from the
+		offset of the splitter, without reading or decoding the lines: the
+		range is the text after "Starting plotting progress " up to "Renamed
+		final file". The plots are found exactly as split() finds them (see
+		scan_mmap()), and size and deadline are the same as for split(). A plot
+		that is dropped is passed to on_incomplete with its lines (see
+		mmap_lines()); the plot in progress at the end is left in progress (see
+		text_start).
+		'''
+
+		begin = self.PLOT_BEGIN.encode()
+		end   = self.PLOT_END.encode()
+		limit = len(data) if size is None else min(len(data), self._offset + size)
+
+		position:int = self._offset		# the start of the next line
+		count:int = 0
+
+		# the next of each marker, only searched for again once it is passed
+		next_begin = data.find(begin, position, limit)
+		next_end   = data.find(end, position, limit)
+
+		while True:
+			if 0 <= next_begin < position:
+				next_begin = data.find(begin, position, limit)
+			if 0 <= next_end < position:
+				next_end = data.find(end, position, limit)
+			if next_begin < 0 and next_end < 0:
+				break
+			marker = next_end if next_begin < 0 or 0 <= next_end < next_begin else next_begin
+
+			# the line with the marker, split into pieces as read_lines() does
+			piece_start, piece_end = _piece(data, position, marker, limit)
+
+			# the plot in progress was dropped by a line before this one
+			if self._in_plot and piece_start - self._plot_start > self.MAX_PLOT_BYTES:
+				self._drop_mmap(data, position, limit, 'too long')
+
+			found = data.find(begin, piece_start, piece_end)
+			if found >= 0:
+				if self._in_plot:
+					self._drop_mmap(data, piece_start, limit, 'restarted')
+				self._in_plot = True
+				self._plot_start = piece_start
+				self._text_start = found + len(begin)
+				text_end = data.find(end, self._text_start, piece_end)
+			else:
+				text_end = data.find(end, piece_start, piece_end) if self._in_plot else -1
+
+			position = piece_end
+			if text_end >= 0:
+				self._in_plot = False
+				self._plot_offset = piece_end
+				yield self._text_start, text_end
+
+			count += 1
+			if deadline is not None and count % 256 == 0 and time.perf_counter() > deadline:
+				self._offset = position
+				raise TimeoutError(f'time budget exceeded at byte offset {position}')
+
+		if self._in_plot and limit - self._plot_start > self.MAX_PLOT_BYTES:
+			self._drop_mmap(data, position, limit, 'too long')
+
+		self._offset = limit
+		self._plot_bytes = limit - self._plot_start if self._in_plot else 0
+
+	def _drop_mmap (self, data:mmap.mmap, position:int, limit:int, reason:str) -> None:
+		'''
+		Drop the plot in progress of split_mmap(), passing it to on_incomplete.
+		A restarted plot ends at position, the start of the line that restarted
+		it; a plot that is too long ends with the piece of a line that took it
+		past MAX_PLOT_BYTES.
+		'''
+
+		if reason == 'too long':
+			position = _piece(data, self._plot_start, self._plot_start + self.MAX_PLOT_BYTES, limit)[1]
+		if self._on_incomplete:
+			self._on_incomplete(self._plot_start, mmap_lines(data, self._text_start, position, self._plot_start), reason)
+		self._in_plot = False
+
+
+# lines are read at most this many bytes at a time, a longer line (such as
+# binary garbage without line endings) is returned in pieces
+MAX_LINE_BYTES = 64 * 1024
+
+
+def read_lines (f:BinaryIO, size:Optional[int] = None) -> Iterator[bytes]:
+	'''
+	Return each line of a file opened in binary mode, a line longer than
+	MAX_LINE_BYTES is returned in pieces. If size is given, stop after the
+	line that reaches that many bytes from the current position.
+	'''
+
+	readline = f.readline
+	while True:
+		line = readline(MAX_LINE_BYTES)
+		if not line:
+			return
+		yield line
+
+		if size is not None:
+			size -= len(line)
+			if size <= 0:
+				return
+
+
+def _piece (data:mmap.mmap, position:int, at:int, limit:int) -> Tuple[int, int]:
+	'''
+	Return the byte range of the piece of a line that read_lines() returns
+	for the byte at offset at, position is the start of a line before it.
+	'''
+
+	line_start = data.rfind(b'\n', position, at) + 1 or position
+	line_end = data.find(b'\n', at, limit) + 1 or limit
+	piece_start = line_start + (at - line_start) // MAX_LINE_BYTES * MAX_LINE_BYTES
+	return piece_start, min(piece_start + MAX_LINE_BYTES, line_end)
+
+
+def mmap_lines (data:mmap.mmap, start:int, end:int, piece_start:Optional[int] = None) -> List[str]:
+	'''
+	Return the lines in a byte range of a memory-mapped file as split()
+	returns them: without line endings, and a line longer than MAX_LINE_BYTES
+	in pieces. Piece_start is the start of the piece start is in, if start is
+	not the start of a line. Only used for the few plots that are not
+	scanned as bytes, such as incomplete plots.
+	'''
+
+	lines:List[str] = []
+	position = start if piece_start is None else piece_start
+	line_end = position
+	while position < end:
+		if line_end <= position:
+			line_end = data.find(b'\n', position, end) + 1 or end
+		piece_end = min(position + MAX_LINE_BYTES, line_end)
+		lines.append(data[max(position, start):piece_end].decode('utf-8', errors='replace').rstrip('\r\n'))
+		position = piece_end
+	return lines
+
+
+def flatten (lines:List[str]) -> str:
+	'''
+	Join the lines of a plot into one string, each line ending is replaced by
+	a space. This is the format the plot extractors search.
+	'''
+
+	return ' '.join(lines)
@@ -0,0 +1,211 @@
+# system packages
+from __future__ import annotations
+from math   import ceil, log, nan, sqrt
+from typing import Dict, Iterable, List
+
+
+class RunningStats:
+	'''
+	Count, mean, variance, minimum, and maximum of a stream of values in
+	constant memory (Welford's algorithm). Two RunningStats() merge into the
+	statistics of both streams (Chan et al.).
+	'''
+
+	__slots__ = ('count', 'mean', '_m2', 'min', 'max')
+
+	def __init__ (self) -> None:
+		self.count:int   = 0
+		self.mean:float  = 0.0
+		self._m2:float   = 0.0		# sum of squared differences from the mean
+		self.min:float   = nan
+		self.max:float   = nan
+
+	def add (self, value:float) -> None:
+		self.count += 1
+		delta = value - self.mean
+		self.mean += delta / self.count
+		self._m2 += delta * (value - self.mean)
+
+		if self.count == 1:
+			self.min = self.max = value
+		else:
+			self.min = min(self.min, value)
+			self.max = max(self.max, value)
+
+	def merge (self, other:RunningStats) -> None:
+		if not other.count:
+			return
+		if not self.count:
+			self.count, self.mean, self._m2, self.min, self.max = other.count, other.mean, other._m2, other.min, other.max
+			return
+
+		count = self.count + other.count
+		delta = other.mean - self.mean
+		self.mean += delta * other.count / count
+		self._m2 += other._m2 + delta * delta * self.count * other.count / count
+		self.count = count
+		self.min = min(self.min, other.min)
+		self.max = max(self.max, other.max)
+
+	def to_record (self) -> List[float]:
+		'''Return the statistics as a list of numbers, for a summary file (see from_record()).'''
+
+		return [self.count, self.mean, self._m2, self.min, self.max]
+
+	@classmethod
+	def from_record (cls, record:List[float]) -> RunningStats:
+		stats = cls()
+		stats.count, stats.mean, stats._m2, stats.min, stats.max = int(record[0]), *record[1:]
+		return stats
+
+	@property
+	def variance (self) -> float:
+		'''Return the sample variance, nan for fewer than two values.'''
+
+		return self._m2 / (self.count - 1) if self.count > 1 else nan
+
+	@property
+	def stdev (self) -> float:
+		'''Return the sample standard deviation, nan for fewer than two values.'''
+
+		return sqrt(self.variance) if self.count > 1 else nan
+
+
+class QuantileSketch:
+	'''
+	Quantiles of a stream of non-negative values in bounded memory, using
+	logarithmic buckets (DDSketch). Every quantile is within RELATIVE_ERROR of
+	a value at that rank, for example p90 of 10,000 seconds is within 100
+	seconds. Buckets only depend on the value, so merging two sketches gives
+	exactly the sketch of both streams. Plot times from 1 second to 1 million
+	seconds need at most about 700 buckets, however many plots there are.
+	'''
+
+	__slots__ = ('count', '_zero', '_buckets')
+
+	RELATIVE_ERROR = 0.01
+
+	# bucket i holds the values in (GAMMA ** (i - 1), GAMMA ** i]
+	GAMMA = (1 + RELATIVE_ERROR) / (1 - RELATIVE_ERROR)
+	_LOG_GAMMA = log(GAMMA)
+
+	# values at or below this are counted as zero
+	MIN_VALUE = 1e-9
+
+	def __init__ (self) -> None:
+		self.count:int = 0
+		self._zero:int = 0
+		self._buckets:Dict[int, int] = {}		# key is a bucket index, value is the count
+
+	def add (self, value:float) -> None:
+		self.count += 1
+		if value <= self.MIN_VALUE:
+			self._zero += 1
+			return
+
+		index = ceil(log(value) / self._LOG_GAMMA)
+		self._buckets[index] = self._buckets.get(index, 0) + 1
+
+	def merge (self, other:QuantileSketch) -> None:
+		self.count += other.count
+		self._zero += other._zero
+		for index, count in other._buckets.items():
+			self._buckets[index] = self._buckets.get(index, 0) + count
+
+	def to_record (self) -> List[object]:
+		'''Return the sketch as the count, the zero count, and the [index, count] of each bucket (see from_record()).'''
+
+		return [self.count, self._zero, [[index, self._buckets[index]] for index in sorted(self._buckets)]]
+
+	@classmethod
+	def from_record (cls, record:List[object]) -> QuantileSketch:
+		sketch = cls()
+		count, zero, buckets = record
+		sketch.count = int(count)		# type: ignore
+		sketch._zero = int(zero)		# type: ignore
+		sketch._buckets = {int(index): int(bucket_count) for index, bucket_count in buckets}		# type: ignore
+		return sketch
+
+	def quantile (self, q:float) -> float:
+		'''Return the value at quantile q (0 to 1), nan if the sketch is empty.'''
+
+		if not self.count:
+			return nan
+
+		rank = int(q * (self.count - 1) + 0.5)		# the nearest rank
+		seen = self._zero
+		if seen > rank:
+			return 0.0
+
+		for index in sorted(self._buckets):
+			seen += self._buckets[index]
+			if seen > rank:
+				# the value in the middle of the bucket, in relative terms
+				return 2 * self.GAMMA ** index / (self.GAMMA + 1)
+
+		return 2 * self.GAMMA ** max(self._buckets) / (self.GAMMA + 1)
+
+
+class PhaseStats:
+	'''
+	Streaming statistics for the times of one phase: count, mean, standard
+	deviation, minimum, maximum, and quantiles. Memory does not grow with the
+	number of values.
+	'''
+
+	__slots__ = ('_stats', '_sketch')
+
+	def __init__ (self, values:Iterable[float] = ()) -> None:
+		self._stats  = RunningStats()
+		self._sketch = QuantileSketch()
+
+		for value in values:
+			self.add(value)
+
+	def add (self, value:float) -> None:
+		self._stats.add(value)
+		self._sketch.add(value)
+
+	def merge (self, other:PhaseStats) -> None:
+		self._stats.merge(other._stats)
+		self._sketch.merge(other._sketch)
+
+	def to_record (self) -> List[object]:
+		'''Return the statistics as plain lists, which can be written to JSON (see from_record()).'''
+
+		return [self._stats.to_record(), self._sketch.to_record()]
+
+	@classmethod
+	def from_record (cls, record:List[object]) -> PhaseStats:
+		stats = cls()
+		stats._stats  = RunningStats.from_record(record[0])		# type: ignore
+		stats._sketch = QuantileSketch.from_record(record[1])	# type: ignore
+		return stats
+
+	@property
+	def count (self) -> int:
+		return self._stats.count
+
+	@property
+	def mean (self) -> float:
+		return self._stats.mean if self._stats.count else nan
+
+	@property
+	def stdev (self) -> float:
+		return self._stats.stdev
+
+	@property
+	def min (self) -> float:
+		return self._stats.min
+
+	@property
+	def max (self) -> float:
+		return self._stats.max
+
+	def quantile (self, q:float) -> float:
+		'''Return the value at quantile q (0 to 1), kept between the minimum and maximum.'''
+
+		value = self._sketch.quantile(q)
+		if not self._stats.count:
+			return value
+		return min(max(value, self._stats.min), self._stats.max)
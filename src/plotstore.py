@@ -0,0 +1,51 @@
+# system packages
+from typing import Dict, Iterator, List, Optional, Union
+
+# local packages
+from src.plot           import Plot
+from src.plotparameters import plot_key
+
+
+class PlotStore:
+	'''
+	Store plots in the order they were added, with a hash lookup by plot ID,
+	so a plot found again (in another log file, the cache, or a summary) is
+	skipped in constant time. Grouping for the analysis is done on the
+	columns of a PlotTable (see Analyze), so the store keeps no other index.
+	'''
+
+	def __init__ (self) -> None:
+		self._plots:List[Plot] = []				# plots in the order they were added
+		self._by_id:Dict[Union[bytes, str], Plot] = {}	# key is a plot id, see plot_key()
+
+	def __contains__ (self, plot_id:str) -> bool:
+		return plot_key(plot_id) in self._by_id
+
+	def __iter__ (self) -> Iterator[Plot]:
+		return iter(self._plots)
+
+	def __len__ (self) -> int:
+		return len(self._plots)
+
+	@property
+	def plots (self) -> List[Plot]:
+		'''Return the plots in the order they were added.'''
+
+		return self._plots
+
+	def add (self, plot:Plot) -> bool:
+		'''Add a plot unless its plot id is already stored. Return True if the plot was added.'''
+
+		key = plot.parameters.plot_key
+		if key in self._by_id:
+			return False
+
+		self._by_id[key] = plot
+		self._plots.append(plot)
+
+		return True
+
+	def get (self, plot_id:str) -> Optional[Plot]:
+		'''Return the plot with a plot id, or None.'''
+
+		return self._by_id.get(plot_key(plot_id))
@@ -0,0 +1,180 @@
+# system packages
+from array    import array
+from datetime import datetime
+from math     import log, nan
+from typing   import Any, Dict, List, Sequence, Tuple
+
+# third party packages
+try:
+	import numpy
+except ImportError:			# numpy is optional, group-bys fall back to pure Python
+	numpy = None			# type: ignore
+
+# local packages
+from src.plot      import Plot
+from src.plotstats import PhaseStats, QuantileSketch
+
+EPOCH = datetime(1970, 1, 1)
+
+
+class PlotTable:
+	'''
+	Store the plot values used for analysis in columns of typed arrays, one
+	row per plot. Group-bys return the PhaseStats() of each column for each
+	group, computed over whole columns with numpy when it is installed, or in
+	pure Python otherwise. A group-by can start at a row, so rows appended
+	since the last group-by are aggregated without the ones before them.
+	'''
+
+	# integer columns, "name" is a code for the plot configuration name
+	INT_COLUMNS = ('name', 'threads', 'buffer_size', 'buckets', 'plot_size')
+
+	# float columns, start and end are epoch seconds (nan if not known)
+	FLOAT_COLUMNS = ('phase_1', 'phase_2', 'phase_3', 'phase_4', 'total_time', 'copy_secs', 'start', 'end')
+
+	def __init__ (self) -> None:
+		self._columns:Dict[str, array] = {}
+		for column in self.INT_COLUMNS:
+			self._columns[column] = array('q')
+		for column in self.FLOAT_COLUMNS:
+			self._columns[column] = array('d')
+
+		# plot configuration names, the "name" column is an index into this list
+		self._names:List[str] = []
+		self._name_codes:Dict[str, int] = {}
+
+	def __len__ (self) -> int:
+		return len(self._columns['name'])
+
+	def append (self, plot:Plot) -> None:
+		'''Append a post-processed plot as a row.'''
+
+		p = plot.parameters
+		self.append_row(plot.name, {
+			'threads':     p.threads,
+			'buffer_size': p.buffer_size,
+			'buckets':     p.buckets,
+			'plot_size':   p.plot_size,
+			'phase_1':     plot.phase_1.total_time,
+			'phase_2':     plot.phase_2.total_time,
+			'phase_3':     plot.phase_3.total_time,
+			'phase_4':     plot.phase_4.total_time,
+			'total_time':  plot.totals.total_time,
+			'copy_secs':   plot.totals.copy_secs,
+			'start':       (plot.start_time - EPOCH).total_seconds() if plot.start_time else nan,
+			'end':         (plot.end_time - EPOCH).total_seconds() if plot.end_time else nan,
+		})
+
+	def append_row (self, name:str, values:Dict[str, Any]) -> None:
+		'''Append a row. A column that is not in values is 0, or nan for a float column.'''
+
+		if name not in self._name_codes:
+			self._name_codes[name] = len(self._names)
+			self._names.append(name)
+
+		self._columns['name'].append(self._name_codes[name])
+		for column in self.INT_COLUMNS[1:]:
+			self._columns[column].append(values.get(column, 0))
+		for column in self.FLOAT_COLUMNS:
+			self._columns[column].append(values.get(column, nan))
+
+	def column (self, column:str) -> Any:
+		'''
+		Return a column as a numpy array (without copying) or as an array. A
+		numpy array shares memory with the column, so release it before
+		appending more rows.
+		'''
+
+		if numpy is not None:
+			return numpy.frombuffer(self._columns[column], dtype=self._columns[column].typecode)
+		return self._columns[column]
+
+	def group_by (self, keys:Sequence[str], columns:Sequence[str], start:int = 0) -> Dict[Tuple[Any, ...], Dict[str, PhaseStats]]:
+		'''
+		Group the rows from start by integer key columns and return the
+		PhaseStats() of each column for each group. The key of the result is a
+		tuple of the key values, in sorted order; a "name" key is returned as
+		the name (names sort in the order they were first appended). Rows with
+		nan are skipped for that column.
+		'''
+
+		if start >= len(self):
+			return {}
+
+		if numpy is not None:
+			groups = self._group_by_numpy(keys, columns, start)
+		else:
+			groups = self._group_by_python(keys, columns, start)
+
+		# return names instead of name codes
+		if 'name' in keys:
+			position = list(keys).index('name')
+			groups = {key[:position] + (self._names[key[position]],) + key[position + 1:]: value for key, value in groups.items()}
+
+		return groups
+
+	def _group_by_numpy (self, keys:Sequence[str], columns:Sequence[str], start:int) -> Dict[Tuple[Any, ...], Dict[str, PhaseStats]]:
+		# combine the key columns into one integer code per row
+		key_columns = [self.column(key)[start:].astype(numpy.int64) for key in keys]
+		code = numpy.zeros(len(self) - start, dtype=numpy.int64)
+		for key_column in key_columns:
+			low = key_column.min()
+			code = code * (int(key_column.max() - low) + 1) + (key_column - low)
+
+		codes, first, inverse = numpy.unique(code, return_index=True, return_inverse=True)
+		group_keys = [tuple(int(key_column[row]) for key_column in key_columns) for row in first]
+
+		# row numbers ordered by group, each group is a slice of this order
+		order = numpy.argsort(inverse, kind='stable')
+		counts = numpy.bincount(inverse, minlength=len(codes))
+		starts = numpy.cumsum(counts) - counts
+
+		groups:Dict[Tuple[Any, ...], Dict[str, PhaseStats]] = {key: {} for key in group_keys}
+		for column in columns:
+			values = self.column(column)[start:][order]
+			has_nan = bool(numpy.isnan(values).any())
+
+			for index, key in enumerate(group_keys):
+				group = values[starts[index]:starts[index] + counts[index]]
+				if has_nan:
+					group = group[~numpy.isnan(group)]
+				groups[key][column] = phase_stats(group)
+
+		return groups
+
+	def _group_by_python (self, keys:Sequence[str], columns:Sequence[str], start:int) -> Dict[Tuple[Any, ...], Dict[str, PhaseStats]]:
+		key_columns = [self._columns[key][start:] for key in keys]
+
+		rows:Dict[Tuple[Any, ...], List[int]] = {}
+		for row, key in enumerate(zip(*key_columns), start):
+			if key not in rows:
+				rows[key] = []
+			rows[key].append(row)
+
+		groups:Dict[Tuple[Any, ...], Dict[str, PhaseStats]] = {}
+		for key in sorted(rows):
+			groups[key] = {}
+			for column in columns:
+				values = self._columns[column]
+				groups[key][column] = PhaseStats(values[row] for row in rows[key] if values[row] == values[row])
+
+		return groups
+
+
+def phase_stats (values:Any) -> PhaseStats:
+	'''
+	Return the PhaseStats() of a numpy array without nan, the same as adding
+	each value (see PhaseStats.add()) but computed over the whole array.
+	'''
+
+	if not values.size:
+		return PhaseStats()
+
+	mean = float(values.mean())
+	running = [int(values.size), mean, float(((values - mean) ** 2).sum()), float(values.min()), float(values.max())]
+
+	zero = values <= QuantileSketch.MIN_VALUE
+	indexes, counts = numpy.unique(numpy.ceil(numpy.log(values[~zero]) / log(QuantileSketch.GAMMA)), return_counts=True)
+	sketch = [int(values.size), int(zero.sum()), [[int(index), int(count)] for index, count in zip(indexes, counts)]]
+
+	return PhaseStats.from_record([running, sketch])
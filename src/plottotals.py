@@ -1,8 +1,9 @@
 # system packages
 from datetime import datetime
 from pathlib  import Path
-from typing   import Optional
+from typing   import Optional, Tuple
 import re
+import sys
 
 # local packages
 from src.logger      import Logger
@@ -11,9 +12,13 @@ from src.plotutility import phase_start_time
 
 class PlotTotals:
 	'''
-	Process plot totals at the end of the file.
+	Process plot totals at the end of the file. The temp and dest paths are
+	stored as an interned directory and a file name, which the two paths
+	share when it is the same.
 	'''
 
+	__slots__ = ('_logger', '_index', 'working_gb', 'file_gb', 'total_time', '_temp_dir', '_temp_name', '_dest_dir', '_dest_name', 'copy_secs', 'end_time')
+
 	def __init__ (self, logger:Logger, index:int) -> None:
 		self._logger = logger
 		self._index  = index
@@ -22,15 +27,43 @@ class PlotTotals:
 		self.working_gb:float = 0.0		# Approximate working space used (without final file): 269.308 GiB
 		self.file_gb:float    = 0.0		# Final File size: 101.336 GiB
 		self.total_time:float = 0.0		# Total time = 13508.459 seconds. CPU (133.870%) Sun Apr 25 20:44:18 2021
-		self.temp_path:str    = ''		# Copied final file from "/temp2/name.plot.2.tmp" to "/dest/name.plot.2.tmp"
-		self.dest_path:str    = ''		# Copied final file from "/temp2/name.plot.2.tmp" to "/dest/name.plot.2.tmp"
+		self._temp_dir:str    = ''		# Copied final file from "/temp2/name.plot.2.tmp" to "/dest/name.plot.2.tmp"
+		self._temp_name:str   = ''
+		self._dest_dir:str    = ''		# Copied final file from "/temp2/name.plot.2.tmp" to "/dest/name.plot.2.tmp"
+		self._dest_name:str   = ''
 		self.copy_secs:float  = 0.0		# Copy time = 371.657 seconds. CPU (21.260%) Sun Apr 25 20:50:30 2021
 		self.end_time:Optional[datetime] = None
 
+	@property
+	def temp_path (self) -> str:
+		return self._temp_dir + self._temp_name
+
+	@temp_path.setter
+	def temp_path (self, value:str) -> None:
+		self._temp_dir, self._temp_name = split_path(value)
+		if self._temp_name == self._dest_name:
+			self._temp_name = self._dest_name
+
+	@property
+	def dest_path (self) -> str:
+		return self._dest_dir + self._dest_name
+
+	@dest_path.setter
+	def dest_path (self, value:str) -> None:
+		self._dest_dir, self._dest_name = split_path(value)
+		if self._dest_name == self._temp_name:
+			self._dest_name = self._temp_name
+
 	@property
 	def dest_dir (self) -> Path:
 		return Path(self.dest_path).parent
 
+	@property
+	def dest_dir_str (self) -> str:
+		'''Return the dest directory as stored (interned, with a trailing slash), cheaper than dest_dir.'''
+
+		return self._dest_dir
+
 	def extract (self, data:str) -> bool:
 		'''
 		Extract the totals at the end of the file (working space, final file
@@ -59,13 +92,13 @@ class PlotTotals:
 
 		results = re.search(pattern, data)
 		if not results:
-			self._logger.error(f'{log_prefix} index {self._index} failed to extract outer data')
+			self._logger.error('%s index %s failed to extract outer data', log_prefix, self._index)
 			return False
 
 		have:int = len(results.groups())
 		need:int = 10
 		if have != need:
-			self._logger.error(f'{log_prefix} index {self._index} failed to match data, need {need} groups, have {have} groups')
+			self._logger.error('%s index %s failed to match data, need %s groups, have %s groups', log_prefix, self._index, need, have)
 			return False
 
 		self.working_gb = float(results.group(1))
@@ -76,12 +109,23 @@ class PlotTotals:
 		self.copy_secs  = float(results.group(9))
 		self.end_time   = phase_start_time(self._logger, log_prefix, self._index, results.group(10))
 
-		self._logger.debug(f'{log_prefix} index {self._index} working GB {self.working_gb}')
-		self._logger.debug(f'{log_prefix} index {self._index} file GB {self.file_gb}')
-		self._logger.debug(f'{log_prefix} index {self._index} total seconds {self.total_time}')
-		self._logger.debug(f'{log_prefix} index {self._index} copy seconds {self.copy_secs}')
-		self._logger.debug(f'{log_prefix} index {self._index} end time {self.end_time}')
-		self._logger.debug(f'{log_prefix} index {self._index} temp path {self.temp_path}')
-		self._logger.debug(f'{log_prefix} index {self._index} dest path {self.dest_path}')
+		if self._logger.is_enabled(Logger.DEBUG):
+			self._logger.debug('%s index %s working GB %s', log_prefix, self._index, self.working_gb)
+			self._logger.debug('%s index %s file GB %s', log_prefix, self._index, self.file_gb)
+			self._logger.debug('%s index %s total seconds %s', log_prefix, self._index, self.total_time)
+			self._logger.debug('%s index %s copy seconds %s', log_prefix, self._index, self.copy_secs)
+			self._logger.debug('%s index %s end time %s', log_prefix, self._index, self.end_time)
+			self._logger.debug('%s index %s temp path %s', log_prefix, self._index, self.temp_path)
+			self._logger.debug('%s index %s dest path %s', log_prefix, self._index, self.dest_path)
 
 		return True
+
+
+def split_path (path:str) -> Tuple[str, str]:
+	'''
+	Split a path after the last "/" into a directory, which is interned
+	because it is shared by many plots, and a file name.
+	'''
+
+	position = path.rfind('/') + 1
+	return sys.intern(path[:position]), path[position:]
@@ -1,43 +1,97 @@
 # system packages
-from datetime import datetime
-from typing   import Optional
+from datetime  import date, datetime
+from functools import lru_cache
+from typing    import Optional
 import re
 
 # local packages
 from src.logger import Logger
 
+# month numbers by name, for time stamps
+MONTHS = {name: number for number, name in enumerate(('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'), 1)}
+
+# dates look like:
+#   Sun Apr 25 16:59:09 2021
+#   Sat May  1 03:10:43 2021
+#   1   2  3 4 5  6  7  8 <- group
+TIME_STAMP = re.compile(r'... (\w{3}) (\w{3})(\s{1,2})(\d+) (\d+):(\d+):(\d+) (\d+)')
+
+# the time stamp is only searched for in the start of the data
+TIME_STAMP_SEARCH = 250
+
+# days from 0001-01-01 to 1970-01-01, for epoch seconds
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
 
 def phase_start_time (logger:Logger, log_prefix:str, index:int, data:str) -> Optional[datetime]:
 	'''Get the start time for a given phase and return a time stamp'''
 
-	# dates look like:
-	#   Sun Apr 25 16:59:09 2021
-	#   Sat May  1 03:10:43 2021
-	#   1   2  3 4 5  6  7  8 <- group
-	expression = r'... (\w{3}) (\w{3})(\s{1,2})(\d+) (\d+):(\d+):(\d+) (\d+)'
+	dt = time_stamp(data)
+	if not dt:
+		logger.error('%s index %s failed to extract date', log_prefix, index)
+		return None
+
+	logger.debug('%s index %s start time %s', log_prefix, index, dt)
 
-	res = re.search(expression, data[:250])
+	return dt
+
+
+def time_stamp (data:str) -> Optional[datetime]:
+	'''
+	Return the first chiapos time stamp in data, such as "Sun Apr 25 16:59:09
+	2021", or None if there is no valid time stamp. A line that ends with a time
+	stamp, which is how chiapos writes them, is parsed by slicing the fixed
+	width stamp; other data is searched with a regex.
+	'''
+
+	# the colons of the time stamp must be the only ones not followed by a
+	# space, otherwise there may be another time stamp before it
+	if 28 <= len(data) <= TIME_STAMP_SEARCH and data[-25] == ' ' and data.count(':') - data.count(': ') == 2:
+		dt = _fixed_time_stamp(data[-24:])
+		if dt:
+			return dt
+
+	res = TIME_STAMP.search(data, 0, TIME_STAMP_SEARCH)
 	if not res:
-		logger.error(f'{log_prefix} index {index} failed to extract date')
 		return None
 
-	have:int = len(res.groups())
-	need:int = 8
-	if have != need:
-		logger.error(f'{log_prefix} index {index} failed to match date, need {need} groups, have {have} groups')
+	month = MONTHS.get(res.group(2).title())
+	if not month:
 		return None
 
-	month  = res.group(2)
-	day    = res.group(4)
-	hour   = res.group(5)
-	minute = res.group(6)
-	second = res.group(7)
-	year   = res.group(8)
+	try:
+		return datetime(int(res.group(8)), month, int(res.group(4)), int(res.group(5)), int(res.group(6)), int(res.group(7)))
+	except ValueError:
+		return None
 
-	date_string:str = f'{year}-{month}-{day} {hour}:{minute}:{second}'
-	date_format:str = '%Y-%b-%d %H:%M:%S'
-	dt = datetime.strptime(date_string, date_format)
 
-	logger.debug(f'{log_prefix} index {index} start time {dt}')
+def time_stamp_seconds (data:str) -> Optional[int]:
+	'''Return the time stamp in data (see time_stamp()) as seconds since the epoch, or None.'''
 
-	return dt
+	dt = time_stamp(data)
+	if not dt:
+		return None
+
+	return (dt.toordinal() - EPOCH_ORDINAL) * 86400 + dt.hour * 3600 + dt.minute * 60 + dt.second
+
+
+@lru_cache(maxsize=4096)
+def _fixed_time_stamp (stamp:str) -> Optional[datetime]:
+	'''
+	Parse a 24 character time stamp, "Sun Apr 25 16:59:09 2021" or "Sat May  1
+	03:10:43 2021". Consecutive phases start and end at the same times, so the
+	results are cached.
+	'''
+
+	if stamp[3] != ' ' or stamp[7] != ' ' or stamp[10] != ' ' or stamp[13] != ':' or stamp[16] != ':' or stamp[19] != ' ':
+		return None
+
+	month = MONTHS.get(stamp[4:7])
+	day = stamp[8:10].lstrip(' ')
+	if not month or not (day + stamp[11:13] + stamp[14:16] + stamp[17:19] + stamp[20:24]).isdigit():
+		return None
+
+	try:
+		return datetime(int(stamp[20:24]), month, int(day), int(stamp[11:13]), int(stamp[14:16]), int(stamp[17:19]))
+	except ValueError:
+		return None
@@ -0,0 +1,379 @@
+# system packages
+from __future__ import annotations
+from datetime import datetime
+from pathlib  import Path
+from typing   import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+import os
+import sqlite3
+
+# local packages
+from src.logger    import Logger
+from src.plot      import Plot
+from src.plotstats import QuantileSketch, RunningStats
+from src.report    import ReportWriter
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS files (
+	id        INTEGER PRIMARY KEY,
+	path      TEXT NOT NULL UNIQUE,
+	size      INTEGER,
+	mtime_ns  INTEGER,
+	updated   TEXT
+);
+
+CREATE TABLE IF NOT EXISTS plots (
+	id          INTEGER PRIMARY KEY,
+	plot_id     TEXT NOT NULL UNIQUE,
+	file_id     INTEGER REFERENCES files (id),
+	log_index   INTEGER,
+	name        TEXT,
+	plot_size   INTEGER,
+	threads     INTEGER,
+	buffer_size INTEGER,
+	buckets     INTEGER,
+	stripe_size INTEGER,
+	temp_dir_1  TEXT,
+	temp_dir_2  TEXT,
+	dest_dir    TEXT,
+	start_time  TEXT,
+	end_time    TEXT,
+	phase_1     REAL,
+	phase_2     REAL,
+	phase_3     REAL,
+	phase_4     REAL,
+	total_time  REAL,
+	copy_time   REAL,
+	working_gb  REAL,
+	file_gb     REAL
+);
+
+CREATE INDEX IF NOT EXISTS plots_end_time ON plots (end_time);
+CREATE INDEX IF NOT EXISTS plots_name     ON plots (name, threads);
+CREATE INDEX IF NOT EXISTS plots_threads  ON plots (threads);
+
+CREATE TABLE IF NOT EXISTS phase_tables (
+	plot        INTEGER NOT NULL REFERENCES plots (id),
+	phase       INTEGER NOT NULL,
+	table_1     INTEGER NOT NULL,
+	table_2     INTEGER,
+	first_pass  REAL,
+	second_pass REAL,
+	seconds     REAL,
+	PRIMARY KEY (plot, phase, table_1)
+) WITHOUT ROWID;
+'''
+
+# columns of the plots table, in the order they are inserted
+PLOT_COLUMNS = (
+	'id', 'plot_id', 'file_id', 'log_index', 'name', 'plot_size', 'threads', 'buffer_size', 'buckets', 'stripe_size',
+	'temp_dir_1', 'temp_dir_2', 'dest_dir', 'start_time', 'end_time',
+	'phase_1', 'phase_2', 'phase_3', 'phase_4', 'total_time', 'copy_time', 'working_gb', 'file_gb',
+)
+
+# phase columns of the summaries, phase 5 is the total time
+PHASE_COLUMNS = ('phase_1', 'phase_2', 'phase_3', 'phase_4', 'total_time')
+
+# quantiles of the summaries
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class QueryFilter (NamedTuple):
+	'''The plots a query includes, an empty value includes every plot.'''
+
+	name:str = ''		# plot configuration name
+	threads:int = 0		# thread count
+	since:str = ''		# end time on or after, yyyy-mm-dd [hh:mm:ss]
+	until:str = ''		# end time before, yyyy-mm-dd [hh:mm:ss]
+
+	def where (self) -> Tuple[str, List[Any]]:
+		'''Return the SQL WHERE clause (or '') and its parameters.'''
+
+		terms:List[str] = []
+		params:List[Any] = []
+
+		if self.name:
+			terms.append('name = ?')
+			params.append(self.name)
+		if self.threads:
+			terms.append('threads = ?')
+			params.append(self.threads)
+		if self.since:
+			terms.append('end_time >= ?')
+			params.append(self.since)
+		if self.until:
+			terms.append('end_time < ?')
+			params.append(self.until)
+
+		return (' WHERE ' + ' AND '.join(terms) if terms else ''), params
+
+
+class PlotWarehouse:
+	'''
+	A SQLite database of plots, their phase table times, and the log files
+	they came from, so history can be queried without reading the logs
+	again. Plots are inserted once (by plot ID) in batches, each batch in one
+	transaction. Summaries are SQL aggregates over the plots that match a
+	QueryFilter, grouped by plot configuration and thread count; quantiles
+	use the same sketch as the text report (see QuantileSketch).
+	'''
+
+	VERSION = 1
+
+	# number of plots inserted in one transaction
+	BATCH = 500
+
+	def __init__ (self, path:Path, logger:Logger) -> None:
+		self._path   = path
+		self._logger = logger
+		self._db:Optional[sqlite3.Connection] = None
+
+	def __enter__ (self) -> PlotWarehouse:
+		self.open()
+		return self
+
+	def __exit__ (self, *args:Any) -> None:
+		self.close()
+
+	def open (self) -> None:
+		'''Open the database, creating the tables and indexes if needed.'''
+
+		db = sqlite3.connect(str(self._path))
+		db.execute('PRAGMA journal_mode = WAL')
+		db.execute('PRAGMA synchronous = NORMAL')
+
+		version = db.execute('PRAGMA user_version').fetchone()[0]
+		if version not in (0, self.VERSION):
+			db.close()
+			raise ValueError(f'warehouse {self._path} is version {version}, expected {self.VERSION}')
+
+		with db:
+			db.executescript(SCHEMA)
+			db.execute(f'PRAGMA user_version = {self.VERSION}')
+
+		db.create_aggregate('stdev', 1, _Stdev)
+		db.create_aggregate('quantile', 2, _Quantile)
+		self._db = db
+
+	def close (self) -> None:
+		if self._db:
+			self._db.close()
+			self._db = None
+
+	def save (self, plots:Iterable[Plot]) -> int:
+		'''Insert the plots that are not in the warehouse yet. Return the number inserted.'''
+
+		log_prefix = 'PlotWarehouse'
+		inserted:int = 0
+
+		file_ids:Dict[str, int] = {}
+		batch:List[Plot] = []
+		for plot in plots:
+			batch.append(plot)
+			if len(batch) >= self.BATCH:
+				inserted += self._insert(batch, file_ids)
+				batch = []
+		if batch:
+			inserted += self._insert(batch, file_ids)
+
+		self._logger.info('%s inserted %s plots into %s', log_prefix, inserted, self._path)
+		return inserted
+
+	def _insert (self, batch:List[Plot], file_ids:Dict[str, int]) -> int:
+		'''Insert a batch of plots in one transaction, skipping plots already stored.'''
+
+		assert self._db
+		db = self._db
+
+		with db:
+			ids = [plot.parameters.plot_id for plot in batch]
+			existing = {row[0] for row in db.execute(f'SELECT plot_id FROM plots WHERE plot_id IN ({",".join("?" * len(ids))})', ids)}
+
+			# the rows of a batch are numbered here, so the phase table rows can refer to them
+			plot_rows:List[Tuple[Any, ...]] = []
+			table_rows:List[Tuple[Any, ...]] = []
+			row_id = db.execute('SELECT COALESCE(MAX(id), 0) FROM plots').fetchone()[0]
+			for plot in batch:
+				plot_id = plot.parameters.plot_id
+				if plot_id in existing:
+					continue
+				existing.add(plot_id)		# a plot ID repeated within the batch
+
+				log_file = str(plot.log_file)
+				file_id = file_ids.get(log_file)
+				if file_id is None:
+					file_id = file_ids[log_file] = self._file_id(log_file)
+
+				row_id += 1
+				plot_rows.append(plot_row(plot, row_id, file_id))
+				table_rows.extend(table_time_rows(plot, row_id))
+
+			db.executemany(f'INSERT INTO plots VALUES ({",".join("?" * len(PLOT_COLUMNS))})', plot_rows)
+			db.executemany('INSERT OR IGNORE INTO phase_tables VALUES (?, ?, ?, ?, ?, ?, ?)', table_rows)
+
+		return len(plot_rows)
+
+	def _file_id (self, log_file:str) -> int:
+		'''Return the id of a log file in the files table, adding or updating it.'''
+
+		assert self._db
+
+		try:
+			stat = os.stat(log_file)
+			size, mtime_ns = stat.st_size, stat.st_mtime_ns
+		except OSError:		# stdin, or the file was removed
+			size, mtime_ns = None, None
+
+		updated = datetime.now().isoformat(sep=' ', timespec='seconds')
+		self._db.execute('INSERT OR IGNORE INTO files (path) VALUES (?)', (log_file,))
+		self._db.execute('UPDATE files SET size = ?, mtime_ns = ?, updated = ? WHERE path = ?', (size, mtime_ns, updated, log_file))
+		return self._db.execute('SELECT id FROM files WHERE path = ?', (log_file,)).fetchone()[0]
+
+	def summary (self, query_filter:QueryFilter, quantiles:Tuple[float, ...] = QUANTILES) -> Iterator[Tuple[Any, ...]]:
+		'''
+		Return a row for each plot configuration, thread count, and phase:
+		(name, threads, plots, phase, mean, stdev, min, quantiles..., max).
+		'''
+
+		assert self._db
+
+		columns:List[str] = []
+		for column in PHASE_COLUMNS:
+			columns += [f'AVG({column})', f'stdev({column})', f'MIN({column})']
+			columns += [f'quantile({column}, {q})' for q in quantiles]
+			columns += [f'MAX({column})']
+
+		where, params = query_filter.where()
+		sql = f'SELECT name, threads, COUNT(*), {", ".join(columns)} FROM plots{where} GROUP BY name, threads ORDER BY name, threads'
+
+		width = 4 + len(quantiles)		# values for each phase
+		for row in self._db.execute(sql, params):
+			name, threads, count = row[:3]
+			for index, column in enumerate(PHASE_COLUMNS):
+				values = row[3 + index * width:3 + (index + 1) * width]
+				yield (name, threads, count, 'total' if column == 'total_time' else column, *values)
+
+	def dates (self, query_filter:QueryFilter, length:int = 10) -> Iterator[Tuple[str, int]]:
+		'''Return (date, plots) for each day (length 10, yyyy-mm-dd) or month (length 7, yyyy-mm).'''
+
+		assert self._db
+
+		where, params = query_filter.where()
+		where = f'{where} AND end_time IS NOT NULL' if where else ' WHERE end_time IS NOT NULL'
+		sql = f'SELECT substr(end_time, 1, {length}) AS date, COUNT(*) FROM plots{where} GROUP BY date ORDER BY date'
+
+		yield from self._db.execute(sql, params)
+
+	def print (self, query_filter:QueryFilter) -> None:
+		'''Print the summaries like the text report, grouped by plot configuration.'''
+
+		name:Optional[str] = None
+		for row in self.summary(query_filter):
+			if row[0] != name:
+				if name is not None:
+					print()
+				name = row[0]
+				print(f'Disk - {name}')
+				print(f'  threads plots phase     mean   stdev     min     p50     p90     p99     max')
+
+			_, threads, count, phase, *values = row
+			label = 'tot' if phase == 'total' else f'p{phase[-1]}'
+			lead = f'{threads:9} {count:5}' if phase == 'phase_1' else ' ' * 15
+			print(f'{lead} {label:5} {number(values[0]):>8} {" ".join(number(value) for value in values[1:])}')
+
+		for length, title in ((7, 'month'), (10, 'day')):
+			print()
+			total:int = 0
+			for date, count in self.dates(query_filter, length):
+				print(f'{date:10} - {count:4}')
+				total += count
+			print(f'Total      - {total:4}')
+
+	def write (self, writer:ReportWriter, query_filter:QueryFilter) -> None:
+		'''Write the summaries (--output csv, json, or markdown), see Analyze.write().'''
+
+		writer.table('summary', ('name', 'threads', 'plots', 'phase', 'mean', 'stdev', 'min', 'p50', 'p90', 'p99', 'max'))
+		for row in self.summary(query_filter):
+			writer.row(row)
+
+		for length, title in ((7, 'month'), (10, 'day')):
+			writer.table(title, (title, 'plots'))
+			for row in self.dates(query_filter, length):
+				writer.row(row)
+
+
+class _Stdev:
+	'''SQLite aggregate, the sample standard deviation (Welford).'''
+
+	def __init__ (self) -> None:
+		self._stats = RunningStats()
+
+	def step (self, value:Optional[float]) -> None:
+		if value is not None:
+			self._stats.add(value)
+
+	def finalize (self) -> Optional[float]:
+		stdev = self._stats.stdev
+		return stdev if stdev == stdev else None
+
+
+class _Quantile:
+	'''SQLite aggregate, a quantile from a QuantileSketch().'''
+
+	def __init__ (self) -> None:
+		self._sketch = QuantileSketch()
+		self._q:float = 0.5
+		self._min:Optional[float] = None
+		self._max:Optional[float] = None
+
+	def step (self, value:Optional[float], q:float) -> None:
+		self._q = q
+		if value is not None:
+			self._sketch.add(value)
+			self._min = value if self._min is None else min(self._min, value)
+			self._max = value if self._max is None else max(self._max, value)
+
+	def finalize (self) -> Optional[float]:
+		if self._min is None or self._max is None:
+			return None
+		return min(max(self._sketch.quantile(self._q), self._min), self._max)
+
+
+def plot_row (plot:Plot, row_id:int, file_id:int) -> Tuple[Any, ...]:
+	'''Return the values of a plot for the plots table, see PLOT_COLUMNS.'''
+
+	p = plot.parameters
+	t = plot.totals
+
+	dest_dir = t.dest_dir_str
+	if len(dest_dir) > 1:
+		dest_dir = dest_dir[:-1]
+
+	return (
+		row_id, p.plot_id, file_id, plot.index, plot.name, p.plot_size, p.threads, p.buffer_size, p.buckets, p.stripe_size,
+		p.temp_dir_1, p.temp_dir_2, dest_dir, sql_time(plot.phase_1.start_time), sql_time(t.end_time),
+		plot.phase_1.total_time, plot.phase_2.total_time, plot.phase_3.total_time, plot.phase_4.total_time,
+		t.total_time, t.copy_secs, t.working_gb, t.file_gb,
+	)
+
+
+def table_time_rows (plot:Plot, row_id:int) -> Iterator[Tuple[Any, ...]]:
+	'''Return the rows of the phase_tables table for a plot.'''
+
+	for ph in plot.phase_1.table_time:
+		yield (row_id, 1, ph.table, None, None, None, ph.seconds)
+	for ph in plot.phase_2.table_time:
+		yield (row_id, 2, ph.table, None, None, None, ph.seconds)
+	for ph3 in plot.phase_3.table_time:
+		yield (row_id, 3, ph3.table1, ph3.table2, ph3.first_pass, ph3.second_pass, ph3.seconds)
+
+
+def number (value:Optional[float]) -> str:
+	'''Return a 7 character number, or "-" if it is not known (NULL).'''
+
+	return f'{value:7,.0f}' if value is not None else f'{"-":>7}'
+
+
+def sql_time (value:Optional[datetime]) -> Optional[str]:
+	'''Return a time as "yyyy-mm-dd hh:mm:ss", which sorts and works with the SQLite date functions.'''
+
+	return value.isoformat(sep=' ') if value else None
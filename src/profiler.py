@@ -0,0 +1,144 @@
+# system packages
+from contextlib import contextmanager, nullcontext
+from pathlib    import Path
+from typing     import Any, ContextManager, Dict, Iterator, List, Optional, TextIO
+import cProfile
+import json
+import os
+import threading
+import time
+
+
+class Profiler:
+	'''
+	Time the stages of a run and count what they do (--profile). A stage is
+	timed with "with profiler.stage('extract'):" and shows up in the stage
+	table and in the Chrome trace. Code that runs once per plot or per line
+	adds to a timer with add_time() instead, which is only totalled.
+
+	When profiling is off, stage() returns a shared do-nothing context and
+	the per-plot code checks "enabled" before reading the clock, so the cost
+	is an attribute lookup.
+	'''
+
+	def __init__ (self) -> None:
+		self.enabled:bool = False
+
+		self._pstats_file:Optional[Path] = None		# cProfile output, read with pstats
+		self._trace_file:Optional[Path]  = None		# Chrome trace-event JSON
+
+		self._profile:Optional[cProfile.Profile] = None
+		self._begin:float = 0.0						# perf_counter() when the run started
+		self._secs:float  = 0.0						# seconds the run took
+
+		# key is a stage or timer name, value is [number of calls, seconds]
+		self._timers:Dict[str, List[float]] = {}
+
+		# key is a counter name, value is the count
+		self._counters:Dict[str, int] = {}
+
+		# Chrome trace "complete" events, one for each stage
+		self._events:List[Dict[str, Any]] = []
+
+		self._null = nullcontext()
+
+	def __getstate__ (self) -> Dict[str, Any]:
+		# worker processes do not profile, their counts would not be seen
+		return {'enabled': False}
+
+	def __setstate__ (self, state:Dict[str, Any]) -> None:
+		self.__init__()		# type: ignore
+
+	def configure (self, enabled:bool, pstats_file:str = '', trace_file:str = '') -> None:
+		'''Turn profiling on; a pstats or trace file also turns it on.'''
+
+		self._pstats_file = Path(pstats_file).resolve() if pstats_file else None
+		self._trace_file  = Path(trace_file).resolve() if trace_file else None
+		self.enabled = enabled or bool(pstats_file) or bool(trace_file)
+
+	def start (self) -> None:
+		'''Start the run, and cProfile if a pstats file was requested.'''
+
+		if not self.enabled:
+			return
+
+		self._begin = time.perf_counter()
+		if self._pstats_file:
+			self._profile = cProfile.Profile()
+			self._profile.enable()
+
+	def stop (self) -> None:
+		'''Stop the run and write the pstats and trace files.'''
+
+		if not self.enabled:
+			return
+
+		self._secs = time.perf_counter() - self._begin
+
+		if self._profile:
+			self._profile.disable()
+			self._profile.dump_stats(str(self._pstats_file))
+			self._profile = None
+
+		if self._trace_file:
+			with open(self._trace_file, 'w') as f:
+				json.dump({'traceEvents': self._events, 'displayTimeUnit': 'ms'}, f)
+
+	def stage (self, name:str) -> ContextManager[Any]:
+		'''Return a context that times a stage of the run.'''
+
+		if not self.enabled:
+			return self._null
+		return self._stage(name)
+
+	@contextmanager
+	def _stage (self, name:str) -> Iterator[None]:
+		self._timers.setdefault(name, [0, 0.0])		# list stages in the order they start
+		begin = time.perf_counter()
+		try:
+			yield
+		finally:
+			end = time.perf_counter()
+			self.add_time(name, end - begin)
+			self._events.append({
+				'name': name, 'ph': 'X', 'pid': os.getpid(), 'tid': threading.get_ident(),
+				'ts': (begin - self._begin) * 1e6, 'dur': (end - begin) * 1e6,
+			})
+
+	def add_time (self, name:str, secs:float, calls:int = 1) -> None:
+		'''Add to a timer. Callers check "enabled" first.'''
+
+		timer = self._timers.get(name)
+		if timer is None:
+			self._timers[name] = [calls, secs]
+		else:
+			timer[0] += calls
+			timer[1] += secs
+
+	def count (self, name:str, value:int = 1) -> None:
+		'''Add to a counter. Callers check "enabled" first.'''
+
+		self._counters[name] = self._counters.get(name, 0) + value
+
+	def print (self, file:Optional[TextIO] = None) -> None:
+		'''Print the stage and timer table and the counters, to stderr when stdout has a report in another format (see Config.console).'''
+
+		if not self.enabled:
+			return
+
+		print(file=file)
+		print(f'Profile - {self._secs:,.3f} seconds', file=file)
+		print(f'  {"stage":32} {"calls":>10} {"seconds":>10} {"%":>6}', file=file)
+		for name, (calls, secs) in self._timers.items():
+			percent = secs / self._secs * 100 if self._secs else 0.0
+			print(f'  {name:32} {calls:10,.0f} {secs:10,.3f} {percent:6.1f}', file=file)
+
+		if self._counters:
+			print(file=file)
+			for name, value in self._counters.items():
+				print(f'  {name:32} {value:10,}', file=file)
+
+		if self._pstats_file:
+			print(f'  cProfile stats written to {self._pstats_file}', file=file)
+		if self._trace_file:
+			print(f'  Chrome trace written to {self._trace_file}', file=file)
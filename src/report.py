@@ -0,0 +1,175 @@
+# system packages
+from __future__ import annotations
+from contextlib import contextmanager
+from datetime   import datetime, timedelta
+from pathlib    import Path
+from typing     import Any, Iterator, List, Optional, Sequence, TextIO
+import abc
+import csv
+import json
+import sys
+
+# local packages
+from src.plot import Plot
+
+# values of these types are written as they are
+PLAIN = {int, str}
+
+# columns of the "plot" table (--details), one row for each plot
+PLOT_COLUMNS = (
+	'log_file', 'index', 'plot_id', 'name', 'plot_size', 'threads', 'buffer_size', 'buckets', 'stripe_size',
+	'temp_dir_1', 'temp_dir_2', 'dest_dir', 'start_time', 'end_time',
+	'phase_1', 'phase_2', 'phase_3', 'phase_4', 'total_time', 'copy_time', 'working_gb', 'file_gb', 'overlaps',
+)
+
+
+class ReportWriter (abc.ABC):
+	'''
+	Write the report as tables of rows, one row at a time, so a report is
+	never held in memory. A table is started with table() and its rows are
+	written with row(). Values are written as they are, except floats are
+	rounded to milliseconds, nan is empty (null in JSON), and dates are
+	ISO 8601.
+	'''
+
+	def __init__ (self, stream:TextIO) -> None:
+		self._stream = stream
+		self._name:str = ''						# the current table
+		self._columns:Sequence[str] = ()		# columns of the current table
+
+	def table (self, name:str, columns:Sequence[str]) -> None:
+		'''Start a table, the rows that follow belong to it.'''
+
+		self._name = name
+		self._columns = columns
+
+	@abc.abstractmethod
+	def row (self, values:Sequence[Any]) -> None:
+		'''Write a row of the current table, a value for each column.'''
+
+	def close (self) -> None:
+		self._stream.flush()
+
+
+class CsvWriter (ReportWriter):
+	'''Each table is a header line and its rows, tables are separated by an empty line.'''
+
+	def __init__ (self, stream:TextIO) -> None:
+		super().__init__(stream)
+		self._writer = csv.writer(stream, lineterminator='\n')
+		self._tables:int = 0
+
+	def table (self, name:str, columns:Sequence[str]) -> None:
+		super().table(name, columns)
+
+		if self._tables:
+			self._stream.write('\n')
+		self._tables += 1
+		self._writer.writerow(['table', *columns])
+
+	def row (self, values:Sequence[Any]) -> None:
+		row = values_of(values)
+		row.insert(0, self._name)
+		self._writer.writerow(row)
+
+
+class JsonLinesWriter (ReportWriter):
+	'''Each row is a JSON object on its own line, the "table" key is the table name.'''
+
+	def row (self, values:Sequence[Any]) -> None:
+		record = {'table': self._name}
+		record.update(zip(self._columns, values_of(values)))
+		self._stream.write(json.dumps(record, separators=(',', ':')))
+		self._stream.write('\n')
+
+
+class MarkdownWriter (ReportWriter):
+	'''Each table is a heading and a Markdown (GitHub) table.'''
+
+	def __init__ (self, stream:TextIO) -> None:
+		super().__init__(stream)
+		self._tables:int = 0
+
+	def table (self, name:str, columns:Sequence[str]) -> None:
+		super().table(name, columns)
+
+		if self._tables:
+			self._stream.write('\n')
+		self._tables += 1
+		self._stream.write(f'## {name}\n\n| {" | ".join(columns)} |\n|{"---|" * len(columns)}\n')
+
+	def row (self, values:Sequence[Any]) -> None:
+		cells = ('' if value is None else str(value).replace('|', '\\|') for value in values_of(values))
+		self._stream.write(f'| {" | ".join(cells)} |\n')
+
+
+# key is an --output format, value is the writer for that format
+WRITERS = {
+	'csv':      CsvWriter,
+	'json':     JsonLinesWriter,
+	'jsonl':    JsonLinesWriter,
+	'markdown': MarkdownWriter,
+	'md':       MarkdownWriter,
+}
+
+
+@contextmanager
+def open_report (output:str, file:str = '') -> Iterator[ReportWriter]:
+	'''
+	Return a writer for an --output format that writes to a file, or to
+	stdout if there is no file. Files are written with a large buffer.
+	'''
+
+	if not file or file == '-':
+		writer = WRITERS[output](sys.stdout)
+		try:
+			yield writer
+		finally:
+			writer.close()
+		return
+
+	with open(Path(file), 'w', encoding='utf-8', newline='', buffering=1024 * 1024) as f:
+		writer = WRITERS[output](f)
+		try:
+			yield writer
+		finally:
+			writer.close()
+
+
+def plot_row (plot:Plot) -> List[Any]:
+	'''Return the values of a plot for the "plot" table, see PLOT_COLUMNS.'''
+
+	parameters = plot.parameters
+	totals = plot.totals
+
+	# the dest directory without its trailing slash, as str(totals.dest_dir) but without a Path
+	dest_dir = totals.dest_dir_str
+	if len(dest_dir) > 1:
+		dest_dir = dest_dir[:-1]
+
+	return [
+		str(plot.log_file), plot.index, parameters.plot_id, plot.name,
+		parameters.plot_size, parameters.threads, parameters.buffer_size, parameters.buckets, parameters.stripe_size,
+		parameters.temp_dir_1, parameters.temp_dir_2, dest_dir,
+		plot.start_time, plot.end_time,
+		plot.phase_1.total_time, plot.phase_2.total_time, plot.phase_3.total_time, plot.phase_4.total_time,
+		totals.total_time, totals.copy_secs, totals.working_gb, totals.file_gb, len(plot.overlap),
+	]
+
+
+def values_of (values:Sequence[Any]) -> List[Any]:
+	'''Return the values of a row as they are written, see value_of().'''
+
+	return [value if type(value) in PLAIN else value_of(value) for value in values]
+
+
+def value_of (value:Any) -> Any:
+	'''Return a value as it is written: floats to milliseconds, nan as None, dates as ISO 8601.'''
+
+	if isinstance(value, float):
+		return round(value, 3) if value == value else None
+	if isinstance(value, datetime):
+		return value.isoformat()
+	if isinstance(value, timedelta):
+		return round(value.total_seconds(), 3)
+	return value
@@ -0,0 +1,132 @@
+# system packages
+from __future__ import annotations
+from datetime import datetime
+from pathlib  import Path
+from typing   import Any, Callable, Dict, List, Optional, Tuple, Type, TypeVar
+import gzip
+import json
+import os
+import typing
+
+# local packages
+from src.logreader import open_log
+from src.plot      import IncompletePlot, PlotRecord, SummaryPlot
+
+T = TypeVar('T')
+
+
+class Summary:
+	'''
+	A compact summary of the plots of one host (chia-log.py summarize), so
+	each plotting machine analyzes its own logs and one machine merges the
+	summaries into a single report (chia-log.py merge) without copying or
+	reading the logs again.
+
+	A summary has the statistics of each plot configuration by thread count
+	(see PlotConfiguration.to_record()), the plots per day, a SummaryPlot()
+	for each plot (to drop plots that are in more than one summary, and for
+	the overlaps), the incomplete plots, and optionally the PlotRecord() of
+	each plot (for --details). It is a versioned JSON file, compressed if
+	the file name ends with .gz.
+	'''
+
+	FORMAT  = 'chia-log summary'
+	VERSION = 1
+
+	def __init__ (self, host:str, files:int = 0) -> None:
+		self.host = host
+		self.files = files											# log files summarized
+		self.created:datetime = datetime.now().replace(microsecond=0)
+
+		self.configs:Dict[str, List[Any]] = {}						# key is a plot configuration name, value is PlotConfiguration.to_record()
+		self.plots_per_day:Dict[str, int] = {}						# key is yyyy-mm-dd, value is number of plots
+		self.plots:List[SummaryPlot] = []
+		self.incomplete:List[IncompletePlot] = []
+		self.records:Optional[List[PlotRecord]] = None				# a record for each plot, in the same order, if included
+
+	def save (self, path:Path) -> None:
+		'''Write the summary to a file, which is replaced atomically.'''
+
+		data = {
+			'format':     self.FORMAT,
+			'version':    self.VERSION,
+			'host':       self.host,
+			'created':    self.created.isoformat(),
+			'files':      self.files,
+			'configs':    self.configs,
+			'days':       self.plots_per_day,
+			'plots':      [to_json(plot) for plot in self.plots],
+			'incomplete': [to_json(plot) for plot in self.incomplete],
+			'records':    None if self.records is None else [to_json(record) for record in self.records],
+		}
+
+		temp_path = path.with_name(path.name + '.tmp')
+		with (gzip.open(temp_path, 'wt', encoding='utf-8') if path.suffix == '.gz' else open(temp_path, 'w', encoding='utf-8')) as f:
+			json.dump(data, f, separators=(',', ':'))
+		os.replace(temp_path, path)
+
+	@classmethod
+	def load (cls, path:Path) -> Summary:
+		'''
+		Read a summary file, which may be compressed (see open_log()). Raise
+		ValueError if the file is not a summary or is another version.
+		'''
+
+		with open_log(path) as f:
+			data = json.load(f)
+
+		if not isinstance(data, dict) or data.get('format') != cls.FORMAT:
+			raise ValueError(f'{path} is not a chia-log summary')
+		if data.get('version') != cls.VERSION:
+			raise ValueError(f'summary {path} is version {data.get("version")}, expected {cls.VERSION}')
+
+		summary = cls(data['host'], data['files'])
+		summary.created = datetime.fromisoformat(data['created'])
+		summary.configs = data['configs']
+		summary.plots_per_day = data['days']
+		summary.plots = [from_json(SummaryPlot, plot) for plot in data['plots']]
+		summary.incomplete = [from_json(IncompletePlot, plot) for plot in data['incomplete']]
+		if data['records'] is not None:
+			summary.records = [from_json(PlotRecord, record) for record in data['records']]
+
+		return summary
+
+
+def to_json (record:Tuple[Any, ...]) -> List[Any]:
+	'''Return the values of a record (a NamedTuple) for JSON, dates are ISO 8601.'''
+
+	return [value.isoformat() if isinstance(value, datetime) else value for value in record]
+
+
+def from_json (cls:Type[T], values:List[Any]) -> T:
+	'''Return a record (a NamedTuple) from its JSON values, see to_json().'''
+
+	return cls(*(convert(value) for convert, value in zip(_converters(cls), values)))		# type: ignore
+
+
+# key is a record class, value is the function that converts the JSON value of each field
+_CONVERTERS:Dict[type, List[Callable[[Any], Any]]] = {}
+
+def _converters (cls:type) -> List[Callable[[Any], Any]]:
+	'''Return the converter of each field of a record class, from its type annotation.'''
+
+	if cls not in _CONVERTERS:
+		hints = typing.get_type_hints(cls)
+		converters:List[Callable[[Any], Any]] = []
+		for name in cls._fields:		# type: ignore
+			hint = hints[name]
+			if hint in (datetime, Optional[datetime]):
+				converters.append(lambda value: datetime.fromisoformat(value) if value else None)
+			elif typing.get_origin(hint) is tuple:
+				converters.append(_tuples)
+			else:
+				converters.append(lambda value: value)
+		_CONVERTERS[cls] = converters
+
+	return _CONVERTERS[cls]
+
+
+def _tuples (value:Any) -> Any:
+	'''Return JSON lists (such as the table times of a plot) as tuples.'''
+
+	return tuple(_tuples(item) for item in value) if isinstance(value, list) else value
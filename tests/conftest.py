@@ -0,0 +1,26 @@
+# system packages
+from pathlib import Path
+import sys
+
+# third party packages
+import pytest
+
+# the tests import src and benchmarks from the top of the repository
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# local packages
+from benchmarks import synthetic
+from src.config import Config
+
+
+@pytest.fixture
+def config (tmp_path:Path) -> Config:
+	'''A configuration that reads the chia*.log files in tmp_path/logs.'''
+
+	(tmp_path / 'logs').mkdir()
+	synthetic.write_config(tmp_path / 'chia-log.yaml', tmp_path / 'logs', synthetic.Options())
+
+	config = Config()
+	config.cli_options(str(tmp_path / 'chia-log.yaml'), False, '', 'text', 0)
+	assert config.valid
+	return config
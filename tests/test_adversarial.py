@@ -0,0 +1,58 @@
+# system packages
+from pathlib import Path
+
+# third party packages
+import pytest
+
+# local packages
+from benchmarks.adversarial import CASES, check, extract, truncated
+from src.config             import Config
+from src.plots              import Plots
+
+# bytes of the smaller file of each case, the larger one is twice as long
+SIZE = 500000
+
+# slowest throughput allowed, in MB/s
+MIN_MB_S = 1.0
+
+
+def load_config (path:Path, files:str = '') -> Config:
+	path.write_text(f'directories:\n  logs:\n    - {path.parent}\nfiles:\n  patterns:\n    - "*.log"\n{files}logging:\n  level: error\n')
+	config = Config()
+	config.cli_options(str(path), False, '', 'text', 0)
+	assert config.valid
+	return config
+
+
+@pytest.mark.parametrize('name', list(CASES))
+def test_linear_time (name:str, tmp_path:Path) -> None:
+	'''Each case is parsed in linear time, and its incomplete plots and errors are reported.'''
+
+	config = load_config(tmp_path / 'chia-log.yaml')
+
+	results = []
+	for scale in (1, 2):
+		path = tmp_path / f'{name}-{scale}.log'
+		path.write_bytes(CASES[name](SIZE * scale))
+		secs, plots = extract(config, path)
+		assert check(name, plots) == []
+		results.append((path.stat().st_size, secs))
+
+	(_, secs_1), (size_2, secs_2) = results
+	assert size_2 / 1e6 / secs_2 >= MIN_MB_S
+	if secs_2 > 0.05:
+		assert secs_2 / max(secs_1, 1e-3) < 3
+
+
+def test_time_budget (tmp_path:Path) -> None:
+	'''A file that runs out of its time budget is stopped (keeping the plots before it), the next file is still extracted.'''
+
+	config = load_config(tmp_path / 'budget.yaml', '  time-budget: 0.001\n')
+	(tmp_path / 'truncated.log').write_bytes(truncated(4 * SIZE))
+	(tmp_path / 'garbage.log').write_bytes(CASES['garbage'](SIZE))
+
+	plots = Plots(config)
+	plots.extract_files([tmp_path / 'truncated.log', tmp_path / 'garbage.log'], 1)
+
+	assert [path.name for path, error in plots.errors.items() if 'time budget' in error] == ['truncated.log']
+	assert len([plot for plot in plots.plots if Path(plot.log_file).name == 'garbage.log']) == 1
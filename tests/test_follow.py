@@ -0,0 +1,61 @@
+# system packages
+from pathlib import Path
+import io
+
+# local packages
+from benchmarks.synthetic import log_file
+from src.analyze          import Analyze
+from src.config           import Config
+from src.follow           import Follow, FollowedFile
+from src.plots            import Plots
+from src.plotsplitter     import MAX_LINE_BYTES, PlotSplitter
+
+
+class LineReader (io.BytesIO):
+	'''A stream that records the longest line read from it.'''
+
+	longest:int = 0
+
+	def readline (self, size:int = -1) -> bytes:		# type: ignore
+		line = super().readline(size)
+		self.longest = max(self.longest, len(line))
+		return line
+
+	def __iter__ (self):		# type: ignore
+		raise AssertionError('the stream is read without a line length limit')
+
+
+def test_feed_holds_back_at_most_max_line_bytes () -> None:
+	'''A file that never writes a newline is fed to the splitter in pieces.'''
+
+	followed = FollowedFile(Path('chia-1.log'))
+	for _ in range(100):
+		assert followed.feed(b'x' * 100000) == []
+		assert len(followed._partial) <= MAX_LINE_BYTES
+
+
+def test_feed_pieces_match_split () -> None:
+	'''Plots fed in arbitrary pieces, with lines longer than MAX_LINE_BYTES, are the plots split() finds.'''
+
+	data = log_file(10).encode()
+	data = data.replace(b'\nID: ', b'\n' + b'x' * (3 * MAX_LINE_BYTES + 5) + b'\nID: ', 3)
+	expected = list(PlotSplitter().split(io.BytesIO(data)))
+
+	followed = FollowedFile(Path('chia-1.log'))
+	plots = []
+	for start in range(0, len(data), 50000):
+		plots.extend(followed.feed(data[start:start + 50000]))
+
+	assert len(expected) == 10
+	assert plots == expected
+
+
+def test_run_stream_limits_line_length (config:Config) -> None:
+	'''Stdin is read a line at a time, at most MAX_LINE_BYTES at once.'''
+
+	stream = LineReader(b'x' * (10 * MAX_LINE_BYTES) + b'\n' + log_file(5).encode())
+	plots = Plots(config)
+	Follow(config, plots, Analyze(config)).run_stream(stream)
+
+	assert stream.longest <= MAX_LINE_BYTES
+	assert len(plots.plots) == 5
@@ -0,0 +1,60 @@
+# local packages
+from src.plotmatcher import MountTrie, PlotMatcher
+
+NESTED = [
+	{'name': 'A', 'dest': ['/media/d'], 'temp': ['/t1']},
+	{'name': 'B', 'dest': ['/media/d/sub'], 'temp': ['/t2']},
+]
+
+
+def test_enclosing_mounts () -> None:
+	trie = MountTrie()
+	for mount in ('/media/temp001', '/media/temp001/sub/', '/media'):
+		trie.add(mount)
+
+	assert trie.enclosing('/media/temp001/sub/x') == ['/media/temp001/sub', '/media/temp001', '/media']
+	assert trie.enclosing('/media/temp0011') == ['/media']
+	assert trie.enclosing('/other') == []
+
+
+def test_match_exact () -> None:
+	matcher = PlotMatcher(NESTED)
+
+	assert matcher.match('/media/d', '/t1', '/t1') == 'A'
+	assert matcher.match('/media/d/sub', '/t2', '/t2') == 'B'
+	assert matcher.match('/media/e', '/t1', '/t1') is None
+
+
+def test_match_nested_mount () -> None:
+	'''A plot below a nested mount point matches the enclosing configuration that has its temp directories.'''
+
+	matcher = PlotMatcher(NESTED)
+
+	assert matcher.match('/media/d/sub', '/t1', '/t1') == 'A'
+	assert matcher.match('/media/d/sub/plots', '/t1/x', '/t1') == 'A'
+	assert matcher.match('/media/d/sub/plots', '/t2', '/t2') == 'B'
+	assert matcher.match('/media/d/sub', '/t1', '/t2') is None
+	assert matcher.overlaps() == []
+
+
+def test_overlaps_nested_mount () -> None:
+	'''Configurations where one has mount points below the other's overlap, the nested one is used.'''
+
+	matcher = PlotMatcher([
+		{'name': 'A', 'dest': ['/media/d'], 'temp': ['/t1']},
+		{'name': 'B', 'dest': ['/media/d/sub'], 'temp': ['/t1']},
+	])
+
+	assert matcher.match('/media/d/sub/plots', '/t1', '/t1') == 'B'
+	assert matcher.match('/media/d/other', '/t1', '/t1') == 'A'
+	assert matcher.overlaps() == ['plot configurations "B" and "A" both match dest /media/d/sub, temp /t1, temp /t1, "B" is used']
+
+
+def test_overlaps_first_configuration_is_used () -> None:
+	matcher = PlotMatcher([
+		{'name': 'A', 'dest': '/media/d', 'temp': ['/t1', '/t2']},
+		{'name': 'B', 'dest': '/media/d', 'temp': '/t1'},
+	])
+
+	assert matcher.match('/media/d', '/t1', '/t1') == 'A'
+	assert matcher.overlaps() == ['plot configurations "A" and "B" both match dest /media/d, temp /t1, temp /t1, "A" is used']
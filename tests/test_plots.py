@@ -0,0 +1,56 @@
+# system packages
+from pathlib import Path
+
+# local packages
+from benchmarks.synthetic import log_file
+from src.config           import Config
+from src.follow           import FollowedFile
+from src.plot             import Plot
+from src.plotcache        import PlotCache
+from src.plots            import Plots
+
+
+def extract (config:Config, path:Path, cache:PlotCache) -> Plots:
+	plots = Plots(config, cache)
+	plots.extract(path)
+	cache.save()
+	return plots
+
+
+def test_cache_resumes_grown_log (config:Config, tmp_path:Path) -> None:
+	'''A log that grew is read from the cached offset, not from the start.'''
+
+	path = tmp_path / 'logs' / 'chia-1.log'
+	path.write_text(log_file(10))
+	first = extract(config, path, PlotCache(tmp_path / 'chia-log.cache', config.logger))
+	assert len(first.plots) == 10
+
+	path.write_text(log_file(25))
+	cache = PlotCache(tmp_path / 'chia-log.cache', config.logger)
+	cache.load()
+	plots = extract(config, path, cache)
+
+	assert [plot.index for plot in plots.plots] == list(range(1, 26))
+	assert len({plot.parameters.plot_id for plot in plots.plots}) == 25
+	assert plots.offset(path) == (path.stat().st_size, 26)
+
+
+def test_follow_resumes_at_offset (config:Config, tmp_path:Path) -> None:
+	'''A followed log resumes after the last complete plot of the batch run.'''
+
+	path = tmp_path / 'logs' / 'chia-1.log'
+	path.write_text(log_file(10))
+	plots = Plots(config)
+	plots.extract(path)
+
+	path.write_text(log_file(15))
+	followed = FollowedFile(path, *plots.offset(path))
+	added = []
+	for lines in followed.read():
+		plot = Plot(config, path, followed.next_index())
+		assert plot.extract(lines)
+		added.append(plot)
+	followed.close()
+
+	assert [plot.index for plot in added] == list(range(11, 16))
+	assert not {plot.parameters.plot_id for plot in added} & {plot.parameters.plot_id for plot in plots.plots}
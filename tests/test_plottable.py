@@ -0,0 +1,66 @@
+# system packages
+from math import isclose, nan
+import random
+
+# third party packages
+import pytest
+
+# local packages
+from src           import plottable
+from src.plotstats import PhaseStats
+from src.plottable import PlotTable
+
+COLUMNS = ('phase_1', 'total_time')
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def table (request:pytest.FixtureRequest, monkeypatch:pytest.MonkeyPatch) -> PlotTable:
+	'''A table of 1,000 rows, grouped with numpy and in pure Python.'''
+
+	if request.param == 'python':
+		monkeypatch.setattr(plottable, 'numpy', None)
+	elif plottable.numpy is None:
+		pytest.skip('numpy is not installed')
+
+	rng = random.Random(1)
+	table = PlotTable()
+	for row in range(1000):
+		table.append_row(f'config {row % 3}', {'threads': 2 + row % 2 * 2, 'phase_1': rng.uniform(3000, 9000), 'total_time': nan if row == 7 else rng.uniform(7000, 16000)})
+	return table
+
+
+def expected (table:PlotTable, start:int = 0) -> dict:
+	'''The statistics of each group, one value at a time.'''
+
+	groups:dict = {}
+	for row in range(start, len(table)):
+		key = (table._names[table._columns['name'][row]], table._columns['threads'][row])
+		group = groups.setdefault(key, {column: PhaseStats() for column in COLUMNS})
+		for column in COLUMNS:
+			value = table._columns[column][row]
+			if value == value:
+				group[column].add(value)
+	return groups
+
+
+@pytest.mark.parametrize('start', [0, 600])
+def test_group_by (table:PlotTable, start:int) -> None:
+	groups = table.group_by(('name', 'threads'), COLUMNS, start)
+
+	assert list(groups) == sorted(expected(table, start))
+	for key, group in expected(table, start).items():
+		for column in COLUMNS:
+			stats = groups[key][column]
+			assert stats.count == group[column].count
+			assert stats.min == group[column].min and stats.max == group[column].max
+			assert isclose(stats.mean, group[column].mean, rel_tol=1e-9)
+			assert isclose(stats.stdev, group[column].stdev, rel_tol=1e-9)
+			assert stats.quantile(0.9) == group[column].quantile(0.9)
+
+
+def test_group_by_skips_nan (table:PlotTable) -> None:
+	groups = table.group_by(('name', 'threads'), COLUMNS)
+
+	assert sum(group['phase_1'].count for group in groups.values()) == 1000
+	assert sum(group['total_time'].count for group in groups.values()) == 999
+	assert table.group_by(('name',), COLUMNS, len(table)) == {}
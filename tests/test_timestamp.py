@@ -0,0 +1,57 @@
+# system packages
+from datetime import datetime, timedelta
+
+# third party packages
+import pytest
+
+# local packages
+from benchmarks.synthetic import time_stamp as format_time_stamp
+from benchmarks.timestamp import lines, strptime_time_stamp
+from src.plotutility      import time_stamp, time_stamp_seconds
+
+EPOCH = datetime(1970, 1, 1)
+
+
+@pytest.mark.parametrize('line', [
+	'Starting phase 1/4: Forward Propagation into tmp files... Sun Apr 25 16:59:09 2021',
+	'Starting phase 1/4: Forward Propagation into tmp files... Sat May  1 03:10:43 2021',
+	'Starting phase 1/4: Forward Propagation into tmp files... Sat May 1 03:10:43 2021',
+	'Time for phase 1 = 8042.121 seconds. CPU (177.360%) Tue Dec 31 23:59:59 2024',
+	'Time for phase 1 = 8042.121 seconds. CPU (177.360%) Thu Feb 29 00:00:00 2024',
+	'started Sat May  1 03:10:43 2021 and more text after it',
+	'Sun Apr 25 16:59:09 2021 Sun Apr 25 17:00:00 2021',
+])
+def test_same_as_strptime (line:str) -> None:
+	assert time_stamp(line) == strptime_time_stamp(line)
+	assert time_stamp(line) is not None
+
+
+@pytest.mark.parametrize('line', [
+	'no time stamp here',
+	'Time for phase 1 = 8042.121 seconds. CPU (177.360%) Sun Foo 25 16:59:09 2021',
+	'Time for phase 1 = 8042.121 seconds. CPU (177.360%) Sun Feb 30 16:59:09 2021',
+	'Time for phase 1 = 8042.121 seconds. CPU (177.360%) Sun Apr 25 25:59:09 2021',
+])
+def test_invalid (line:str) -> None:
+	assert time_stamp(line) is None
+	assert time_stamp_seconds(line) is None
+
+
+def test_generated_lines () -> None:
+	'''Time stamps of every month, with days written with one and two spaces, and each used twice (the memo cache).'''
+
+	data = lines(20000)
+	assert any('  ' not in line[-24:] and line[-16] == ' ' for line in data)
+
+	for line in data:
+		expected = strptime_time_stamp(line)
+		assert time_stamp(line) == expected
+		assert time_stamp_seconds(line) == (expected - EPOCH) // timedelta(seconds=1)
+
+
+def test_every_day () -> None:
+	t = datetime(2020, 1, 1, 0, 0, 1)
+	while t.year < 2022:
+		line = f'Starting phase 2/4: Backpropagation into tmp files... {format_time_stamp(t)}'
+		assert time_stamp(line) == t
+		t += timedelta(days=1, seconds=3607)